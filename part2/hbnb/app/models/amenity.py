@@ -7,6 +7,7 @@ from app.models.base_model import BaseModel
 
 
 class Amenity(BaseModel):
+    __slots__ = ('name',)
 
     def __init__(self, name):
         """
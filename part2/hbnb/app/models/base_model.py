@@ -1,26 +1,122 @@
 #!/usr/bin/python3
 """
 BaseModel class that defines all common attributes/methods for other classes
+
+Models are kept compact, the in-memory repository holding every object of
+the application:
+- attributes are in __slots__, there is no __dict__ per instance
+- ids (and the ids of related objects) are stored as their 16 bytes and
+  given back as strings
+- timestamps are stored as integer microseconds since the epoch and given
+  back as datetimes (local time, like datetime.now())
 """
 
+import time
 import uuid
 from datetime import datetime
 
 
+def pack_id(value):
+    """
+    16 bytes of a canonical UUID string, other values unchanged
+
+    Args:
+        value: UUID string ('xxxxxxxx-xxxx-xxxx-xxxx-xxxxxxxxxxxx',
+            lowercase), or anything else (a related object, None, an
+            invalid id, an uppercase UUID), kept as given
+
+    Returns:
+        bytes or the value itself when it is not a UUID string
+    """
+    if isinstance(value, str) and len(value) == 36 and value[8] == '-' \
+            and value[13] == '-' and value[18] == '-' and value[23] == '-':
+        try:
+            packed = bytes.fromhex(value.replace('-', ''))
+        except ValueError:
+            return value
+        # fromhex skips whitespace and reads uppercase: only values that
+        # unpack_id gives back as they are are packed
+        if len(packed) == 16 and unpack_id(packed) == value:
+            return packed
+    return value
+
+
+def unpack_id(value):
+    """
+    UUID string of a value stored by pack_id, other values unchanged
+    """
+    if isinstance(value, bytes) and len(value) == 16:
+        h = value.hex()
+        return f'{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}'
+    return value
+
+
+def _now():
+    return time.time_ns() // 1000
+
+
+def _to_datetime(timestamp):
+    seconds, microseconds = divmod(timestamp, 1_000_000)
+    return datetime.fromtimestamp(seconds).replace(microsecond=microseconds)
+
+
+def _to_timestamp(value):
+    if isinstance(value, datetime):
+        seconds = int(value.replace(microsecond=0).timestamp())
+        return seconds * 1_000_000 + value.microsecond
+    return value
+
+
 class BaseModel:
+    __slots__ = ('_id', '_created_at', '_updated_at')
+
     def __init__(self):
         """
         Intialize a new instance with UUID & timestamps for creation and update
         """
-        self.id = str(uuid.uuid4())
-        self.created_at = datetime.now()
-        self.updated_at = datetime.now()
+        self._id = uuid.uuid4().bytes
+        # Same int object for both until the first update
+        self._created_at = self._updated_at = _now()
+
+    @property
+    def id(self):
+        """
+        UUID of the object, as a string
+        """
+        return unpack_id(self._id)
+
+    @id.setter
+    def id(self, value):
+        self._id = pack_id(value)
+
+    @property
+    def id_bytes(self):
+        """
+        Id as stored (16 bytes), the key of the repositories
+        """
+        return self._id
+
+    @property
+    def created_at(self):
+        return _to_datetime(self._created_at)
+
+    @created_at.setter
+    def created_at(self, value):
+        self._created_at = _to_timestamp(value)
+
+    @property
+    def updated_at(self):
+        return _to_datetime(self._updated_at)
+
+    @updated_at.setter
+    def updated_at(self, value):
+        self._updated_at = _to_timestamp(value)
 
     def save(self):
         """
         Update the updated_at timestamp whenever the object is modified
         """
-        self.updated_at = datetime.now()
+        self._updated_at = _now()
 
     def update(self, data):
         """
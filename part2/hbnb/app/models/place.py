@@ -3,10 +3,13 @@
 Module for place
 """
 
-from app.models.base_model import BaseModel
+from app.models.base_model import BaseModel, pack_id, unpack_id
 
 
 class Place(BaseModel):
+    __slots__ = ('title', 'description', 'price', 'latitude', 'longitude',
+                 '_owner', '_reviews', '_amenities')
+
     def __init__(self, title, description, price, latitude, longitude, owner):
         """
         Create instance of a place
@@ -27,5 +30,35 @@ class Place(BaseModel):
         self.latitude = latitude
         self.longitude = longitude
         self.owner = owner
-        self.reviews = []  # List to store related reviews
-        self.amenities = []  # List to store related amenities
+        # Lists of related reviews and amenities, made on use
+        self._reviews = None
+        self._amenities = None
+
+    @property
+    def owner(self):
+        return unpack_id(self._owner)
+
+    @owner.setter
+    def owner(self, value):
+        # The owner is given by its id (or as a User)
+        self._owner = pack_id(value)
+
+    @property
+    def reviews(self):
+        if self._reviews is None:
+            self._reviews = []
+        return self._reviews
+
+    @reviews.setter
+    def reviews(self, value):
+        self._reviews = value
+
+    @property
+    def amenities(self):
+        if self._amenities is None:
+            self._amenities = []
+        return self._amenities
+
+    @amenities.setter
+    def amenities(self, value):
+        self._amenities = value
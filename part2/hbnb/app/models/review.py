@@ -3,10 +3,11 @@
 Module for Review
 """
 
-from app.models.base_model import BaseModel
+from app.models.base_model import BaseModel, pack_id, unpack_id
 
 
 class Review(BaseModel):
+    __slots__ = ('text', 'rating', '_place_id', '_user_id')
 
     def __init__(self, text, rating, place_id, user_id):
         """
@@ -23,3 +24,19 @@ class Review(BaseModel):
         self.rating = rating
         self.place_id = place_id
         self.user_id = user_id
+
+    @property
+    def place_id(self):
+        return unpack_id(self._place_id)
+
+    @place_id.setter
+    def place_id(self, value):
+        self._place_id = pack_id(value)
+
+    @property
+    def user_id(self):
+        return unpack_id(self._user_id)
+
+    @user_id.setter
+    def user_id(self, value):
+        self._user_id = pack_id(value)
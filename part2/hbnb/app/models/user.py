@@ -7,6 +7,7 @@ from app.models.base_model import BaseModel
 
 
 class User(BaseModel):
+    __slots__ = ('first_name', 'last_name', 'email', 'is_admin', '_places')
 
     def __init__(self, first_name, last_name, email, is_admin=False):
         """
@@ -23,7 +24,17 @@ class User(BaseModel):
         self.last_name = last_name
         self.email = email
         self.is_admin = is_admin
-        self.places = []  # list to store places user owns
+        self._places = None  # list of places the user owns, made on use
 
         # Password for the moment is not implemented (following the HBNB tasks)
         # self.password = None
+
+    @property
+    def places(self):
+        if self._places is None:
+            self._places = []
+        return self._places
+
+    @places.setter
+    def places(self, value):
+        self._places = value
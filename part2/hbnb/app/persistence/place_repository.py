@@ -0,0 +1,264 @@
+#!/usr/bin/python3
+"""
+In-memory repositories of places, with filter and aggregate queries
+
+PlaceRepository answers the queries with a loop over the places.
+ColumnarPlaceRepository (NumPy) also keeps the price, latitude,
+longitude and owner of each place in arrays, one row per place, and
+answers them with vectorized masks over the columns:
+- rows are appended, a place keeps its row until the next compaction
+- a deleted place leaves a tombstone (its row is marked dead), rows are
+  compacted once a quarter of them are dead
+- owners are numbered (ordinal) in the order they are first seen, and
+  renumbered by the compaction: owners left without places are dropped
+
+The columns hold the values given to add() and update(): a place changed
+without update() is found by its previous values. Values that are not
+numbers (None) are NaN in the columns and never match a filter, as in
+the loop.
+
+place_repository() returns the columnar repository when NumPy is
+installed, the loop otherwise.
+"""
+
+from app.models.base_model import BaseModel, pack_id
+from app.persistence.repository import InMemoryRepository
+
+try:
+    import numpy
+except ImportError:  # numpy is optional, queries loop over the places
+    numpy = None
+
+
+def _number(value):
+    # Float of a price or coordinate, None when it is not a number
+    if isinstance(value, bool):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _between(value, low, high):
+    return value is not None and (low is None or value >= low) \
+        and (high is None or value <= high)
+
+
+class PlaceRepository(InMemoryRepository):
+    """
+    In-memory repository of places, queries loop over the places
+    """
+    def get_by_price(self, min_price=None, max_price=None):
+        """
+        Places with a price in [min_price, max_price], bounds included
+
+        Args:
+            min_price (float, optional): Lowest price, no bound if None
+            max_price (float, optional): Highest price, no bound if None
+
+        Returns:
+            list: Places, in the order they were added
+        """
+        return [place for place in self.get_all()
+                if _between(_number(place.price), min_price, max_price)]
+
+    def get_in_bbox(self, min_latitude, max_latitude, min_longitude,
+                    max_longitude):
+        """
+        Places inside a bounding box, edges included
+
+        Returns:
+            list: Places, in the order they were added
+        """
+        return [place for place in self.get_all()
+                if _between(_number(place.latitude), min_latitude,
+                            max_latitude)
+                and _between(_number(place.longitude), min_longitude,
+                             max_longitude)]
+
+    def average_price(self):
+        """
+        Average price of the places, None when there is none
+        """
+        prices = [price for price in map(_number, (
+            place.price for place in self.get_all())) if price is not None]
+        return sum(prices) / len(prices) if prices else None
+
+    def count_by_owner(self):
+        """
+        Number of places of each owner
+
+        Returns:
+            dict: owner (as Place.owner gives it) -> number of places
+        """
+        counts = {}
+        for place in self.get_all():
+            counts[place.owner] = counts.get(place.owner, 0) + 1
+        return counts
+
+
+class ColumnarPlaceRepository(PlaceRepository):
+    """
+    In-memory repository of places, queries run on NumPy columns
+    """
+    # Rows allocated first, doubled when full
+    INITIAL_CAPACITY = 1024
+    # Compaction once this share of the rows are dead (and at least
+    # COMPACT_MIN_ROWS of them)
+    COMPACT_RATIO = 0.25
+    COMPACT_MIN_ROWS = 1024
+
+    def __init__(self):
+        if numpy is None:
+            raise RuntimeError('ColumnarPlaceRepository needs numpy')
+        super().__init__()
+        capacity = self.INITIAL_CAPACITY
+        self._price = numpy.empty(capacity, dtype=numpy.float64)
+        self._latitude = numpy.empty(capacity, dtype=numpy.float64)
+        self._longitude = numpy.empty(capacity, dtype=numpy.float64)
+        self._owner = numpy.empty(capacity, dtype=numpy.int64)
+        self._alive = numpy.zeros(capacity, dtype=bool)
+        self._objects = []  # row -> place, None for tombstones
+        self._rows = {}  # id (16 bytes) -> row
+        self._owner_ordinals = {}  # owner -> ordinal
+        self._owners = []  # ordinal -> owner
+        self._dead = 0
+
+    def _grow(self):
+        capacity = 2 * len(self._alive)
+        for name in ('_price', '_latitude', '_longitude', '_owner'):
+            column = getattr(self, name)
+            grown = numpy.empty(capacity, dtype=column.dtype)
+            grown[:len(column)] = column
+            setattr(self, name, grown)
+        alive = numpy.zeros(capacity, dtype=bool)
+        alive[:len(self._alive)] = self._alive
+        self._alive = alive
+
+    def _write_row(self, row, place):
+        price, latitude, longitude = (
+            _number(value) for value in (place.price, place.latitude,
+                                         place.longitude))
+        self._price[row] = numpy.nan if price is None else price
+        self._latitude[row] = numpy.nan if latitude is None else latitude
+        self._longitude[row] = numpy.nan if longitude is None else longitude
+        owner = place.owner
+        ordinal = self._owner_ordinals.get(owner)
+        if ordinal is None:
+            ordinal = self._owner_ordinals[owner] = len(self._owners)
+            self._owners.append(owner)
+        self._owner[row] = ordinal
+
+    def add(self, obj):
+        row = self._rows.get(obj.id_bytes)
+        if row is None:
+            row = len(self._objects)
+            if row == len(self._alive):
+                self._grow()
+            self._objects.append(obj)
+            self._rows[obj.id_bytes] = row
+            self._alive[row] = True
+        else:  # The same id again replaces the place
+            self._objects[row] = obj
+        super().add(obj)
+        self._write_row(row, obj)
+
+    def update(self, obj_id, data):
+        super().update(obj_id, data)
+        # The facade updates the place itself, then passes it here
+        place = obj_id if isinstance(obj_id, BaseModel) else self.get(obj_id)
+        row = None if place is None else self._rows.get(place.id_bytes)
+        if row is not None:
+            self._write_row(row, place)
+
+    def delete(self, obj_id):
+        super().delete(obj_id)
+        row = self._rows.pop(pack_id(obj_id), None)
+        if row is None:
+            return
+        self._objects[row] = None
+        self._alive[row] = False
+        self._dead += 1
+        if self._dead >= self.COMPACT_MIN_ROWS \
+                and self._dead >= self.COMPACT_RATIO * len(self._objects):
+            self.compact()
+
+    def compact(self):
+        """
+        Drop the rows of deleted places, the others keep their order
+        """
+        size = len(self._objects)
+        alive = self._alive[:size]
+        kept = int(alive.sum())
+        capacity = max(self.INITIAL_CAPACITY, len(self._alive))
+        while capacity // 2 >= max(kept, self.INITIAL_CAPACITY):
+            capacity //= 2
+        for name in ('_price', '_latitude', '_longitude', '_owner'):
+            column = getattr(self, name)
+            compacted = numpy.empty(capacity, dtype=column.dtype)
+            compacted[:kept] = column[:size][alive]
+            setattr(self, name, compacted)
+        # Owners still having places, numbered again in the same order
+        used, self._owner[:kept] = numpy.unique(self._owner[:kept],
+                                                return_inverse=True)
+        self._owners = [self._owners[ordinal] for ordinal in used]
+        self._owner_ordinals = {owner: ordinal
+                                for ordinal, owner in enumerate(self._owners)}
+        self._alive = numpy.zeros(capacity, dtype=bool)
+        self._alive[:kept] = True
+        self._objects = [obj for obj in self._objects if obj is not None]
+        self._rows = {obj.id_bytes: row
+                      for row, obj in enumerate(self._objects)}
+        self._dead = 0
+
+    def _places(self, mask):
+        objects = self._objects
+        return [objects[row] for row in numpy.flatnonzero(mask)]
+
+    @staticmethod
+    def _range(column, low, high):
+        # NaN compares False: places without a value never match
+        mask = ~numpy.isnan(column)
+        if low is not None:
+            mask &= column >= low
+        if high is not None:
+            mask &= column <= high
+        return mask
+
+    def get_by_price(self, min_price=None, max_price=None):
+        size = len(self._objects)
+        return self._places(
+            self._alive[:size]
+            & self._range(self._price[:size], min_price, max_price))
+
+    def get_in_bbox(self, min_latitude, max_latitude, min_longitude,
+                    max_longitude):
+        size = len(self._objects)
+        return self._places(
+            self._alive[:size]
+            & self._range(self._latitude[:size], min_latitude, max_latitude)
+            & self._range(self._longitude[:size], min_longitude,
+                          max_longitude))
+
+    def average_price(self):
+        size = len(self._objects)
+        prices = self._price[:size]
+        prices = prices[self._alive[:size] & ~numpy.isnan(prices)]
+        return float(prices.mean()) if len(prices) else None
+
+    def count_by_owner(self):
+        size = len(self._objects)
+        counts = numpy.bincount(self._owner[:size][self._alive[:size]],
+                                minlength=len(self._owners))
+        return {self._owners[ordinal]: int(counts[ordinal])
+                for ordinal in numpy.flatnonzero(counts)}
+
+
+def place_repository():
+    """
+    Repository for places: columnar with NumPy, the loop without it
+    """
+    if numpy is not None:
+        return ColumnarPlaceRepository()
+    return PlaceRepository()
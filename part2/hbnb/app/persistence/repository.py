@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
 
+from app.models.base_model import pack_id
+
 class Repository(ABC):
     @abstractmethod
     def add(self, obj):
@@ -28,13 +30,14 @@ class Repository(ABC):
 
 class InMemoryRepository(Repository):
     def __init__(self):
+        # Objects by the 16 bytes of their id (see BaseModel)
         self._storage = {}
 
     def add(self, obj):
-        self._storage[obj.id] = obj
+        self._storage[obj.id_bytes] = obj
 
     def get(self, obj_id):
-        return self._storage.get(obj_id)
+        return self._storage.get(pack_id(obj_id))
 
     def get_all(self):
         return list(self._storage.values())
@@ -45,8 +48,7 @@ class InMemoryRepository(Repository):
             obj.update(data)
 
     def delete(self, obj_id):
-        if obj_id in self._storage:
-            del self._storage[obj_id]
+        self._storage.pop(pack_id(obj_id), None)
 
     def get_by_attribute(self, attr_name, attr_value):
         return next((obj for obj in self._storage.values() if getattr(obj, attr_name) == attr_value), None)
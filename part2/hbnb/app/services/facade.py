@@ -1,4 +1,5 @@
 from app.persistence.repository import InMemoryRepository
+from app.persistence.place_repository import place_repository
 from app.models.user import User
 from app.models.amenity import Amenity
 from app.models.place import Place
@@ -15,9 +16,10 @@ class HBnBFacade:
         __init__
 
         Initialize repositories for user, place, review, and amenity
+        (places are in columns when NumPy is installed, for the queries)
         """
         self.user_repo = InMemoryRepository()
-        self.place_repo = InMemoryRepository()
+        self.place_repo = place_repository()
         self.review_repo = InMemoryRepository()
         self.amenity_repo = InMemoryRepository()
 
@@ -0,0 +1,95 @@
+import unittest
+import uuid
+from datetime import datetime
+
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.review import Review
+from app.models.user import User
+from app.persistence.repository import InMemoryRepository
+
+
+class TestCompactModels(unittest.TestCase):
+
+    def setUp(self):
+        self.user = User("Luke", "Skywalker", "luke@starwars.com")
+        self.place = Place("Dagobah swamp", "Yoda's home", 1337.00,
+                           37.7749, -122.4194, self.user.id)
+
+    def test_no_instance_dict(self):
+        """
+        Test models keep their attributes in slots, without __dict__
+        """
+        for obj in (self.user, self.place, Amenity("Wi-Fi"),
+                    Review("Great", 5, self.place.id, self.user.id)):
+            self.assertFalse(hasattr(obj, '__dict__'))
+            with self.assertRaises(AttributeError):
+                obj.not_an_attribute = 1
+
+    def test_id_is_uuid_string(self):
+        """
+        Test the id is stored as 16 bytes and given back as a UUID string
+        """
+        self.assertEqual(len(self.place.id_bytes), 16)
+        self.assertEqual(str(uuid.UUID(self.place.id)), self.place.id)
+        self.assertEqual(uuid.UUID(self.place.id).bytes, self.place.id_bytes)
+
+    def test_related_ids(self):
+        """
+        Test ids of related objects are given back as they were set
+        """
+        review = Review("Great", 5, self.place.id, self.user.id)
+        self.assertEqual(review.place_id, self.place.id)
+        self.assertEqual(review.user_id, self.user.id)
+        self.assertEqual(self.place.owner, self.user.id)
+
+        # Values that are not UUIDs are kept as they are
+        review.update({"place_id": "1234567890"})
+        self.assertEqual(review.place_id, "1234567890")
+        review.place_id = self.place.id.upper()
+        self.assertEqual(review.place_id, self.place.id.upper())
+        self.place.owner = self.user
+        self.assertIs(self.place.owner, self.user)
+
+    def test_timestamps(self):
+        """
+        Test timestamps are datetimes, and updated by save() and update()
+        """
+        self.assertIsInstance(self.place.created_at, datetime)
+        self.assertEqual(self.place.created_at, self.place.updated_at)
+
+        created = datetime(2024, 3, 1, 12, 30, 15, 123456)
+        self.place.created_at = created
+        self.assertEqual(self.place.created_at, created)
+
+        self.place.update({"price": 42.0, "unknown": "ignored"})
+        self.assertEqual(self.place.price, 42.0)
+        self.assertGreater(self.place.updated_at, created)
+
+    def test_lists(self):
+        """
+        Test related lists are created on use and can be replaced
+        """
+        review = Review("Great", 5, self.place.id, self.user.id)
+        self.place.reviews.append(review)
+        self.assertEqual(self.place.reviews, [review])
+        self.place.amenities = ["Wi-Fi"]
+        self.assertEqual(self.place.amenities, ["Wi-Fi"])
+        self.assertEqual(self.user.places, [])
+
+    def test_repository_by_string_id(self):
+        """
+        Test the repository finds and deletes objects by their string id
+        """
+        repo = InMemoryRepository()
+        repo.add(self.place)
+        self.assertIs(repo.get(self.place.id), self.place)
+        self.assertIsNone(repo.get("1234567890"))
+        self.assertIsNone(repo.get(str(uuid.uuid4())))
+        self.assertIs(repo.get_by_attribute("title", "Dagobah swamp"),
+                      self.place)
+
+        repo.delete("1234567890")
+        repo.delete(self.place.id)
+        self.assertIsNone(repo.get(self.place.id))
+        self.assertEqual(repo.get_all(), [])
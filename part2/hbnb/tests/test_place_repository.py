@@ -0,0 +1,121 @@
+import unittest
+
+from app.models.place import Place
+from app.persistence import place_repository
+from app.persistence.place_repository import (ColumnarPlaceRepository,
+                                              PlaceRepository)
+
+OWNERS = ["3f9a4c2e-1b7d-4e8a-9c6f-2d5b8e1a7c40",
+          "8c1e7b3a-5d2f-4a9e-b6c8-0f4d2a9e5b17"]
+
+
+class TestPlaceRepository(unittest.TestCase):
+    """
+    Queries of the loop repository, run again on the columns below
+    """
+    repository_class = PlaceRepository
+
+    def setUp(self):
+        self.repo = self.repository_class()
+        self.places = [
+            Place(f"Place {i}", "Test place", 10.0 * (i + 1), 40.0 + i,
+                  -70.0 - i, OWNERS[i % 2])
+            for i in range(10)
+        ]
+        for place in self.places:
+            self.repo.add(place)
+
+    def test_get_by_price(self):
+        """
+        Test filtering places on a price range, bounds included
+        """
+        self.assertEqual(self.repo.get_by_price(30.0, 50.0), self.places[2:5])
+        self.assertEqual(self.repo.get_by_price(min_price=90.0),
+                         self.places[8:])
+        self.assertEqual(self.repo.get_by_price(max_price=5.0), [])
+
+    def test_get_in_bbox(self):
+        """
+        Test filtering places inside a bounding box
+        """
+        self.assertEqual(self.repo.get_in_bbox(41.0, 45.0, -73.0, -60.0),
+                         self.places[1:4])
+
+    def test_average_and_count(self):
+        """
+        Test the average price and the number of places of each owner
+        """
+        self.assertAlmostEqual(self.repo.average_price(), 55.0)
+        self.assertEqual(self.repo.count_by_owner(),
+                         {OWNERS[0]: 5, OWNERS[1]: 5})
+        self.assertIsNone(self.repository_class().average_price())
+
+    def test_update_and_delete(self):
+        """
+        Test queries follow updates (as the facade makes them) and deletes
+        """
+        place = self.places[0]
+        place.update({"price": 1000.0, "owner": OWNERS[1]})
+        self.repo.update(place, {"price": 1000.0, "owner": OWNERS[1]})
+        self.repo.delete(self.places[1].id)
+
+        self.assertEqual(self.repo.get_by_price(min_price=500.0), [place])
+        self.assertNotIn(self.places[1], self.repo.get_by_price())
+        self.assertEqual(self.repo.count_by_owner(),
+                         {OWNERS[0]: 4, OWNERS[1]: 5})
+        self.assertIsNone(self.repo.get(self.places[1].id))
+
+    def test_not_a_number(self):
+        """
+        Test places without a price are left out of the price queries
+        """
+        place = Place("No price", "Test place", None, 40.0, -70.0, OWNERS[0])
+        self.repo.add(place)
+        self.assertNotIn(place, self.repo.get_by_price())
+        self.assertAlmostEqual(self.repo.average_price(), 55.0)
+
+
+@unittest.skipIf(place_repository.numpy is None, "numpy is not installed")
+class TestColumnarPlaceRepository(TestPlaceRepository):
+    repository_class = ColumnarPlaceRepository
+
+    def test_compaction(self):
+        """
+        Test deleted rows are compacted and the places keep their order
+        """
+        repo = ColumnarPlaceRepository()
+        places = [Place(f"Place {i}", "Test place", float(i), 0.0, 0.0,
+                        OWNERS[0]) for i in range(3000)]
+        for place in places:
+            repo.add(place)
+        for place in places[::2]:
+            repo.delete(place.id)
+
+        self.assertLess(len(repo._objects), 3000)
+        self.assertEqual(repo.get_by_price(), places[1::2])
+        self.assertEqual(repo.count_by_owner(), {OWNERS[0]: 1500})
+        self.assertIs(repo.get(places[1].id), places[1])
+
+    def test_compaction_drops_owners(self):
+        """
+        Test owners without places left are dropped by the compaction
+        """
+        repo = ColumnarPlaceRepository()
+        places = [Place(f"Place {i}", "Test place", float(i), 0.0, 0.0,
+                        f"{i:08d}-0000-4000-8000-000000000000")
+                  for i in range(2000)]
+        for place in places:
+            repo.add(place)
+        for place in places[:1500]:
+            repo.delete(place.id)
+        repo.compact()
+
+        self.assertEqual(len(repo._owners), 500)
+        self.assertEqual(repo.count_by_owner(),
+                         {place.owner: 1 for place in places[1500:]})
+        repo.add(places[0])
+        self.assertEqual(repo.count_by_owner()[places[0].owner], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
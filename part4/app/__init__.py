@@ -1,38 +1,80 @@
+from importlib import import_module
+
 from flask import Flask
-from flask_cors import CORS
-from flask_restx import Api
-from app.api.v1.users import api as users_ns
-from app.api.v1.amenities import api as amenities_ns
-from app.api.v1.reviews import api as reviews_ns, places_reviews_ns
-from app.api.v1.places import api as places_ns
-from app.api.v1.auth import api as login_ns
-from app.api.v1.protected import api as protected_ns
 from flask_jwt_extended import JWTManager
-from app.extensions import db, bcrypt
+from app.extensions import (
+    db, compress, hasher, limiter, amenity_catalog,
+    leaderboards, metrics, allocations
+)
+from app.passwords import HasherBusy
 
 # instanciate the jwt object
 jwt = JWTManager()
 
+# Namespaces as (module, attribute, url prefix). They are imported by
+# create_app and not by this package, so processes importing app.* for
+# other reasons (export workers, password hashing workers, scripts) do not
+# load the API. Set API_NAMESPACES to a list of module names to only
+# serve some of them.
+NAMESPACES = (
+    ('users', 'api', '/api/v1/users'),
+    ('amenities', 'api', '/api/v1/amenities'),
+    ('reviews', 'api', '/api/v1/reviews'),
+    ('places', 'api', '/api/v1/places'),
+    ('reviews', 'places_reviews_ns', '/api/v1/places'),
+    ('auth', 'api', '/api/v1/auth'),
+    ('protected', 'api', '/api/v1'),
+    ('batch', 'api', '/api/v1'),
+    ('imports', 'api', '/api/v1/import'),
+    ('exports', 'api', '/api/v1/export'),
+    ('diagnostics', 'api', '/api/v1/admin'),
+)
+
+
+def register_namespaces(api, names=None):
+    """
+    Import the namespace modules and add their namespaces to the API
+
+    Args:
+        api (Api): The API to register the namespaces on
+        names (list, optional): Modules to register, all when None
+    """
+    for module_name, attribute, path in NAMESPACES:
+        if names is not None and module_name not in names:
+            continue
+        module = import_module(f'app.api.v1.{module_name}')
+        api.add_namespace(getattr(module, attribute), path=path)
+
 
 def create_app(config_class="config.DevelopmentConfig"):
     app = Flask(__name__)
 
     app.config.from_object(config_class)
 
-    api = Api(app, version='1.0', title='HBnB API',
-              description='HBnB Application API')
+    # Deferred: only the process serving the API needs them
+    from flask_cors import CORS
+    from app.api.serialization import output_json
+    from app.api.spec_cache import CachedSpecApi
+    from app.commands import export_command, import_command, seed_command
+
+    api = CachedSpecApi(app, version='1.0', title='HBnB API',
+                        description='HBnB Application API')
+
+    # Encode every JSON response with the shared serializer backend
+    api.representations['application/json'] = output_json
 
     # Register the differents namespace
-    api.add_namespace(users_ns, path='/api/v1/users')
-    api.add_namespace(amenities_ns, path='/api/v1/amenities')
-    api.add_namespace(reviews_ns, path='/api/v1/reviews')
-    api.add_namespace(places_ns, path='/api/v1/places')
-    api.add_namespace(places_reviews_ns, path='/api/v1/places')
-    api.add_namespace(login_ns, path='/api/v1/auth')
-    api.add_namespace(protected_ns, path='/api/v1')
+    register_namespaces(api, app.config.get('API_NAMESPACES'))
+
+    # Initialize the password hashing pool
+    hasher.init_app(app)
 
-    # Initialize bcrypt
-    bcrypt.init_app(app)
+    @api.errorhandler(HasherBusy)
+    def handle_hasher_busy(error):
+        return {'error': 'Server busy, retry later'}, 503, {'Retry-After': '1'}
+
+    # Initialize rate limiting
+    limiter.init_app(app)
 
     # initialize jwt
     jwt.init_app(app)
@@ -40,7 +82,27 @@ def create_app(config_class="config.DevelopmentConfig"):
     # initialize db
     db.init_app(app)
 
+    # initialize the amenity catalog
+    amenity_catalog.init_app(app)
+
+    # initialize the place leaderboards
+    leaderboards.init_app(app)
+
+    # initialize metrics (after db, its engines are instrumented)
+    metrics.init_app(app, api)
+
+    # initialize memory profiling (admin diagnostics)
+    allocations.init_app(app)
+
+    # initialize response compression
+    compress.init_app(app)
+
     # initialize cors
     CORS(app, resources={r"/*": {"origins": "*"}}, allow_headers=["Content-Type", "Authorization"])
 
+    # register CLI commands
+    app.cli.add_command(import_command)
+    app.cli.add_command(export_command)
+    app.cli.add_command(seed_command)
+
     return app
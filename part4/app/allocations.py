@@ -0,0 +1,325 @@
+#!/usr/bin/python3
+"""
+Memory profiling of a running worker with tracemalloc
+
+Admins take snapshots of the memory allocated by Python and compare
+them (what grew between two snapshots: a leak, a cache without bound),
+and can count the memory allocated by each request, by endpoint:
+- net: memory still allocated when the response is built
+- peak: highest memory reached during the request, over the memory at
+  its start; other requests served at the same time add to it, so it is
+  exact with one request at a time only
+
+Allocations are reported by site (file and line) and by app module: an
+allocation made by SQLAlchemy or Flask code goes to the innermost app
+frame of its traceback (e.g. app.persistence.repository), so the cost of
+hydrating ORM objects is found in the repository or endpoint asking for
+them. Modules are sorted in the layers of the profiler (endpoint,
+facade, repository, model).
+
+Tracing is started on demand and slows the worker down (about 2x):
+it is stopped again with the snapshots.
+"""
+
+import os
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+
+from flask import current_app, request
+
+from app.profiler import layer
+
+# Frames of the app package, '.../part4/app/api/v1/places.py'
+_APP_DIR = os.path.dirname(os.path.abspath(__file__))
+_ROOT_DIR = os.path.dirname(_APP_DIR)
+
+# Allocations of the tracing itself are left out of reports
+_IGNORED = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+)
+
+
+def _module(filename):
+    """
+    Module of an app file, None for other files
+    """
+    if not filename.startswith(_APP_DIR + os.sep):
+        return None
+    relative = os.path.relpath(filename, _ROOT_DIR)
+    module = os.path.splitext(relative)[0].replace(os.sep, '.')
+    return module[:-len('.__init__')] if module.endswith('.__init__') \
+        else module
+
+
+def _package(filename):
+    # Top-level package of a library file, for allocations made outside
+    # any app frame (imports, server, background threads)
+    parts = filename.split(os.sep)
+    for marker in ('site-packages', 'dist-packages'):
+        if marker in parts:
+            index = parts.index(marker) + 1
+            if index < len(parts):
+                return os.path.splitext(parts[index])[0]
+    return 'other'
+
+
+class _Owners:
+    """
+    Traceback -> (module, layer) of its innermost app frame, cached
+    """
+    def __init__(self):
+        self._cache = {}
+
+    def __call__(self, traceback):
+        owner = self._cache.get(traceback)
+        if owner is None:
+            module = None
+            # tracemalloc tracebacks are most recent call first
+            for frame in traceback:
+                module = _module(frame.filename)
+                if module is not None:
+                    break
+            if module is None:
+                owner = (_package(traceback[0].filename), 'other')
+            else:
+                owner = (module, layer(module) or 'app')
+            self._cache[traceback] = owner
+        return owner
+
+
+def _site(traceback):
+    frame = traceback[0]
+    filename = frame.filename
+    if filename.startswith(_ROOT_DIR + os.sep):
+        filename = os.path.relpath(filename, _ROOT_DIR)
+    return f'{filename}:{frame.lineno}'
+
+
+def _group(stats, owners, top, diff=False):
+    """
+    Sites, modules and layers of a list of tracemalloc statistics
+    """
+    size_key, count_key = ('size_diff', 'count_diff') if diff \
+        else ('size', 'count')
+    sites = defaultdict(lambda: [0, 0])
+    modules = defaultdict(lambda: [0, 0])
+    layers = defaultdict(int)
+    for stat in stats:
+        size, count = getattr(stat, size_key), getattr(stat, count_key)
+        site = sites[_site(stat.traceback)]
+        site[0] += size
+        site[1] += count
+        module, kind = owners(stat.traceback)
+        entry = modules[(module, kind)]
+        entry[0] += size
+        entry[1] += count
+        layers[kind] += size
+
+    def ranked(items):
+        return sorted(items, key=lambda item: -abs(item[1][0]))[:top]
+
+    return {
+        'sites': [{'site': site, 'size': size, 'count': count}
+                  for site, (size, count) in ranked(sites.items())],
+        'modules': [{'module': module, 'layer': kind, 'size': size,
+                     'count': count}
+                    for (module, kind), (size, count)
+                    in ranked(modules.items())],
+        'layers': dict(sorted(layers.items(), key=lambda item: -item[1])),
+    }
+
+
+class AllocationTracker:
+    """
+    Flask extension keeping tracemalloc snapshots and request counters
+
+    Configuration:
+        MEMORY_TRACE_FRAMES: Frames kept per allocation (more frames find
+            the app frame of deeper library calls, and cost more)
+        MEMORY_SNAPSHOTS_KEPT: Snapshots kept, the oldest are dropped
+        MEMORY_REQUEST_STATS: Count the allocations of each request from
+            the start (tracing on)
+    """
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        state = app.extensions['allocations'] = {
+            'frames': app.config.get('MEMORY_TRACE_FRAMES', 25),
+            'kept': app.config.get('MEMORY_SNAPSHOTS_KEPT', 4),
+            'snapshots': [],
+            'next_id': 1,
+            'started_tracing': False,
+            'requests': False,
+            # endpoint -> [requests, net total, net max, peak max]
+            'endpoints': defaultdict(lambda: [0, 0, 0, 0]),
+        }
+
+        @app.before_request
+        def start_request():
+            if not state['requests'] or not tracemalloc.is_tracing():
+                return
+            # In the WSGI environ: batch sub-requests share g
+            request.environ['hbnb.allocations_started'] = \
+                tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+
+        @app.after_request
+        def end_request(response):
+            started = request.environ.pop('hbnb.allocations_started', None)
+            if started is None or not tracemalloc.is_tracing():
+                return response
+            current, peak = tracemalloc.get_traced_memory()
+            rule = request.url_rule
+            key = f"{request.method} {rule.endpoint if rule else 'unmatched'}"
+            with self._lock:
+                entry = state['endpoints'][key]
+                entry[0] += 1
+                entry[1] += current - started
+                entry[2] = max(entry[2], current - started)
+                entry[3] = max(entry[3], peak - started)
+            return response
+
+        if app.config.get('MEMORY_REQUEST_STATS', False):
+            self._trace(state)
+            state['requests'] = True
+
+    @staticmethod
+    def _state():
+        return current_app.extensions['allocations']
+
+    @staticmethod
+    def _trace(state):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(state['frames'])
+            state['started_tracing'] = True
+
+    def take_snapshot(self):
+        """
+        Snapshot the memory allocated now, tracing from now on if needed
+
+        Returns:
+            dict: Summary of the snapshot (id, time, traced memory);
+            'tracing_started' is True when tracing was off, the snapshot
+            then only holds what was allocated since
+        """
+        state = self._state()
+        with self._lock:
+            tracing_started = not tracemalloc.is_tracing()
+            self._trace(state)
+            snapshot = tracemalloc.take_snapshot().filter_traces(_IGNORED)
+            entry = {
+                'id': state['next_id'],
+                'taken_at': time.time(),
+                'snapshot': snapshot,
+                'size': sum(trace.size for trace in snapshot.traces),
+                'count': len(snapshot.traces),
+            }
+            state['next_id'] += 1
+            state['snapshots'].append(entry)
+            del state['snapshots'][:-state['kept']]
+        summary = self._summary(entry)
+        summary['tracing_started'] = tracing_started
+        return summary
+
+    @staticmethod
+    def _summary(entry):
+        return {key: entry[key] for key in ('id', 'taken_at', 'size',
+                                            'count')}
+
+    def snapshots(self):
+        """
+        Summaries of the snapshots kept, oldest first
+        """
+        return [self._summary(entry) for entry in self._state()['snapshots']]
+
+    def _find(self, snapshot_id):
+        for entry in self._state()['snapshots']:
+            if entry['id'] == snapshot_id:
+                return entry
+        return None
+
+    def report(self, snapshot_id, top=20, compare_to=None):
+        """
+        Top allocation sites and modules of a snapshot
+
+        Args:
+            snapshot_id (int): Snapshot reported
+            top (int): Sites and modules listed
+            compare_to (int, optional): Older snapshot: sizes are then
+                what was allocated (or freed, negative) since it
+
+        Returns:
+            dict: The report, None if a snapshot is not kept
+        """
+        entry = self._find(snapshot_id)
+        if entry is None:
+            return None
+        report = self._summary(entry)
+        if compare_to is None:
+            stats = entry['snapshot'].statistics('traceback')
+            report.update(_group(stats, _Owners(), top))
+            return report
+
+        older = self._find(compare_to)
+        if older is None:
+            return None
+        stats = entry['snapshot'].compare_to(older['snapshot'], 'traceback')
+        report['compared_to'] = compare_to
+        report['size_diff'] = entry['size'] - older['size']
+        report['count_diff'] = entry['count'] - older['count']
+        report.update(_group(stats, _Owners(), top, diff=True))
+        return report
+
+    def stop(self):
+        """
+        Drop the snapshots and request counters, stop tracing if it was
+        started here
+        """
+        state = self._state()
+        with self._lock:
+            state['snapshots'].clear()
+            state['requests'] = False
+            state['endpoints'].clear()
+            if state['started_tracing'] and tracemalloc.is_tracing():
+                tracemalloc.stop()
+            state['started_tracing'] = False
+
+    def count_requests(self, enabled):
+        """
+        Start (tracing on) or stop counting the allocations of requests;
+        stopping resets the counters
+        """
+        state = self._state()
+        with self._lock:
+            if enabled:
+                self._trace(state)
+            else:
+                state['endpoints'].clear()
+            state['requests'] = enabled
+
+    def request_stats(self):
+        """
+        Allocations of the requests counted, by endpoint, largest first
+
+        Returns:
+            dict: 'enabled' and 'endpoints', a list of dicts (endpoint,
+            requests, net_mean, net_max, peak_max), sizes in bytes
+        """
+        state = self._state()
+        with self._lock:
+            endpoints = [
+                {'endpoint': key, 'requests': count,
+                 'net_mean': round(net / count), 'net_max': net_max,
+                 'peak_max': peak_max}
+                for key, (count, net, net_max, peak_max)
+                in state['endpoints'].items()]
+        endpoints.sort(key=lambda entry: -entry['peak_max'])
+        return {'enabled': state['requests'] and tracemalloc.is_tracing(),
+                'endpoints': endpoints}
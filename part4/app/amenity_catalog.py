@@ -0,0 +1,178 @@
+#!/usr/bin/python3
+"""
+In-memory amenity catalog
+
+Amenities are a small, read-mostly table that most place pages need.
+The catalog keeps every amenity in memory, by ID and by normalized name,
+so lookups, duplicate name checks and amenity ID validation do not query
+the DB.
+
+Writes made through the facade update the catalog of the process that
+made them. Other processes notice changes with a version check: at most
+every AMENITY_CATALOG_CHECK_INTERVAL seconds, the row count and latest
+`updated_at` of the table are compared to the ones of the loaded
+snapshot, and the catalog is reloaded when they differ.
+"""
+
+import threading
+import time
+from collections import namedtuple
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from app.metrics import cache_lookup
+
+CatalogAmenity = namedtuple('CatalogAmenity', 'id name')
+
+
+def normalize_name(name):
+    """
+    Key used for name uniqueness: case and spacing are ignored
+    """
+    return ' '.join(name.split()).casefold()
+
+
+class _Snapshot:
+    """
+    Catalog content for one app, replaced as a whole on reload
+    """
+    def __init__(self, amenities=(), version=None):
+        self.by_id = {amenity.id: amenity for amenity in amenities}
+        self.by_name = {normalize_name(amenity.name): amenity
+                        for amenity in amenities}
+        self.version = version
+        self.checked_at = time.monotonic()
+
+
+class AmenityCatalog:
+    """
+    Flask extension holding the amenity catalog of each app
+
+    Configuration:
+        AMENITY_CATALOG_CHECK_INTERVAL: Seconds between two version
+            checks against the DB, 0 to check on every lookup
+    """
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions['amenity_catalog'] = {
+            'snapshot': None,
+            'interval': app.config.get('AMENITY_CATALOG_CHECK_INTERVAL', 1.0),
+        }
+
+    @staticmethod
+    def _state():
+        return current_app.extensions['amenity_catalog']
+
+    @staticmethod
+    def _version(session):
+        # Changes with every insert, update or delete of an amenity
+        from app.models.amenity import Amenity
+        count, updated = session.execute(
+            select(func.count(Amenity.id), func.max(Amenity.updated_at))).one()
+        return count, updated
+
+    def _load(self, session):
+        from app.models.amenity import Amenity
+        rows = session.execute(
+            select(Amenity.id, Amenity.name).order_by(Amenity.created_at))
+        amenities = [CatalogAmenity(*row) for row in rows]
+        return _Snapshot(amenities, self._version(session))
+
+    def snapshot(self):
+        """
+        Current catalog content, loaded or refreshed when needed
+        """
+        from app.extensions import db
+
+        state = self._state()
+        snapshot = state['snapshot']
+        if snapshot is not None and \
+                time.monotonic() - snapshot.checked_at < state['interval']:
+            cache_lookup('amenity_catalog', True)
+            return snapshot
+
+        # Checked against the DB, or loaded
+        cache_lookup('amenity_catalog', False)
+
+        with self._lock:
+            snapshot = state['snapshot']
+            if snapshot is None:
+                snapshot = state['snapshot'] = self._load(db.session)
+            elif time.monotonic() - snapshot.checked_at >= state['interval']:
+                if self._version(db.session) != snapshot.version:
+                    snapshot = state['snapshot'] = self._load(db.session)
+                else:
+                    snapshot.checked_at = time.monotonic()
+        return snapshot
+
+    def get(self, amenity_id):
+        """
+        Amenity by ID, None if unknown
+        """
+        return self.snapshot().by_id.get(str(amenity_id))
+
+    def get_by_name(self, name):
+        """
+        Amenity by name, ignoring case and spacing, None if unknown
+        """
+        return self.snapshot().by_name.get(normalize_name(name))
+
+    def all(self):
+        """
+        List of every amenity, in creation order
+        """
+        return list(self.snapshot().by_id.values())
+
+    def missing(self, amenity_ids):
+        """
+        IDs of a list that are not in the catalog, in the given order
+        """
+        by_id = self.snapshot().by_id
+        return [amenity_id for amenity_id in amenity_ids
+                if amenity_id not in by_id]
+
+    def put(self, amenity):
+        """
+        Add or replace an amenity after a write made by this process
+        """
+        state = self._state()
+        with self._lock:
+            snapshot = state['snapshot']
+            if snapshot is None:
+                return
+            entry = CatalogAmenity(amenity.id, amenity.name)
+            amenities = [entry if current.id == entry.id else current
+                         for current in snapshot.by_id.values()]
+            if entry.id not in snapshot.by_id:
+                amenities.append(entry)
+            # Without a version, the next check reloads the catalog once:
+            # it then matches the DB, even if this write is rolled back
+            updated = _Snapshot(amenities)
+            updated.checked_at = snapshot.checked_at
+            state['snapshot'] = updated
+
+    def invalidate(self):
+        """
+        Check the version against the DB on the next lookup
+        """
+        snapshot = self._state()['snapshot']
+        if snapshot is not None:
+            snapshot.checked_at = float('-inf')
+
+
+def _invalidate_on_rollback(session, previous_transaction):
+    # Amenities written in a rolled back transaction may be in the
+    # catalog: make the next lookup compare versions
+    if has_app_context():
+        state = current_app.extensions.get('amenity_catalog')
+        if state and state['snapshot'] is not None:
+            state['snapshot'].checked_at = float('-inf')
+
+
+event.listen(Session, 'after_soft_rollback', _invalidate_on_rollback)
@@ -0,0 +1,90 @@
+#!/usr/bin/python3
+"""
+Sparse fieldsets and opt-in includes
+
+Clients choose the shape of a resource with ``?fields=id,title,price``
+and ``?include=owner,amenities``. The requested shape is turned into a
+serializer plus the model columns and relationships the facade has to
+load, so only the data that is asked for is read from the DB.
+"""
+
+from collections import namedtuple
+
+from flask import request
+from flask_restx import abort
+
+from app.api.serialization import Nested
+
+# serializer: compiled Serializer for the requested shape
+# fields: model columns to load
+# include: model relationships to load
+Shape = namedtuple('Shape', ['serializer', 'fields', 'include'])
+
+MAX_CACHED_SHAPES = 256
+
+
+def _split(value):
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+class Fieldset:
+    """
+    Every field and include a resource can expose
+
+    Args:
+        serializer (Serializer): Serializer declaring all the plain fields
+            and all the Nested includes of the resource
+    """
+    def __init__(self, serializer):
+        self.serializer = serializer
+        self.sources = dict(serializer.fields)
+        self._shapes = {}
+
+    def _build(self, keys):
+        fields = []
+        include = []
+        for key in keys:
+            source = self.sources[key]
+            if isinstance(source, Nested):
+                include.append(source.attribute)
+            else:
+                fields.append(source)
+        return Shape(self.serializer.only(keys), fields, include)
+
+    def parse(self, default):
+        """
+        Resolve the shape requested by the current request
+
+        Args:
+            default (Serializer): Shape used for whatever the client
+                does not specify
+
+        Returns:
+            Shape: The serializer and the columns/relationships to load
+        """
+        default_fields = [key for key, source in default.fields
+                          if not isinstance(source, Nested)]
+        default_include = [key for key, source in default.fields
+                           if isinstance(source, Nested)]
+
+        # An empty ?fields= is the default fields, not an empty object
+        fields = _split(request.args.get('fields', '')) or default_fields
+        include = (_split(request.args['include'])
+                   if 'include' in request.args else default_include)
+
+        for key in fields:
+            if (key not in self.sources or
+                    isinstance(self.sources[key], Nested)):
+                abort(400, f"Unknown field: {key}")
+        for key in include:
+            if not isinstance(self.sources.get(key), Nested):
+                abort(400, f"Unknown include: {key}")
+
+        keys = tuple(dict.fromkeys(fields + include))
+        shape = self._shapes.get(keys)
+        if shape is None:
+            shape = self._build(keys)
+            # Keys come from the client, keep the cache bounded
+            if len(self._shapes) < MAX_CACHED_SHAPES:
+                self._shapes[keys] = shape
+        return shape
@@ -0,0 +1,79 @@
+#!/usr/bin/python3
+"""
+Cursor pagination helpers
+
+A cursor is an opaque token holding the sort key and the (value, id)
+of the last item of a page; the next page starts right after it. It
+stays valid while rows are added, unlike page numbers or offsets.
+Pages keep the body a plain JSON array, the next page is announced in
+the `Link` (rel="next") and `X-Next-Cursor` headers.
+"""
+
+import base64
+import json
+from datetime import datetime
+
+from flask import current_app, request, url_for
+from flask_restx import abort
+
+
+def encode_cursor(sort, value, obj_id):
+    """
+    Build the cursor pointing after an item
+
+    Args:
+        sort (str): Sort key the page was read with
+        value: Value of the sort column for the item, dates as stored
+            (text)
+        obj_id (str): ID of the item
+    """
+    payload = json.dumps([sort, value, obj_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor, sort):
+    """
+    Read a cursor made by encode_cursor, aborting with 400 when it is
+    invalid or was made for another sort key
+
+    Returns:
+        tuple: (value, id) of the last item of the previous page
+    """
+    try:
+        payload = base64.urlsafe_b64decode(cursor.encode('ascii'))
+        cursor_sort, value, obj_id = json.loads(payload)
+        if cursor_sort != sort or not isinstance(obj_id, str):
+            raise ValueError('cursor for another sort')
+        if sort.lstrip('-') == 'created_at':
+            # Kept as stored, only checked to be a date
+            datetime.fromisoformat(value)
+    except (ValueError, TypeError, UnicodeError):
+        abort(400, 'Invalid cursor')
+    return value, obj_id
+
+
+def page_limit(default_key, max_key):
+    """
+    Page size requested with ?limit=, bounded by the configuration
+    """
+    default = current_app.config.get(default_key, 50)
+    maximum = current_app.config.get(max_key, 500)
+    try:
+        limit = int(request.args.get('limit', default))
+    except ValueError:
+        abort(400, 'limit must be an integer')
+    if limit < 1:
+        abort(400, 'limit must be positive')
+    return min(limit, maximum)
+
+
+def next_page_headers(cursor):
+    """
+    Headers announcing the next page, empty on the last page
+    """
+    if cursor is None:
+        return {}
+    args = request.args.to_dict()
+    args['cursor'] = cursor
+    url = url_for(request.endpoint, **request.view_args, **args)
+    return {'Link': f'<{url}>; rel="next"', 'X-Next-Cursor': cursor}
@@ -0,0 +1,162 @@
+#!/usr/bin/python3
+"""
+Serialization of models into API output
+
+The output shape of each model is declared once with a `Serializer`.
+Declarations are compiled into a plain Python function building the
+dict in a single expression, which avoids per-field loops and getattr
+calls at request time. The resulting structures are encoded by `dumps`,
+backed by orjson when it is installed.
+"""
+
+import json
+import keyword
+from decimal import Decimal
+
+from flask import current_app, make_response
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, the stdlib encoder is the fallback
+    orjson = None
+
+
+def _default(obj):
+    """
+    Encode the few non-JSON types our models can hold
+    """
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if hasattr(obj, 'isoformat'):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} "
+                    f"is not JSON serializable")
+
+
+def dumps(data, indent=None):
+    """
+    Encode data to JSON bytes
+
+    Args:
+        data: Structure made of dicts, lists and scalars
+        indent (int, optional): Pretty print the output
+
+    Returns:
+        bytes: The encoded document
+    """
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 if indent else 0
+        return orjson.dumps(data, default=_default, option=option)
+    if indent:
+        return json.dumps(data, default=_default, indent=indent).encode()
+    return json.dumps(data, default=_default,
+                      separators=(',', ':')).encode()
+
+
+def output_json(data, code, headers=None):
+    """
+    flask-restx representation for application/json using `dumps`
+    """
+    settings = current_app.config.get('RESTX_JSON', {})
+    indent = settings.get('indent', 4 if current_app.debug else None)
+
+    resp = make_response(dumps(data, indent=indent) + b'\n', code)
+    resp.headers.extend(headers or {})
+    return resp
+
+
+class Nested:
+    """
+    Embed another serializer for a relationship
+
+    Args:
+        serializer (Serializer): Serializer of the related object
+        attribute (str, optional): Model attribute holding the related
+            object(s), defaults to the output key
+        many (bool): The relationship is a collection
+    """
+    def __init__(self, serializer, attribute=None, many=False):
+        self.serializer = serializer
+        self.attribute = attribute
+        self.many = many
+
+
+class Serializer:
+    """
+    Declared output shape of a model, compiled to a fast encoder
+
+    Fields are given as a list where each item is either an attribute
+    name, an (output key, attribute name) pair, or an
+    (output key, Nested) pair.
+
+    Example:
+        owner = Serializer('Owner', ['id', 'first_name'])
+        place = Serializer('Place', ['id', 'title',
+                                     ('owner', Nested(owner, 'user'))])
+        place(place_obj)        # -> dict
+        place.many(places)      # -> list of dicts
+    """
+    def __init__(self, name, fields):
+        self.name = name
+        self.fields = []
+        for field in fields:
+            if isinstance(field, str):
+                field = (field, field)
+            key, source = field
+            if isinstance(source, Nested) and source.attribute is None:
+                source.attribute = key
+            self.fields.append((key, source))
+        self.keys = tuple(key for key, _ in self.fields)
+        self._encode = self._compile()
+
+    def _compile(self):
+        """
+        Generate the source of the encoder function and exec it
+        """
+        namespace = {}
+        items = []
+        for index, (key, source) in enumerate(self.fields):
+            attribute = source.attribute if isinstance(source, Nested) \
+                else source
+            if not attribute.isidentifier() or keyword.iskeyword(attribute):
+                raise ValueError(f"Invalid attribute name: {attribute!r}")
+
+            if isinstance(source, Nested):
+                encoder = f'_nested_{index}'
+                namespace[encoder] = source.serializer._encode
+                if source.many:
+                    value = (f'[{encoder}(item) for item in obj.{attribute}]'
+                             f' if obj.{attribute} is not None else []')
+                else:
+                    value = (f'{encoder}(obj.{attribute})'
+                             f' if obj.{attribute} is not None else None')
+            else:
+                value = f'obj.{attribute}'
+            items.append(f'{key!r}: {value}')
+
+        source = 'def encode(obj):\n    return {' + ', '.join(items) + '}\n'
+        exec(compile(source, f'<serializer {self.name}>', 'exec'), namespace)
+        return namespace['encode']
+
+    def only(self, keys):
+        """
+        Derive a serializer restricted to some of the output keys
+
+        Args:
+            keys (iterable): Output keys to keep, unknown keys are ignored
+
+        Returns:
+            Serializer: A new compiled serializer
+        """
+        keys = set(keys)
+        return Serializer(self.name,
+                          [field for field in self.fields if field[0] in keys])
+
+    def __call__(self, obj):
+        return self._encode(obj)
+
+    def many(self, objs):
+        encode = self._encode
+        return [encode(obj) for obj in objs]
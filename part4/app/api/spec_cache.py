@@ -0,0 +1,131 @@
+#!/usr/bin/python3
+"""
+Swagger specification cached on disk
+
+flask-restx builds the Swagger JSON by walking every resource and model
+the first time /swagger.json is requested, in every worker process. The
+spec only changes when the API declaration changes, so it is stored in a
+file named after a hash of that declaration (models, routes and their
+documentation) and read back by later processes.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import threading
+
+from flask import current_app
+from flask_restx import Api
+from flask_restx.swagger import Swagger
+
+
+def _default(obj):
+    # Fields, parsers and other objects found in the resource docs,
+    # described without their address so the hash is stable
+    schema = getattr(obj, '__schema__', None)
+    if schema is not None:
+        return schema
+    name = getattr(obj, '__qualname__', None) or getattr(obj, 'name', None)
+    if isinstance(name, str):
+        return name
+    return f'{type(obj).__module__}.{type(obj).__qualname__}'
+
+
+class CachedSpecApi(Api):
+    """
+    Api whose Swagger specification is read from a cache file when the
+    API declaration did not change since it was written
+
+    Configuration:
+        SWAGGER_CACHE: Turn the file cache on or off
+        SWAGGER_CACHE_DIR: Directory of the cache files, the instance
+            folder by default
+    """
+    def __init__(self, *args, **kwargs):
+        self._spec = None
+        self._spec_lock = threading.Lock()
+        super().__init__(*args, **kwargs)
+
+    def spec_key(self):
+        """
+        Hash of everything the Swagger specification is built from
+
+        Returns:
+            str: Hex digest identifying the specification
+        """
+        declaration = {
+            'info': [self.title, self.version, self.description],
+            'base_path': self.base_path,
+            'host': current_app.config.get('SERVER_NAME'),
+            'models': {name: model.__schema__
+                       for name, model in sorted(self.models.items())},
+            'namespaces': [],
+        }
+        for namespace in self.namespaces:
+            resources = []
+            for resource in namespace.resources:
+                view = resource.resource
+                methods = {}
+                for method in sorted(view.methods or ()):
+                    func = getattr(view, method.lower(), None)
+                    if func is not None:
+                        methods[method] = [inspect.getdoc(func),
+                                           getattr(func, '__apidoc__', None)]
+                resources.append([list(resource.urls), resource.route_doc,
+                                  inspect.getdoc(view),
+                                  getattr(view, '__apidoc__', None),
+                                  methods])
+            declaration['namespaces'].append(
+                [namespace.name, namespace.path, namespace.description,
+                 resources])
+
+        encoded = json.dumps(declaration, sort_keys=True, default=_default)
+        return hashlib.blake2b(encoded.encode('utf-8'),
+                               digest_size=16).hexdigest()
+
+    def _cache_path(self, key):
+        directory = (current_app.config.get('SWAGGER_CACHE_DIR')
+                     or os.path.join(current_app.instance_path, 'swagger'))
+        return os.path.join(directory, f'swagger-{key}.json')
+
+    def _load_spec(self):
+        if not current_app.config.get('SWAGGER_CACHE', True):
+            return Swagger(self).as_dict()
+
+        path = self._cache_path(self.spec_key())
+        try:
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            pass
+
+        spec = Swagger(self).as_dict()
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Written under a temporary name: concurrent workers never
+            # read a partial file
+            tmp = f'{path}.{os.getpid()}.tmp'
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(spec, f)
+            os.replace(tmp, path)
+        except OSError:
+            current_app.logger.warning('Could not write the Swagger cache '
+                                       'to %s', path)
+        return spec
+
+    @property
+    def __schema__(self):
+        """
+        The Swagger specification, built or read once per process
+        """
+        if self._spec is None:
+            with self._spec_lock:
+                if self._spec is None:
+                    try:
+                        self._spec = self._load_spec()
+                    except Exception:
+                        msg = 'Unable to render schema'
+                        current_app.logger.exception(msg)
+                        return {'error': msg}
+        return self._spec
@@ -0,0 +1,89 @@
+#!/usr/bin/python3
+"""
+Streaming output for large collections
+
+A list endpoint can answer with NDJSON (one JSON document per line) when
+the client sends ``Accept: application/x-ndjson``, or with a chunked JSON
+array when it passes ``?stream=1``. Rows are serialized and written as
+they come out of the DB cursor so memory stays flat.
+"""
+
+from flask import Response, current_app, request, stream_with_context
+
+from app.api.serialization import dumps
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+# Flush to the socket once this many bytes are buffered
+STREAM_FLUSH_SIZE = 16 * 1024
+
+
+def wants_ndjson():
+    """
+    True when the client explicitly prefers NDJSON over JSON
+    """
+    best = request.accept_mimetypes.best_match(
+        ['application/json', NDJSON_MIMETYPE])
+    return best == NDJSON_MIMETYPE
+
+
+def wants_stream():
+    """
+    True when the request selects one of the streaming modes
+    """
+    stream = request.args.get('stream', '').lower()
+    return stream in ('1', 'true', 'yes') or wants_ndjson()
+
+
+def stream_batch_size():
+    """
+    Number of rows loaded from the DB per cursor batch
+    """
+    return current_app.config.get('STREAM_BATCH_SIZE', 1000)
+
+
+def _buffered(pieces):
+    buffer = []
+    size = 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= STREAM_FLUSH_SIZE:
+            yield b''.join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def _ndjson_lines(rows, serialize):
+    for row in rows:
+        yield dumps(serialize(row)) + b'\n'
+
+
+def _json_array(rows, serialize):
+    yield b'['
+    separator = b''
+    for row in rows:
+        yield separator + dumps(serialize(row))
+        separator = b','
+    yield b']'
+
+
+def stream_response(rows, serialize):
+    """
+    Build a streamed response out of an iterable of model objects
+
+    Args:
+        rows (iterable): Objects to output, typically a yield_per query
+        serialize (callable): Turns one object into a JSON-able dict
+
+    Returns:
+        Response: NDJSON or chunked JSON array response
+    """
+    if wants_ndjson():
+        body, mimetype = _ndjson_lines(rows, serialize), NDJSON_MIMETYPE
+    else:
+        body, mimetype = _json_array(rows, serialize), 'application/json'
+
+    return Response(stream_with_context(_buffered(body)), mimetype=mimetype)
@@ -1,6 +1,9 @@
 from flask_restx import Namespace, Resource, fields
 from app.services import facade
+from app.api.v1.serializers import amenity_serializer
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.extensions import limiter
+from app.ratelimit import by_user_or_ip
 
 api = Namespace("amenities", description="Amenity operations")
 
@@ -20,6 +23,7 @@ class AmenityList(Resource):
     @api.response(201, "Amenity successfully created")
     @api.response(400, "Invalid input data")
     @jwt_required()
+    @limiter.limit('write', by_user_or_ip)
     def post(self):
         """
         Add a new amenity (Only for admin users)
@@ -37,16 +41,12 @@ class AmenityList(Resource):
 
         amenity_data = api.payload
 
-        amenities = facade.get_all_amenities()
-        for amenity_item in amenities:
-            if amenity_item.name == amenity_data["name"]:
-                return {"error": "Amenity already registered"}, 400
+        # Names are unique regardless of case and spacing
+        if facade.get_amenity_by_name(amenity_data["name"]):
+            return {"error": "Amenity already registered"}, 400
 
         new_amenity = facade.create_amenity(amenity_data)
-        return {
-            "id": new_amenity.id,
-            "name": new_amenity.name
-        }, 201
+        return amenity_serializer(new_amenity), 201
 
     @api.response(200, "List of amenities retrieved successfully")
     def get(self):
@@ -60,13 +60,7 @@ class AmenityList(Resource):
         """
         amenities = facade.get_all_amenities()
 
-        return [
-            {
-                "id": amenity_item.id,
-                "name": amenity_item.name
-            }
-            for amenity_item in amenities
-        ], 200
+        return amenity_serializer.many(amenities), 200
 
 
 @api.route("/<amenity_id>")
@@ -90,10 +84,7 @@ class AmenityResource(Resource):
         if not amenity:
             return {"error": "Amenity not found"}, 404
         else:
-            return {
-                "id": amenity.id,
-                "name": amenity.name
-            }, 200
+            return amenity_serializer(amenity), 200
 
     @api.expect(amenity_model, validate=True)
     @api.response(200, "Amenity updated successfully")
@@ -101,6 +92,7 @@ class AmenityResource(Resource):
     @api.response(400, "Invalid input data")
     @api.response(409, "Duplicate amenity name")
     @jwt_required()
+    @limiter.limit('write', by_user_or_ip)
     def put(self, amenity_id):
         """
         Update amenity details by ID.
@@ -132,7 +124,4 @@ class AmenityResource(Resource):
         if not amenity:
             return {"error": "Amenity not found"}, 404
         else:
-            return {
-                "id": amenity.id,
-                "name": amenity.name
-            }, 200
+            return amenity_serializer(amenity), 200
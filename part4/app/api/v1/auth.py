@@ -1,6 +1,8 @@
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import create_access_token
 from app.services import facade
+from app.extensions import limiter
+from app.ratelimit import by_ip, by_json_field
 
 
 api = Namespace('auth', description='Authentication operations')
@@ -15,16 +17,19 @@ login_model = api.model('Login', {
 @api.route('/login')
 class Login(Resource):
     @api.expect(login_model)
+    @api.response(429, 'Too many login attempts')
+    @limiter.limit('login_ip', by_ip)
+    @limiter.limit('login_email', by_json_field('email'))
     def post(self):
         """Authenticate user and return a JWT token"""
         # Get the email and password from the request payload
         credentials = api.payload
 
-        # Step 1: Retrieve the user based on the provided email
-        user = facade.get_user_by_email(credentials['email'])
-
-        # Step 2: Check if the user exists and the password is correct
-        if not user or not user.verify_password(credentials['password']):
+        # Step 1 & 2: Retrieve the user and check the password
+        # (rehashed on the fly if the bcrypt cost factor changed)
+        user = facade.authenticate(credentials['email'],
+                                   credentials['password'])
+        if not user:
             return {'error': 'Invalid credentials'}, 401
 
         # Step 3: Create a JWT token with the user's id and is_admin flag
@@ -0,0 +1,209 @@
+""" Batch endpoint running several API calls in one HTTP round trip """
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app, request
+from flask_restx import Namespace, Resource, fields
+from werkzeug.test import EnvironBuilder
+
+from app.persistence.transaction import atomic
+
+api = Namespace('batch', description='Batch operations')
+
+READ_METHODS = ('GET', 'HEAD')
+
+sub_request_model = api.model('BatchSubRequest', {
+    'id': fields.String(
+        description='Client reference echoed back in the response'),
+    'method': fields.String(
+        required=True,
+        description='HTTP method',
+        enum=['GET', 'HEAD', 'POST', 'PUT', 'DELETE']),
+    'path': fields.String(
+        required=True,
+        description='API path, with an optional query string '
+                    '(e.g. /api/v1/places/<id>/reviews?limit=10)'),
+    'body': fields.Raw(description='JSON body of the request'),
+    'headers': fields.Raw(
+        description='Extra headers, Authorization defaults to '
+                    'the one of the batch request')
+})
+
+batch_model = api.model('Batch', {
+    'requests': fields.List(
+        fields.Nested(sub_request_model),
+        required=True,
+        description='Requests to run, writes run in the given order'),
+    'atomic': fields.Boolean(
+        default=False,
+        description='Run every request in a single transaction, '
+                    'rolled back if one of them fails')
+})
+
+
+def _build_environ(sub_request):
+    """
+    Build the WSGI environ of a sub-request from the batch request
+    """
+    headers = {}
+    if 'Authorization' in request.headers:
+        headers['Authorization'] = request.headers['Authorization']
+    headers.update(sub_request.get('headers') or {})
+    # Sub-responses are embedded in the batch response, never compress them
+    headers.pop('Accept-Encoding', None)
+
+    kwargs = {}
+    if sub_request.get('body') is not None:
+        kwargs['json'] = sub_request['body']
+
+    builder = EnvironBuilder(
+        path=sub_request['path'],
+        method=sub_request['method'].upper(),
+        base_url=request.host_url,
+        headers=headers,
+        environ_base={'REMOTE_ADDR': request.remote_addr},
+        **kwargs)
+    try:
+        return builder.get_environ()
+    finally:
+        builder.close()
+
+
+def _dispatch(app, environ):
+    """
+    Run one sub-request through the Flask app, in process
+
+    Returns:
+        tuple: status code and decoded body
+    """
+    with app.request_context(environ):
+        try:
+            response = app.full_dispatch_request()
+        except Exception:
+            current_app.logger.exception('Batch sub-request failed')
+            return 500, {'error': 'Internal server error'}
+        data = response.get_data(as_text=True)
+        status = response.status_code
+
+    if not data:
+        return status, None
+    try:
+        return status, json.loads(data)
+    except ValueError:
+        return status, data
+
+
+def _result(sub_request, status, body):
+    result = {'status': status, 'body': body}
+    if sub_request.get('id') is not None:
+        result['id'] = sub_request['id']
+    return result
+
+
+class _BatchFailed(Exception):
+    """
+    Raised to roll back an atomic batch
+    """
+
+
+@api.route('/batch')
+class Batch(Resource):
+    @api.expect(batch_model, validate=True)
+    @api.response(200, 'Every sub-request was executed')
+    @api.response(400, 'Invalid batch')
+    def post(self):
+        """
+        Run several API requests in a single HTTP call
+
+        Consecutive read requests run concurrently, writes run one at a
+        time in the given order. Each sub-request is authenticated with
+        its own Authorization header, or the one of the batch request.
+
+        With `atomic`, every request runs in one DB transaction: the
+        first sub-request answering with an error status rolls back all
+        the writes and the remaining ones are not executed (status 424).
+        The requests executed before it are rolled back too: they are
+        answered with status 424 and "rolled_back": true, their bodies
+        (e.g. the IDs they created) are dropped.
+
+        Returns:
+            tuple: A tuple containing:
+                - list: One {"id", "status", "body"} entry per sub-request
+                - int: HTTP status code (200, or 400 for an invalid batch)
+        """
+        app = current_app._get_current_object()
+        batch = api.payload
+        sub_requests = batch['requests']
+
+        if len(sub_requests) > app.config.get('BATCH_MAX_REQUESTS', 20):
+            return {'error': 'Too many requests in batch'}, 400
+        for sub_request in sub_requests:
+            path = sub_request['path'].split('?', 1)[0]
+            if not path.startswith('/api/') or path.rstrip('/') == request.path:
+                return {'error': f"Invalid path: {sub_request['path']}"}, 400
+
+        environs = [_build_environ(sub_request) for sub_request in sub_requests]
+
+        if batch.get('atomic'):
+            return self._run_atomic(app, sub_requests, environs), 200
+        return self._run(app, sub_requests, environs), 200
+
+    @staticmethod
+    def _run(app, sub_requests, environs):
+        """
+        Run reads concurrently by groups, and writes in order
+        """
+        results = [None] * len(sub_requests)
+        max_workers = app.config.get('BATCH_MAX_WORKERS', 4)
+
+        def run_one(index):
+            # A fresh app context gives the sub-request its own DB session
+            with app.app_context():
+                results[index] = _result(
+                    sub_requests[index], *_dispatch(app, environs[index]))
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            reads = []
+            for index, sub_request in enumerate(sub_requests):
+                if sub_request['method'].upper() in READ_METHODS:
+                    reads.append(index)
+                    continue
+                # Previous reads must see the state before this write
+                list(executor.map(run_one, reads))
+                reads = []
+                run_one(index)
+            list(executor.map(run_one, reads))
+
+        return results
+
+    @staticmethod
+    def _run_atomic(app, sub_requests, environs):
+        """
+        Run every sub-request in order inside one transaction
+        """
+        results = []
+        failed = False
+        try:
+            with atomic():
+                for sub_request, environ in zip(sub_requests, environs):
+                    if failed:
+                        results.append(_result(sub_request, 424, {
+                            'error': 'Not executed, a previous request failed'
+                        }))
+                        continue
+                    status, body = _dispatch(app, environ)
+                    results.append(_result(sub_request, status, body))
+                    failed = status >= 400
+                if failed:
+                    raise _BatchFailed()
+        except _BatchFailed:
+            # Earlier successes were undone, don't report what they did
+            for index, result in enumerate(results):
+                if result['status'] >= 400:
+                    break
+                results[index] = _result(sub_requests[index], 424, {
+                    'error': 'Rolled back, a later request failed'
+                })
+                results[index]['rolled_back'] = True
+        return results
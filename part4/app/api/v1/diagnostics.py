@@ -0,0 +1,198 @@
+""" Diagnostics endpoints for admins: CPU and memory profiling """
+
+from flask import Response, current_app, request
+from flask_jwt_extended import jwt_required
+from flask_restx import Namespace, Resource
+
+from app.api.v1.exports import admin_required
+from app.extensions import allocations
+from app.profiler import FORMATS, ProfilerBusy, SamplingProfiler
+
+api = Namespace('admin', description='Diagnostics of the running worker')
+
+
+@api.route('/profile')
+class Profile(Resource):
+    @api.response(200, 'Profile recorded')
+    @api.response(400, 'Invalid duration, interval or format')
+    @api.response(403, 'Admin privileges required')
+    @api.response(409, 'A profile is already being recorded')
+    @api.doc(params={
+        'seconds': 'How long to sample (default 10, at most '
+                   'PROFILER_MAX_SECONDS)',
+        'interval': 'Seconds between two samples (default '
+                    'PROFILER_INTERVAL)',
+        'format': 'collapsed (default), speedscope or summary',
+    })
+    @jwt_required()
+    def post(self):
+        """
+        Sample the request threads of this worker for some seconds
+
+        The call returns when the profile is done. `collapsed` stacks
+        feed flamegraph.pl or speedscope, `speedscope` is the JSON file
+        format of https://www.speedscope.app, `summary` lists the
+        hottest endpoint, facade and repository functions.
+        """
+        error = admin_required()
+        if error:
+            return error
+
+        config = current_app.config
+        fmt = request.args.get('format', 'collapsed')
+        if fmt not in FORMATS:
+            return {'error': f"Unknown format: {fmt}"}, 400
+        try:
+            seconds = float(request.args.get('seconds', 10))
+            interval = float(request.args.get(
+                'interval', config.get('PROFILER_INTERVAL', 0.01)))
+        except ValueError:
+            return {'error': 'seconds and interval must be numbers'}, 400
+        if not 0 < seconds <= config.get('PROFILER_MAX_SECONDS', 60):
+            return {'error': 'seconds must be between 0 and '
+                             f"{config.get('PROFILER_MAX_SECONDS', 60)}"}, 400
+        if not 0.001 <= interval <= 1:
+            return {'error': 'interval must be between 0.001 and 1'}, 400
+
+        try:
+            profile = SamplingProfiler(interval).record(seconds)
+        except ProfilerBusy as e:
+            return {'error': str(e)}, 409
+
+        headers = {
+            'X-Profile-Samples': str(profile.samples),
+            'X-Profile-Overhead': f'{profile.overhead * 100:.2f}%',
+        }
+        if fmt == 'collapsed':
+            return Response(profile.collapsed(), mimetype='text/plain',
+                            headers=headers)
+        if fmt == 'speedscope':
+            return profile.speedscope(f'hbnb {seconds:g}s'), 200, headers
+        return profile.summary(), 200, headers
+
+
+@api.route('/memory/snapshots')
+class MemorySnapshotList(Resource):
+    @api.response(201, 'Snapshot taken')
+    @api.response(403, 'Admin privileges required')
+    @jwt_required()
+    def post(self):
+        """
+        Snapshot the memory allocated by Python (tracemalloc)
+
+        Tracing starts with the first snapshot, which then only holds
+        what is allocated from then on: take a second one later and
+        compare them.
+        """
+        error = admin_required()
+        if error:
+            return error
+        return allocations.take_snapshot(), 201
+
+    @api.response(200, 'Snapshots kept')
+    @api.response(403, 'Admin privileges required')
+    @jwt_required()
+    def get(self):
+        """
+        List the snapshots kept (MEMORY_SNAPSHOTS_KEPT at most)
+        """
+        error = admin_required()
+        if error:
+            return error
+        return allocations.snapshots(), 200
+
+    @api.response(204, 'Snapshots dropped, tracing stopped')
+    @api.response(403, 'Admin privileges required')
+    @jwt_required()
+    def delete(self):
+        """
+        Drop the snapshots and request counters, stop tracing
+        """
+        error = admin_required()
+        if error:
+            return error
+        allocations.stop()
+        return '', 204
+
+
+@api.route('/memory/snapshots/<int:snapshot_id>')
+class MemorySnapshot(Resource):
+    @api.response(200, 'Top allocations of the snapshot')
+    @api.response(400, 'Invalid top')
+    @api.response(403, 'Admin privileges required')
+    @api.response(404, 'Snapshot not found')
+    @api.doc(params={
+        'top': 'Sites and modules listed (default 20)',
+        'compare': 'ID of an older snapshot: report what grew since',
+    })
+    @jwt_required()
+    def get(self, snapshot_id):
+        """
+        Top allocation sites and app modules of a snapshot
+
+        Allocations made by libraries (SQLAlchemy, Flask) are counted in
+        the innermost app module of their traceback, sorted in layers:
+        endpoint, facade, repository, model.
+        """
+        error = admin_required()
+        if error:
+            return error
+        try:
+            top = int(request.args.get('top', 20))
+            compare = request.args.get('compare')
+            compare = int(compare) if compare is not None else None
+        except ValueError:
+            return {'error': 'top and compare must be integers'}, 400
+        if top < 1:
+            return {'error': 'top must be positive'}, 400
+
+        report = allocations.report(snapshot_id, top, compare)
+        if report is None:
+            return {'error': 'Snapshot not found'}, 404
+        return report, 200
+
+
+@api.route('/memory/requests')
+class MemoryRequests(Resource):
+    @api.response(200, 'Allocations by endpoint')
+    @api.response(403, 'Admin privileges required')
+    @jwt_required()
+    def get(self):
+        """
+        Memory allocated by the requests counted, by endpoint
+
+        net: still allocated when the response is built (mean and max),
+        peak: highest memory during the request over its start (exact
+        with one request at a time), in bytes.
+        """
+        error = admin_required()
+        if error:
+            return error
+        return allocations.request_stats(), 200
+
+    @api.response(200, 'Counting started')
+    @api.response(403, 'Admin privileges required')
+    @jwt_required()
+    def post(self):
+        """
+        Count the allocations of every request (tracing on)
+        """
+        error = admin_required()
+        if error:
+            return error
+        allocations.count_requests(True)
+        return allocations.request_stats(), 200
+
+    @api.response(204, 'Counting stopped')
+    @api.response(403, 'Admin privileges required')
+    @jwt_required()
+    def delete(self):
+        """
+        Stop counting and reset the counters (tracing stays on until the
+        snapshots are dropped)
+        """
+        error = admin_required()
+        if error:
+            return error
+        allocations.count_requests(False)
+        return '', 204
@@ -0,0 +1,128 @@
+""" Bulk export endpoints (admin only) """
+
+import os
+
+from flask import current_app, request, send_file, url_for
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_restx import Namespace, Resource
+
+from app.services import facade
+from app.extensions import limiter
+from app.ratelimit import by_user_or_ip
+from app.services.bulk_export import FORMATS, KINDS
+
+api = Namespace('export', description='Bulk export operations')
+
+MIMETYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+def export_dir():
+    """
+    Directory export files are written to
+    """
+    return current_app.config.get('EXPORT_DIR') or \
+        os.path.join(current_app.instance_path, 'exports')
+
+
+def with_links(job):
+    job = dict(job)
+    job['status_url'] = url_for('export_export_job', job_id=job['id'])
+    if job['status'] == 'done':
+        job['download_url'] = url_for('export_export_download',
+                                      job_id=job['id'])
+    return job
+
+
+def admin_required():
+    """
+    Error response when the current user is not an admin, else None
+    """
+    current_user = get_jwt_identity()
+    if not current_user.get('is_admin'):
+        return {'error': 'Admin privileges required'}, 403
+    return None
+
+
+@api.route('/<kind>')
+@api.param('kind', 'What to export: places or reviews')
+@api.param('format', 'ndjson (default) or csv')
+class ExportList(Resource):
+    @api.response(202, 'Export started')
+    @api.response(400, 'Invalid export kind or format')
+    @api.response(403, 'Admin privileges required')
+    @jwt_required()
+    @limiter.limit('bulk', by_user_or_ip)
+    def post(self, kind):
+        """
+        Start exporting places (with owner and amenities) or reviews
+
+        The export runs in a background worker, poll `status_url` until
+        the job is done then fetch `download_url`.
+        """
+        error = admin_required()
+        if error:
+            return error
+
+        fmt = request.args.get('format', 'ndjson').lower()
+        if kind not in KINDS:
+            return {'error': f"Unknown export kind: {kind}"}, 400
+        if fmt not in FORMATS:
+            return {'error': f"Unknown format: {fmt}"}, 400
+
+        job = facade.start_export(
+            kind, fmt, export_dir(),
+            batch_size=current_app.config.get('EXPORT_BATCH_SIZE', 1000))
+        return with_links(job), 202
+
+
+@api.route('/jobs/<job_id>')
+class ExportJob(Resource):
+    @api.response(200, 'Export job status')
+    @api.response(404, 'Export job not found')
+    @jwt_required()
+    def get(self, job_id):
+        """Get the status of an export job"""
+        error = admin_required()
+        if error:
+            return error
+
+        job, _ = facade.get_export(job_id, export_dir())
+        if not job:
+            return {'error': 'Export job not found'}, 404
+        return with_links(job), 200
+
+
+@api.route('/jobs/<job_id>/download')
+class ExportDownload(Resource):
+    @api.response(200, 'Export file')
+    @api.response(206, 'Requested range of the export file')
+    @api.response(404, 'Export job not found')
+    @api.response(409, 'Export not finished')
+    @jwt_required()
+    def get(self, job_id):
+        """
+        Download a finished export
+
+        Supports `Range` and `If-Range` requests so interrupted downloads
+        can be resumed. The file is sent with the server's zero-copy
+        file wrapper when available.
+        """
+        error = admin_required()
+        if error:
+            return error
+
+        job, path = facade.get_export(job_id, export_dir())
+        if not job:
+            return {'error': 'Export job not found'}, 404
+        if job['status'] != 'done':
+            return {'error': f"Export is {job['status']}"}, 409
+
+        return send_file(
+            path,
+            mimetype=MIMETYPES[job['format']],
+            as_attachment=True,
+            download_name=f"{job['kind']}-{job['id']}.{job['format']}",
+            conditional=True)
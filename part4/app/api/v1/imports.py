@@ -0,0 +1,81 @@
+""" Bulk import endpoint (admin only) """
+
+import io
+
+from flask import current_app, request
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_restx import Namespace, Resource
+
+from app.services import facade
+from app.extensions import limiter
+from app.ratelimit import by_user_or_ip
+from app.services.bulk_import import FORMATS, IMPORTERS
+from app.api.v1.amenities import amenity_model
+from app.api.v1.places import place_model
+from app.api.v1.reviews import review_model
+
+api = Namespace('import', description='Bulk import operations')
+
+# Rows are validated against the same models as the single-row endpoints
+IMPORT_MODELS = {
+    'amenities': amenity_model,
+    'places': place_model,
+    'reviews': review_model,
+}
+
+
+def request_format():
+    """
+    Format of the uploaded body, from ?format= or the Content-Type
+    """
+    fmt = request.args.get('format')
+    if fmt:
+        return fmt.lower()
+    return 'csv' if request.mimetype == 'text/csv' else 'ndjson'
+
+
+@api.route('/<kind>')
+@api.param('kind', 'What to import: places, amenities or reviews')
+@api.param('format', 'ndjson (default) or csv, also read from Content-Type')
+class BulkImport(Resource):
+    @api.response(200, 'Import finished, see the report for rejected rows')
+    @api.response(400, 'Invalid import kind or format')
+    @api.response(403, 'Admin privileges required')
+    @jwt_required()
+    @limiter.limit('bulk', by_user_or_ip)
+    def post(self, kind):
+        """
+        Stream-import rows from an NDJSON or CSV body (Only for admin users)
+
+        Each line (NDJSON) or row (CSV, with a header line) is validated
+        against the API model of the resource and inserted in batches.
+        Places without an `owner_id` are owned by the current admin, in
+        CSV files the `amenities` column is a ';' separated list of IDs.
+
+        Returns:
+            tuple: A tuple containing:
+                - dict: The import report
+                  ({"inserted", "failed", "errors": [{"line", "errors"}]})
+                - int: HTTP status code
+        """
+        current_user = get_jwt_identity()
+        if not current_user.get('is_admin'):
+            return {'error': 'Admin privileges required'}, 403
+
+        if kind not in IMPORTERS:
+            return {'error': f"Unknown import kind: {kind}"}, 400
+        fmt = request_format()
+        if fmt not in FORMATS:
+            return {'error': f"Unknown format: {fmt}"}, 400
+
+        defaults = {}
+        if kind == 'places':
+            defaults['owner_id'] = current_user['id']
+
+        stream = io.TextIOWrapper(io.BufferedReader(request.stream),
+                                  encoding='utf-8', newline='')
+        report = facade.bulk_import(
+            kind, stream, fmt, IMPORT_MODELS[kind].__schema__,
+            batch_size=current_app.config.get('IMPORT_BATCH_SIZE', 1000),
+            defaults=defaults)
+        return report, 200
@@ -1,6 +1,13 @@
+from flask import current_app, request
 from flask_restx import Namespace, Resource, fields
 from app.services import facade
+from app.api.v1.serializers import (
+    place_fieldset, place_list_serializer, place_serializer
+)
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.extensions import leaderboards, limiter
+from app.leaderboards import BOARDS
+from app.ratelimit import by_user_or_ip
 
 api = Namespace('places', description='Place operations')
 
@@ -72,96 +79,116 @@ class PlaceList(Resource):
     @api.response(201, 'Place successfully created')
     @api.response(400, 'Invalid input data')
     @jwt_required()
+    @limiter.limit('write', by_user_or_ip)
     def post(self):
         """Register a new place"""
         place_data = api.payload
 
-        # Catch UUID from JWT and store in place_data['owner_id']
-        current_user = get_jwt_identity()
-        place_data['owner_id'] = current_user["id"]  # Use 'owner_id'
+        # Resolve the JWT to its user, loaded once for the request and
+        # reused when the owner is serialized
+        owner = facade.get_current_user()
+        if not owner:
+            return {'error': 'User not found'}, 404
+        place_data['owner_id'] = owner.id
 
         # Convert price to 2 digit:
         place_data['price'] = round(place_data['price'], 2)
 
         # Create the place
-        place = facade.create_place(place_data)
-
-        # Retrieve owner details
-        owner = facade.get_user(place.owner_id)
-
-        return {
-            'id': place.id,
-            'title': place.title,
-            'description': place.description,
-            'price': place.price,
-            'latitude': place.latitude,
-            'longitude': place.longitude,
-            'owner': {
-                'id': owner.id,
-                'first_name': owner.first_name,
-                'last_name': owner.last_name,
-                'email': owner.email
-            },
-        }, 201
+        try:
+            place = facade.create_place(place_data)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+
+        # Owner details are serialized through the place's owner relationship
+        return place_serializer(place), 201
 
     @api.response(200, 'List of places retrieved successfully')
     def get(self):
         """
         Retrieve a list of all places
 
-        In view of the changes to the expected output in the
-        instructions, the fields that are not
-        currently required are commented on.
+        Only id, title and price are returned by default, other
+        fields are available with `?fields=` and `?include=`
+        (e.g. `?fields=id,title,latitude&include=owner,amenities`).
         """
-        places = facade.get_all_places()
-        return [{
-            'id': place.id,
-            'title': place.title,
-            # 'description': place.description,
-            'price': place.price,
-            # 'latitude': place.latitude,
-            # 'longitude': place.longitude,
-            # 'owner': place.owner,
-            # 'amenities': place.amenities
-        } for place in places], 200
+        shape = place_fieldset.parse(default=place_list_serializer)
+        places = facade.get_all_places(shape.fields, shape.include)
+        return shape.serializer.many(places), 200
+
+
+@api.route('/top')
+class PlaceTop(Resource):
+    @api.response(200, 'Leaderboard retrieved successfully')
+    @api.response(400, 'Invalid leaderboard, k or area')
+    @api.doc(params={
+        'by': 'rating (top rated, default), reviews (most reviewed) or '
+              'price (cheapest in the area of lat/lon)',
+        'k': 'Number of places (default 20)',
+        'lat': 'Latitude of the area, required with by=price',
+        'lon': 'Longitude of the area, required with by=price',
+    })
+    def get(self):
+        """
+        Retrieve the best places of a ranking
+
+        Places are ranked by average rating (with at least
+        LEADERBOARD_MIN_REVIEWS reviews), number of reviews, or price
+        within the grid cell of `lat`/`lon`. Rankings are kept in
+        memory and updated on writes, no table is scanned.
+        """
+        by = request.args.get('by', 'rating')
+        if by not in BOARDS:
+            return {'error': f'Unknown leaderboard: {by}'}, 400
+
+        try:
+            k = int(request.args.get('k', 20))
+            latitude = longitude = None
+            if by == 'price':
+                latitude = float(request.args['lat'])
+                longitude = float(request.args['lon'])
+        except (KeyError, ValueError):
+            return {'error': 'k must be an integer, lat and lon numbers '
+                             '(lat and lon are required with by=price)'}, 400
+        if k < 1:
+            return {'error': 'k must be positive'}, 400
+        if by == 'price' and not (-90 <= latitude <= 90 and
+                                  -180 <= longitude <= 180):
+            return {'error': 'lat or lon out of range'}, 400
+
+        entries = leaderboards.top(by, k, latitude, longitude)
+        return [entry.to_dict() for entry in entries], 200
 
 
 @api.route('/<place_id>')
 class PlaceResource(Resource):
     @api.response(200, 'Place details retrieved successfully')
     @api.response(404, 'Place not found')
+    @api.doc(params={'view': 'detail: the full place page (owner, '
+                             'amenities, rating summary, latest reviews)'})
     def get(self, place_id):
         """
         Get place details by ID
 
-        In view of the changes to the expected output in the
-        instructions, the fields that are not
-        currently required are commented on.
-        """
+        The shape can be changed with `?fields=` and `?include=`,
+        the owner is included by default.
 
-        place = facade.get_place(place_id)
+        `?view=detail` returns everything the place page shows in one
+        call, read with a single DB query: owner, amenities, rating
+        summary (`count`, `average`) and the latest reviews with their
+        author's name.
+        """
+        if request.args.get('view') == 'detail':
+            detail = facade.get_place_detail(
+                place_id, current_app.config.get('PLACE_DETAIL_REVIEWS', 10))
+            if detail:
+                return detail, 200
+            return {'message': 'Place not found'}, 404
+
+        shape = place_fieldset.parse(default=place_serializer)
+        place = facade.get_place(place_id, shape.fields, shape.include)
         if place:
-            # Fetch owner details using the owner_id
-            owner = facade.get_user(place.owner_id)  # Use 'owner_id'
-
-            # Prepare owner data
-            owner_data = {
-                'id': owner.id,
-                'first_name': owner.first_name,
-                'last_name': owner.last_name,
-                'email': owner.email
-            }
-
-            return {
-                'id': place.id,
-                'title': place.title,
-                'description': place.description,
-                'price': place.price,
-                'latitude': place.latitude,
-                'longitude': place.longitude,
-                'owner': owner_data,  # Include owner details
-                # 'amenities': place.amenities
-            }, 200
+            return shape.serializer(place), 200
 
         return {'message': 'Place not found'}, 404
 
@@ -170,6 +197,7 @@ class PlaceResource(Resource):
     @api.response(404, 'Place not found')
     @api.response(400, 'Invalid input data')
     @jwt_required()
+    @limiter.limit('write', by_user_or_ip)
     def put(self, place_id):
         """Update a place's information"""
         place_data = api.payload
@@ -183,7 +211,10 @@ class PlaceResource(Resource):
         # Set is_admin default to False if not exists
         is_admin = current_user.get('is_admin', False)
 
+        # Loaded once, update_place reuses it
         place = facade.get_place(place_id)
+        if not place:
+            return {'message': 'Place not found'}, 404
 
         if not is_admin and place.owner_id != current_user["id"]:  # Use 'owner_id'
             return {'error': 'Unauthorized action'}, 403
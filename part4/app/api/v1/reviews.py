@@ -1,6 +1,19 @@
+from flask import request
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.services import facade
+from app.api.pagination import (
+    decode_cursor, encode_cursor, next_page_headers, page_limit
+)
+from app.api.streaming import stream_batch_size, stream_response, wants_stream
+from app.api.v1.serializers import (
+    place_review_serializer, review_fieldset, review_list_serializer,
+    review_serializer
+)
+from app.extensions import limiter
+from app.ratelimit import by_user_or_ip
+from app.persistence.constraints import UNIQUE, IntegrityViolation
+from app.persistence.review_repository import REVIEW_ORDERS
 
 api = Namespace("reviews", description="Review operations")
 places_reviews_ns = Namespace("places",
@@ -48,7 +61,9 @@ class ReviewList(Resource):
     @api.expect(review_model, validate=True)
     @api.response(201, "Review successfully created")
     @api.response(400, "Invalid input data")
+    @api.response(409, "Place already reviewed by the user")
     @jwt_required()
+    @limiter.limit('write', by_user_or_ip)
     def post(self):
         """
         Register a new review
@@ -59,45 +74,45 @@ class ReviewList(Resource):
         current_user = get_jwt_identity()
         review_data["user_id"] = current_user["id"]
 
-        # Check if place UUID exists
-        this_place = facade.get_place(review_data["place_id"])
-        if not this_place:
-            return {"message": "The given place UUID does not exist"}, 400
-
         # Check if 'text' field is not empty or just spaces
         if not review_data.get("text") or review_data["text"].isspace():
             return {"message": "Text of the review cannot be empty"}, 400
 
-        # Create the review
-        new_review = facade.create_review(review_data)
+        # Create the review, the DB checks the place exists and that
+        # the user did not review it yet
+        try:
+            new_review = facade.create_review(review_data)
+        except IntegrityViolation as e:
+            if e.kind == UNIQUE:
+                return {"message": "You have already reviewed this place"}, 409
+            return {"message": "The given place UUID does not exist"}, 400
 
-        return {
-            "id": new_review.id,
-            "text": new_review.text,
-            "rating": new_review.rating,
-            "user_id": new_review.user_id,
-            "place_id": new_review.place_id
-        }, 201
+        return review_serializer(new_review), 201
 
     @api.response(200, "List of reviews retrieved successfully")
     def get(self):
         """
         Get the list of all reviews
 
+        With `Accept: application/x-ndjson` or `?stream=1` the reviews
+        are streamed from the DB in batches instead of being built
+        as one list. The shape can be changed with `?fields=` and
+        `?include=` (e.g. `?fields=id,rating&include=user`).
+
         Returns:
             tuple: A tuple containing:
                 - list: A list of dictionnaries, each containing review data
                 - int: HTTP status code 200 for success
         """
-        reviews = facade.get_all_reviews()
-        return [
-            {
-                "id": review_item.id,
-                "text": review_item.text,
-                "rating": review_item.rating,
-            }
-            for review_item in reviews
-        ], 200
+        shape = review_fieldset.parse(default=review_list_serializer)
+        if wants_stream():
+            return stream_response(
+                facade.iter_reviews(
+                    stream_batch_size(), shape.fields, shape.include),
+                shape.serializer)
+
+        reviews = facade.get_all_reviews(shape.fields, shape.include)
+        return shape.serializer.many(reviews), 200
 
 
 @api.route("/<review_id>")
@@ -108,6 +123,8 @@ class ReviewResource(Resource):
         """
         Get review details by ID.
 
+        The shape can be changed with `?fields=` and `?include=`.
+
         Args:
             review_id (UUID): The ID of the review to retrieve details for
 
@@ -117,22 +134,18 @@ class ReviewResource(Resource):
                 or an error message.
                 - int: HTTP status code (200 if successful, 404 if not found)
         """
-        review = facade.get_review(review_id)
+        shape = review_fieldset.parse(default=review_serializer)
+        review = facade.get_review(review_id, shape.fields, shape.include)
         if not review:
             return {"error": "Review not found"}, 404
-        return {
-            "id": review.id,
-            "text": review.text,
-            "rating": review.rating,
-            "user_id": review.user_id,
-            "place_id": review.place_id
-        }, 200
+        return shape.serializer(review), 200
 
     @api.expect(review_update_model, validate=True)
     @api.response(200, "Review updated successfully")
     @api.response(404, "Review not found")
     @api.response(400, "Invalid input data")
     @jwt_required()
+    @limiter.limit('write', by_user_or_ip)
     def put(self, review_id):
         """
         Update review details by ID.
@@ -152,7 +165,7 @@ class ReviewResource(Resource):
         # Catch UUID from JWT
         current_user = get_jwt_identity()
 
-        # Retrieve review from DB
+        # Retrieve review from DB, loaded once: update_review reuses it
         review = facade.get_review(review_id)
         if not review:
             return {"error": "Review not found"}, 404
@@ -174,6 +187,7 @@ class ReviewResource(Resource):
     @api.response(200, "Review deleted successfully")
     @api.response(404, "Review not found")
     @jwt_required()
+    @limiter.limit('write', by_user_or_ip)
     def delete(self, review_id):
         """
         Delete review by ID.
@@ -210,32 +224,48 @@ class ReviewResource(Resource):
 @places_reviews_ns.route("/<place_id>/reviews")
 class PlaceReviewList(Resource):
     @api.response(200, "List of reviews for the place retrieved successfully")
+    @api.response(400, "Invalid sort, limit or cursor")
     @api.response(404, "Place not found")
+    @api.doc(params={
+        'sort': 'Order of the reviews: -created_at (default, newest '
+                'first), created_at, -rating or rating',
+        'limit': 'Reviews per page',
+        'cursor': 'Next page cursor, from the previous page\'s '
+                  'X-Next-Cursor or Link header',
+    })
     def get(self, place_id):
         """
-        Get all reviews for a specific place
+        Get the reviews of a specific place, one page at a time
+
+        Pages hold `?limit=` reviews (REVIEWS_PAGE_SIZE by default).
+        When there are more, the `Link` (rel="next") and `X-Next-Cursor`
+        headers give the next page.
 
         Args:
             place_id (UUID): The ID of the place to be inspected
 
         Returns:
             tuple: A tuple containing:
-                - dict: A dictionary with reviews information
+                - list: A list of dictionaries with reviews information
                 - int: HTTP status code
-                (200 if successful, 404 if error)
+                (200 if successful, 400 or 404 if error)
+                - dict: Headers of the next page, if any
         """
-
-        place = facade.get_place(place_id)
-        if not place:
+        sort = request.args.get("sort", "-created_at")
+        if sort not in REVIEW_ORDERS:
+            return {"error": f"Unknown sort: {sort}"}, 400
+        limit = page_limit("REVIEWS_PAGE_SIZE", "REVIEWS_PAGE_MAX")
+        after = None
+        if request.args.get("cursor"):
+            after = decode_cursor(request.args["cursor"], sort)
+
+        # Read from the (place_id, sort column, id) index, the place
+        # itself is never loaded
+        page = facade.get_place_reviews_page(place_id, sort, limit, after)
+        if page is None:
             return {"error": "Place not found"}, 404
 
-        reviews_data = []
-        for review in place.reviews:
-            reviews_data.append({
-                "id": review.id,
-                "text": review.text,
-                "rating": review.rating,
-                "user_id": review.user_id,
-            })
-
-        return reviews_data, 200
+        reviews, next_after = page
+        cursor = encode_cursor(sort, *next_after) if next_after else None
+        return (place_review_serializer.many(reviews), 200,
+                next_page_headers(cursor))
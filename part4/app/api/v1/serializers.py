@@ -0,0 +1,53 @@
+#!/usr/bin/python3
+"""
+Output shapes of the v1 API, declared once per model
+"""
+
+from app.api.fieldsets import Fieldset
+from app.api.serialization import Nested, Serializer
+
+amenity_serializer = Serializer('Amenity', ['id', 'name'])
+
+user_serializer = Serializer('User', [
+    'id', 'first_name', 'last_name', 'email'
+])
+
+# Places
+place_list_serializer = Serializer('PlaceListItem', ['id', 'title', 'price'])
+
+place_serializer = Serializer('Place', [
+    'id', 'title', 'description', 'price', 'latitude', 'longitude',
+    ('owner', Nested(user_serializer, attribute='user')),
+])
+
+# Reviews
+review_list_serializer = Serializer('ReviewListItem', ['id', 'text', 'rating'])
+
+review_serializer = Serializer('Review', [
+    'id', 'text', 'rating', 'user_id', 'place_id'
+])
+
+place_review_serializer = Serializer('PlaceReview', [
+    'id', 'text', 'rating', 'user_id'
+])
+
+
+# Everything a client can select with ?fields= and ?include=
+place_fieldset = Fieldset(Serializer('PlaceFields', [
+    'id', 'title', 'description', 'price', 'latitude', 'longitude',
+    'owner_id',
+    ('owner', Nested(user_serializer, attribute='user')),
+    ('amenities', Nested(amenity_serializer, many=True)),
+]))
+
+review_fieldset = Fieldset(Serializer('ReviewFields', [
+    'id', 'text', 'rating', 'user_id', 'place_id',
+    ('user', Nested(user_serializer, attribute='author')),
+    ('place', Nested(place_list_serializer)),
+]))
+
+user_fieldset = Fieldset(Serializer('UserFields', [
+    'id', 'first_name', 'last_name', 'email',
+    ('places', Nested(place_list_serializer, many=True)),
+    ('reviews', Nested(review_list_serializer, many=True)),
+]))
@@ -1,6 +1,11 @@
 from flask_restx import Namespace, Resource, fields
 from app.services import facade
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.api.streaming import stream_batch_size, stream_response, wants_stream
+from app.api.v1.serializers import user_fieldset, user_serializer
+from app.extensions import limiter
+from app.ratelimit import by_user_or_ip
+from app.persistence.constraints import IntegrityViolation
 
 
 api = Namespace('users', description='User operations')
@@ -52,6 +57,7 @@ class UserList(Resource):
     @api.response(400, 'Email already registered')
     @api.response(400, 'Invalid input data')
     @jwt_required()
+    @limiter.limit('write', by_user_or_ip)
     def post(self):
         """
         Register a new user (Only for admin users)
@@ -70,13 +76,11 @@ class UserList(Resource):
 
         user_data = api.payload
 
-        # Simulate email uniqueness check
-        # (to be replaced by real validation with persistence)
-        existing_user = facade.get_user_by_email(user_data['email'])
-        if existing_user:
+        # Email uniqueness is enforced by the DB on insert
+        try:
+            new_user = facade.create_user(user_data)
+        except IntegrityViolation:
             return {'error': 'Email already registered'}, 400
-
-        new_user = facade.create_user(user_data)
         return {
             'id': new_user.id,
             'message': 'User created successfully'
@@ -87,21 +91,25 @@ class UserList(Resource):
         """
         Get the list of all users
 
+        With `Accept: application/x-ndjson` or `?stream=1` the users
+        are streamed from the DB in batches instead of being built
+        as one list. The shape can be changed with `?fields=` and
+        `?include=` (e.g. `?fields=id,email&include=places`).
+
         Returns:
             tuple: A tuple containing:
                 - list: A list of dictionnaries, each containing user data
                 - int: HTTP status code 200 for success
         """
-        users = facade.get_all_users()
-        return [
-            {
-                'id': user_item.id,
-                'first_name': user_item.first_name,
-                'last_name': user_item.last_name,
-                'email': user_item.email
-            }
-            for user_item in users
-        ], 200
+        shape = user_fieldset.parse(default=user_serializer)
+        if wants_stream():
+            return stream_response(
+                facade.iter_users(
+                    stream_batch_size(), shape.fields, shape.include),
+                shape.serializer)
+
+        users = facade.get_all_users(shape.fields, shape.include)
+        return shape.serializer.many(users), 200
 
 
 @api.route('/<user_id>')
@@ -112,6 +120,8 @@ class UserResource(Resource):
         """
         Get user details by ID.
 
+        The shape can be changed with `?fields=` and `?include=`.
+
         Args:
             user_id (UUID): The ID of the user to retrieve details for
 
@@ -121,20 +131,18 @@ class UserResource(Resource):
                 or an error message.
                 - int: HTTP status code (200 if successful, 404 if not found)
         """
-        user = facade.get_user(user_id)
+        shape = user_fieldset.parse(default=user_serializer)
+        user = facade.get_user(user_id, shape.fields, shape.include)
         if not user:
             return {'error': 'User not found'}, 404
-        return {
-            'id': user.id,
-            'first_name': user.first_name,
-            'last_name': user.last_name,
-            'email': user.email}, 200
+        return shape.serializer(user), 200
 
     @api.expect(user_model_update, validate=True)
     @api.response(200, "User succeffuly updated")
     @api.response(404, "User not found")
     @api.response(400, "Invalid input data")
     @jwt_required()
+    @limiter.limit('write', by_user_or_ip)
     def put(self, user_id):
         """
         Update user details by ID.
@@ -157,8 +165,6 @@ class UserResource(Resource):
                 - int: HTTP status code
                     (200 if successful, 400 or 404 if there is an error).
         """
-        from app import bcrypt
-
         # Catch UUID from JWT and data
         current_user = get_jwt_identity()
         user_data = api.payload
@@ -171,20 +177,12 @@ class UserResource(Resource):
             if current_user["id"] != user_id:
                 return {"error": "Unauthorized action"}, 403
 
-        # Hash the new password
-        if "password" in user_data:
-            hashed_password = bcrypt.generate_password_hash(
-                user_data["password"]
-            ).decode('utf-8')
-            user_data["password"] = hashed_password
-
-        user = facade.update_user(user_id, user_data)
+        # The new password, if any, is hashed by the facade
+        try:
+            user = facade.update_user(user_id, user_data)
+        except IntegrityViolation:
+            return {'error': 'Email already registered'}, 400
         if not user:
             return {"error": "User not found"}, 404
         else:
-            return {
-                    "id": user.id,
-                    "first_name": user.first_name,
-                    "last_name": user.last_name,
-                    "email": user.email
-                }, 200
+            return user_serializer(user), 200
@@ -0,0 +1,151 @@
+#!/usr/bin/python3
+"""
+Flask CLI commands (`flask --app run <command>`)
+"""
+
+import os
+import sys
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from app.services.bulk_export import KINDS as EXPORT_KINDS
+from app.services.bulk_import import FORMATS, IMPORTERS
+
+
+@click.command('import')
+@click.argument('kind', type=click.Choice(sorted(IMPORTERS)))
+@click.argument('path', type=click.Path(allow_dash=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(FORMATS),
+              help='Input format, guessed from the file extension.')
+@click.option('--owner-email',
+              help='Owner of the imported places without an owner_id.')
+@click.option('--batch-size', type=int,
+              help='Rows per transaction (default: IMPORT_BATCH_SIZE).')
+@with_appcontext
+def import_command(kind, path, fmt, owner_email, batch_size):
+    """Bulk import places, amenities or reviews from NDJSON or CSV."""
+    from app.services import facade
+    from app.api.v1.imports import IMPORT_MODELS
+
+    if fmt is None:
+        fmt = 'csv' if os.path.splitext(path)[1].lower() == '.csv' \
+            else 'ndjson'
+
+    defaults = {}
+    if owner_email:
+        owner = facade.get_user_by_email(owner_email)
+        if not owner:
+            raise click.BadParameter(f"No user with email {owner_email}",
+                                     param_hint='--owner-email')
+        defaults['owner_id'] = owner.id
+
+    if batch_size is None:
+        batch_size = current_app.config.get('IMPORT_BATCH_SIZE', 1000)
+
+    stream = sys.stdin if path == '-' else \
+        open(path, encoding='utf-8', newline='')
+    try:
+        report = facade.bulk_import(
+            kind, stream, fmt, IMPORT_MODELS[kind].__schema__,
+            batch_size=batch_size, defaults=defaults)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+    click.echo(f"Inserted {report['inserted']} {kind}, "
+               f"rejected {report['failed']}")
+    for error in report['errors']:
+        click.echo(f"  line {error['line']}: {'; '.join(error['errors'])}",
+                   err=True)
+    if report.get('errors_truncated'):
+        click.echo("  (more errors not shown)", err=True)
+
+
+@click.command('export')
+@click.argument('kind', type=click.Choice(EXPORT_KINDS))
+@click.argument('path', type=click.Path(allow_dash=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(FORMATS),
+              help='Output format, guessed from the file extension.')
+@click.option('--batch-size', type=int,
+              help='Rows per cursor batch (default: EXPORT_BATCH_SIZE).')
+@with_appcontext
+def export_command(kind, path, fmt, batch_size):
+    """Export places (with owner and amenities) or reviews."""
+    from app.services import facade
+
+    if fmt is None:
+        fmt = 'csv' if os.path.splitext(path)[1].lower() == '.csv' \
+            else 'ndjson'
+    if batch_size is None:
+        batch_size = current_app.config.get('EXPORT_BATCH_SIZE', 1000)
+
+    out = sys.stdout if path == '-' else \
+        open(path, 'w', encoding='utf-8', newline='')
+    try:
+        count = facade.export_catalog(kind, fmt, out, batch_size)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    if out is not sys.stdout:
+        click.echo(f"Exported {count} {kind} to {path}")
+
+
+@click.command('seed')
+@click.option('--users', type=int, default=10000, show_default=True)
+@click.option('--places', type=int, default=5000, show_default=True)
+@click.option('--reviews', type=int, default=100000, show_default=True)
+@click.option('--amenities', type=int, default=40, show_default=True)
+@click.option('--seed', type=int, default=0, show_default=True,
+              help='Same seed, same dataset.')
+@click.option('--clusters', type=int, default=24, show_default=True,
+              help='Cities the places are spread around.')
+@click.option('--zipf', type=float, default=1.1, show_default=True,
+              help='Exponent of the reviews per place distribution.')
+@click.option('--reset', is_flag=True,
+              help='Drop and recreate the tables first.')
+@with_appcontext
+def seed_command(users, places, reviews, amenities, seed, clusters, zipf,
+                 reset):
+    """Fill an empty SQLite database with a synthetic dataset."""
+    from sqlalchemy import func, select
+
+    from app.extensions import db
+    from app.models.user import User
+    from app.services.synthetic import PASSWORDS, SyntheticDataset, \
+        load_sqlite
+
+    if db.engine.dialect.name != 'sqlite':
+        raise click.UsageError('seed only loads SQLite databases')
+    try:
+        dataset = SyntheticDataset(
+            users, places, reviews, amenities, seed=seed, clusters=clusters,
+            zipf=zipf, rounds=current_app.config.get('BCRYPT_LOG_ROUNDS', 12))
+    except ValueError as e:
+        raise click.UsageError(str(e))
+
+    if reset:
+        db.drop_all()
+    db.create_all()
+    if db.session.scalar(select(func.count(User.id))):
+        raise click.UsageError('The database is not empty, use --reset')
+    db.session.remove()
+
+    current = []
+
+    def progress(table, count):
+        # One line per table, rewritten as its rows are written
+        if current and current[-1] != table:
+            click.echo('', err=True)
+        current.append(table)
+        click.echo(f"\r{table}: {count}", nl=False, err=True)
+
+    report = load_sqlite(db.engine, dataset, progress)
+    click.echo('', err=True)
+    click.echo(', '.join(f"{count} {table}"
+                         for table, count in report.items()))
+    click.echo(f"Log in as user<i>@example.com with "
+               f"password<i % {len(PASSWORDS)}>, admin@example.com with "
+               f"{PASSWORDS[0]}")
@@ -0,0 +1,191 @@
+#!/usr/bin/python3
+"""
+Response compression with Accept-Encoding negotiation
+"""
+
+import hashlib
+import threading
+import zlib
+from collections import OrderedDict
+
+from flask import current_app, request
+
+from app.metrics import cache_lookup
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+
+COMPRESSIBLE_MIMETYPES = (
+    'application/json',
+    'application/x-ndjson',
+    'application/javascript',
+    'text/csv',
+    'text/html',
+    'text/css',
+    'text/plain',
+)
+
+
+class _CompressedCache:
+    """
+    Small thread-safe LRU of already compressed bodies
+
+    Keyed by (encoding, digest of the raw body) so an unchanged
+    list response is only compressed once per process.
+    """
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                cache_lookup('compression', False)
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            cache_lookup('compression', True)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class Compress:
+    """
+    Flask extension compressing responses with gzip or brotli
+
+    Buffered responses are compressed in one go (and cached when they
+    are cacheable), streamed responses are compressed chunk by chunk
+    so the body is never held in memory.
+    """
+    def __init__(self, app=None):
+        self.cache = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('COMPRESS_ENABLED', True)
+        app.config.setdefault('COMPRESS_MIN_SIZE', 500)
+        app.config.setdefault('COMPRESS_LEVEL', 6)
+        app.config.setdefault('COMPRESS_BR_LEVEL', 4)
+        app.config.setdefault('COMPRESS_CACHE_SIZE', 128)
+        app.config.setdefault('COMPRESS_MIMETYPES', COMPRESSIBLE_MIMETYPES)
+
+        self.cache = _CompressedCache(app.config['COMPRESS_CACHE_SIZE'])
+        app.extensions['compress'] = self
+        app.after_request(self.after_request)
+
+    def _choose_encoding(self):
+        """
+        Pick the best encoding the client accepts (brotli first)
+        """
+        offers = ['br', 'gzip'] if brotli is not None else ['gzip']
+        return request.accept_encodings.best_match(offers)
+
+    def _compressor(self, encoding, config):
+        if encoding == 'br':
+            return brotli.Compressor(quality=config['COMPRESS_BR_LEVEL'])
+        # wbits=31 produces a gzip container instead of raw zlib
+        return zlib.compressobj(config['COMPRESS_LEVEL'], zlib.DEFLATED, 31)
+
+    def _compress(self, encoding, data, config):
+        compressor = self._compressor(encoding, config)
+        if encoding == 'br':
+            return compressor.process(data) + compressor.finish()
+        return compressor.compress(data) + compressor.flush()
+
+    def _stream(self, encoding, chunks, config):
+        """
+        Compress an iterable body incrementally
+
+        Each produced chunk is flushed so the client receives data as
+        soon as the server yields it.
+        """
+        compressor = self._compressor(encoding, config)
+        try:
+            for chunk in chunks:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode('utf-8')
+                if encoding == 'br':
+                    data = compressor.process(chunk) + compressor.flush()
+                else:
+                    data = (compressor.compress(chunk) +
+                            compressor.flush(zlib.Z_SYNC_FLUSH))
+                if data:
+                    yield data
+            yield compressor.finish() if encoding == 'br' else compressor.flush()
+        finally:
+            if hasattr(chunks, 'close'):
+                chunks.close()
+
+    @staticmethod
+    def _is_cacheable(response):
+        if request.method != 'GET' or response.status_code != 200:
+            return False
+        cache_control = response.cache_control
+        return not (cache_control.no_store or cache_control.private)
+
+    def after_request(self, response):
+        config = current_app.config
+
+        if not config['COMPRESS_ENABLED']:
+            return response
+
+        response.vary.add('Accept-Encoding')
+
+        if (response.status_code < 200 or
+                response.status_code in (204, 206, 304) or
+                response.direct_passthrough or
+                'Content-Encoding' in response.headers or
+                response.mimetype not in config['COMPRESS_MIMETYPES']):
+            return response
+
+        encoding = self._choose_encoding()
+        if not encoding:
+            return response
+
+        if response.is_streamed:
+            response.response = self._stream(
+                encoding, response.response, config)
+            response.headers.pop('Content-Length', None)
+            response.headers['Content-Encoding'] = encoding
+            return response
+
+        data = response.get_data()
+        if len(data) < config['COMPRESS_MIN_SIZE']:
+            return response
+
+        cacheable = self._is_cacheable(response)
+        compressed = None
+        if cacheable:
+            key = (encoding, hashlib.blake2b(data, digest_size=16).digest())
+            compressed = self.cache.get(key)
+        if compressed is None:
+            compressed = self._compress(encoding, data, config)
+            if cacheable:
+                self.cache.set(key, compressed)
+
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            # A compressed representation must not share the strong ETag
+            response.set_etag(etag, weak=True)
+        return response
@@ -1,5 +1,19 @@
 from flask_sqlalchemy import SQLAlchemy
-from flask_bcrypt import Bcrypt
+from app.allocations import AllocationTracker
+from app.amenity_catalog import AmenityCatalog
+from app.compression import Compress
+from app.leaderboards import Leaderboards
+from app.metrics import Metrics
+from app.passwords import PasswordHasher
+from app.ratelimit import RateLimiter
 
-db = SQLAlchemy()
-bcrypt = Bcrypt()
+# Objects stay usable after a commit without being reloaded; the session
+# only lives for one request
+db = SQLAlchemy(session_options={'expire_on_commit': False})
+compress = Compress()
+hasher = PasswordHasher()
+limiter = RateLimiter()
+amenity_catalog = AmenityCatalog()
+leaderboards = Leaderboards()
+metrics = Metrics()
+allocations = AllocationTracker()
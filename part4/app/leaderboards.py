@@ -0,0 +1,376 @@
+#!/usr/bin/python3
+"""
+Place leaderboards: top rated, most reviewed and cheapest in an area
+
+Each leaderboard keeps the best LEADERBOARD_CAPACITY places of one
+ranking, sorted, so reading the top k is a slice. Boards are loaded from
+the DB on their first read, then kept up to date by the facade: review
+writes move the place by its new review count and rating, place writes
+by its new price. A place only enters "rating" with at least
+LEADERBOARD_MIN_REVIEWS reviews, and "reviews" with at least one.
+
+"Cheapest in area" boards are kept per cell of a grid of
+LEADERBOARD_AREA_DEGREES degrees of latitude and longitude, for the
+LEADERBOARD_AREA_CELLS cells read last.
+
+A board holds exactly the places ranked before its `bound`: places that
+leave it (rating drops, deletion) make it shorter instead of being
+replaced by an unknown runner-up. It is reloaded when a read asks for
+more places than it holds, after a rollback, and every
+LEADERBOARD_REFRESH_INTERVAL seconds for the writes of other processes.
+"""
+
+import math
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import namedtuple
+
+from flask import current_app, has_app_context
+from sqlalchemy import Float, cast, event, func, select
+from sqlalchemy.orm import Session
+
+from app.metrics import cache_lookup
+
+BOARDS = ('rating', 'reviews', 'price')
+
+_Entry = namedtuple('_Entry', 'id title price latitude longitude '
+                              'review_count rating_total')
+
+
+class LeaderboardEntry(_Entry):
+    """
+    A place as ranked by the leaderboards
+    """
+    __slots__ = ()
+
+    @property
+    def rating(self):
+        """
+        Average rating, None without reviews
+        """
+        if not self.review_count:
+            return None
+        return self.rating_total / self.review_count
+
+    def to_dict(self):
+        rating = self.rating
+        return {
+            'id': self.id,
+            'title': self.title,
+            'price': self.price,
+            'latitude': self.latitude,
+            'longitude': self.longitude,
+            'review_count': self.review_count,
+            'rating': round(rating, 2) if rating is not None else None,
+        }
+
+
+class _Board:
+    """
+    Sorted, bounded ranking
+
+    Holds every qualifying place whose key is lower than `bound` (None:
+    no bound, the board holds them all), at most `capacity` of them.
+    """
+    def __init__(self, rank, capacity, entries, bound):
+        self.rank = rank
+        self.capacity = capacity
+        self.keys = sorted(rank(entry) for entry in entries)
+        self.entries = {entry.id: entry for entry in entries}
+        self.bound = bound
+        self.loaded_at = time.monotonic()
+
+    def top(self, k):
+        """
+        The k first entries, None if the board cannot tell them
+        """
+        if self.bound is not None and len(self.keys) < k:
+            return None
+        return [self.entries[key[-1]] for key in self.keys[:k]]
+
+    def discard(self, place_id):
+        entry = self.entries.pop(place_id, None)
+        if entry is not None:
+            del self.keys[bisect_left(self.keys, self.rank(entry))]
+
+    def offer(self, entry):
+        """
+        Insert, move or drop a place after a change
+        """
+        self.discard(entry.id)
+        key = self.rank(entry)
+        if key is None or (self.bound is not None and key >= self.bound):
+            return
+        insort(self.keys, key)
+        self.entries[entry.id] = entry
+        if len(self.keys) > self.capacity:
+            # The dropped place is now the best one outside the board
+            last = self.keys.pop()
+            del self.entries[last[-1]]
+            self.bound = last
+
+
+def _rating_rank(min_reviews):
+    def rank(entry):
+        if entry.review_count < max(min_reviews, 1):
+            return None
+        return (-entry.rating, -entry.review_count, entry.id)
+    return rank
+
+
+def _reviews_rank(entry):
+    if entry.review_count < 1:
+        return None
+    return (-entry.review_count, -entry.rating, entry.id)
+
+
+def _price_rank(entry):
+    return (entry.price, entry.id)
+
+
+class Leaderboards:
+    """
+    Flask extension holding the place leaderboards of each app
+
+    Configuration:
+        LEADERBOARD_CAPACITY: Places kept per board, the largest k
+        LEADERBOARD_MIN_REVIEWS: Reviews needed to be ranked by rating
+        LEADERBOARD_AREA_DEGREES: Size of the cells of the price boards
+        LEADERBOARD_AREA_CELLS: Price boards kept in memory
+        LEADERBOARD_REFRESH_INTERVAL: Seconds after which a board is
+            reloaded from the DB, 0 to never reload
+    """
+    def __init__(self, app=None):
+        self._lock = threading.RLock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        config = app.config
+        app.extensions['leaderboards'] = {
+            'boards': {},
+            'capacity': config.get('LEADERBOARD_CAPACITY', 100),
+            'min_reviews': config.get('LEADERBOARD_MIN_REVIEWS', 3),
+            'degrees': config.get('LEADERBOARD_AREA_DEGREES', 1.0),
+            'cells': config.get('LEADERBOARD_AREA_CELLS', 1024),
+            'interval': config.get('LEADERBOARD_REFRESH_INTERVAL', 300),
+        }
+
+    @staticmethod
+    def _state():
+        return current_app.extensions['leaderboards']
+
+    def cell(self, latitude, longitude):
+        """
+        Grid cell of a position, the area of the price boards
+        """
+        degrees = self._state()['degrees']
+        return (math.floor(latitude / degrees),
+                math.floor(longitude / degrees))
+
+    def _rank(self, by):
+        if by == 'rating':
+            return _rating_rank(self._state()['min_reviews'])
+        if by == 'reviews':
+            return _reviews_rank
+        return _price_rank
+
+    @staticmethod
+    def _place_statement():
+        # Places with their review count and rating sum, read per place
+        # from the (place_id, rating, id) index of reviews
+        from app.models.place import Place
+        from app.models.review import Review
+
+        count = (select(func.count(Review.id))
+                 .where(Review.place_id == Place.id)
+                 .scalar_subquery())
+        total = (select(func.coalesce(func.sum(Review.rating), 0))
+                 .where(Review.place_id == Place.id)
+                 .scalar_subquery())
+        return select(Place.id, Place.title, Place.price, Place.latitude,
+                      Place.longitude, count, total)
+
+    def _load(self, by, cell=None):
+        from app.extensions import db
+        from app.models.place import Place
+        from app.models.review import Review
+
+        state = self._state()
+        capacity = state['capacity']
+        if by == 'price':
+            degrees = state['degrees']
+            south, west = cell[0] * degrees, cell[1] * degrees
+            statement = (
+                self._place_statement()
+                .where(Place.latitude >= south,
+                       Place.latitude < south + degrees,
+                       Place.longitude >= west,
+                       Place.longitude < west + degrees)
+                .order_by(Place.price, Place.id))
+        else:
+            # Rankings over every place: one pass over the reviews
+            stats = (select(Review.place_id,
+                            func.count(Review.id).label('review_count'),
+                            func.sum(Review.rating).label('rating_total'))
+                     .group_by(Review.place_id)
+                     .subquery('stats'))
+            count, total = stats.c.review_count, stats.c.rating_total
+            statement = (
+                select(Place.id, Place.title, Place.price, Place.latitude,
+                       Place.longitude, count, total)
+                .join(stats, stats.c.place_id == Place.id))
+            average = cast(total, Float) / count
+            if by == 'rating':
+                minimum = max(state['min_reviews'], 1)
+                order = (average.desc(), count.desc(), Place.id)
+            else:
+                minimum = 1
+                order = (count.desc(), average.desc(), Place.id)
+            statement = statement.where(count >= minimum).order_by(*order)
+
+        # One more row than kept: the first place outside is the bound
+        rows = db.session.execute(statement.limit(capacity + 1)).all()
+        rank = self._rank(by)
+        entries = sorted((LeaderboardEntry(*row) for row in rows), key=rank)
+        bound = None
+        if len(entries) > capacity:
+            bound = rank(entries.pop())
+        return _Board(rank, capacity, entries, bound)
+
+    def _loaded(self):
+        """
+        Boards currently in memory, by key
+        """
+        return self._state()['boards']
+
+    def _top(self, key, k):
+        state = self._state()
+        boards = state['boards']
+        board = boards.get(key)
+        interval = state['interval']
+        if board is not None and interval and \
+                time.monotonic() - board.loaded_at >= interval:
+            board = None
+        top = None if board is None else board.top(k)
+        cache_lookup('leaderboards', top is not None)
+        if top is None:
+            board = self._load(*key) if key[0] == 'price' \
+                else self._load(key[0])
+            boards.pop(key, None)
+            boards[key] = board
+            cells = [name for name in boards if name[0] == 'price']
+            for name in cells[:max(len(cells) - state['cells'], 0)]:
+                del boards[name]
+            top = board.top(k)
+        return top
+
+    def top(self, by, k, latitude=None, longitude=None):
+        """
+        The k best places of a ranking
+
+        Args:
+            by (str): 'rating', 'reviews' or 'price'
+            k (int): Number of places, at most LEADERBOARD_CAPACITY
+            latitude (float): Area of the 'price' ranking
+            longitude (float): Area of the 'price' ranking
+
+        Returns:
+            list: LeaderboardEntry objects, best first
+        """
+        if by not in BOARDS:
+            raise ValueError(f"Unknown leaderboard: {by}")
+        k = min(k, self._state()['capacity'])
+        key = ('price', self.cell(latitude, longitude)) if by == 'price' \
+            else (by,)
+        with self._lock:
+            return self._top(key, k)
+
+    def _known(self, place_id):
+        for board in self._loaded().values():
+            entry = board.entries.get(place_id)
+            if entry is not None:
+                return entry
+        return None
+
+    def _fetch(self, place_id):
+        from app.extensions import db
+        from app.models.place import Place
+
+        row = db.session.execute(
+            self._place_statement().where(Place.id == place_id)).first()
+        return LeaderboardEntry(*row) if row else None
+
+    def _offer(self, entry, previous=None):
+        boards = self._loaded()
+        for key, board in boards.items():
+            if key[0] != 'price':
+                board.offer(entry)
+        cell = self.cell(entry.latitude, entry.longitude)
+        if previous is not None:
+            old_cell = self.cell(previous.latitude, previous.longitude)
+            if old_cell != cell and ('price', old_cell) in boards:
+                boards[('price', old_cell)].discard(entry.id)
+        if ('price', cell) in boards:
+            boards[('price', cell)].offer(entry)
+
+    def review_changed(self, place_id, count_delta, rating_delta):
+        """
+        Move a place after one of its reviews was written
+
+        Args:
+            place_id (UUID): Place of the review
+            count_delta (int): 1 for a new review, -1 for a deleted one
+            rating_delta (int): Change of the sum of the ratings
+        """
+        with self._lock:
+            if not self._loaded():
+                return
+            entry = self._known(place_id)
+            if entry is not None:
+                entry = entry._replace(
+                    review_count=entry.review_count + count_delta,
+                    rating_total=entry.rating_total + rating_delta)
+            else:
+                # Not ranked yet: its counts come from the reviews index
+                entry = self._fetch(place_id)
+                if entry is None:
+                    return
+            self._offer(entry)
+
+    def place_changed(self, place):
+        """
+        Insert or move a place after it was created or updated
+        """
+        with self._lock:
+            if not self._loaded():
+                return
+            previous = self._known(place.id)
+            if previous is not None:
+                entry = previous._replace(
+                    title=place.title, price=place.price,
+                    latitude=place.latitude, longitude=place.longitude)
+            else:
+                entry = self._fetch(place.id)
+                if entry is None:
+                    return
+            self._offer(entry, previous)
+
+    def invalidate(self):
+        """
+        Reload every board from the DB on its next read
+        """
+        with self._lock:
+            self._loaded().clear()
+
+
+def _invalidate_on_rollback(session, previous_transaction):
+    # Writes of a rolled back transaction may already be ranked
+    if has_app_context():
+        state = current_app.extensions.get('leaderboards')
+        if state:
+            state['boards'].clear()
+
+
+event.listen(Session, 'after_soft_rollback', _invalidate_on_rollback)
@@ -0,0 +1,389 @@
+#!/usr/bin/python3
+"""
+Process metrics in the Prometheus text format
+
+Recorded while the app runs:
+- requests: latency (and count) by namespace, resource, method and status
+- SQL statements: duration (and count) by operation (SELECT, INSERT, ...)
+- connection pool: time waited for a connection, connections in use
+- password hashing: time of bcrypt hash and verify calls
+- caches: hits and misses of the in-process caches
+
+and served at METRICS_PATH (`/metrics`) for a Prometheus scraper. Each
+worker process has its own values, labelled by Prometheus per target.
+Recording costs a few microseconds per request (see
+benchmarks/bench_metrics.py).
+"""
+
+import hmac
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+
+from flask import Response, current_app, request
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Seconds, from a cached read to a slow bcrypt call
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25,
+                   0.5, 1.0, 2.5, 5.0, 10.0)
+# Seconds, SQL statements and pool waits are much shorter
+DB_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+              0.05, 0.1, 0.25, 1.0)
+
+_OPERATION_RE = re.compile(r'\s*(\w+)')
+_OPERATIONS = frozenset(('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH',
+                         'BEGIN', 'COMMIT', 'ROLLBACK', 'SAVEPOINT',
+                         'RELEASE', 'PRAGMA', 'CREATE', 'DROP', 'ALTER'))
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('\n', r'\n') \
+        .replace('"', r'\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"'
+             for name, value in zip(names, values)]
+    pairs.extend(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """
+    Monotonic count, one value per set of label values
+    """
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, labels=()):
+        return self._values.get(labels, 0)
+
+    def samples(self):
+        with self._lock:
+            values = list(self._values.items())
+        for labels, value in sorted(values):
+            yield self.name + _labels(self.labelnames, labels), value
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram(Counter):
+    """
+    Distribution of observed values over fixed buckets
+
+    Observations are appended to a queue (atomic, no lock) and added to
+    the buckets in bulk, when the queue is long or the metrics are read:
+    a statement or a request pays for an append only.
+    """
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(),
+                 buckets=LATENCY_BUCKETS, pending=4096):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        self._pending = deque()
+        self._max_pending = pending
+
+    def observe(self, value, labels=()):
+        self._pending.append((labels, value))
+        if len(self._pending) > self._max_pending:
+            self._fold()
+
+    def _fold(self):
+        pending = self._pending
+        buckets = self.buckets
+        with self._lock:
+            while pending:
+                try:
+                    labels, value = pending.popleft()
+                except IndexError:  # emptied by another thread
+                    break
+                series = self._values.get(labels)
+                if series is None:
+                    # Per bucket counts (the last one is +Inf), sum
+                    series = self._values[labels] = \
+                        [0] * (len(buckets) + 1) + [0.0]
+                series[bisect_left(buckets, value)] += 1
+                series[-1] += value
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+            self._pending.clear()
+
+    def value(self, labels=()):
+        self._fold()
+        series = self._values.get(labels)
+        return sum(series[:-1]) if series else 0
+
+    def samples(self):
+        self._fold()
+        with self._lock:
+            values = [(labels, list(series))
+                      for labels, series in self._values.items()]
+        bounds = self.buckets + (float('inf'),)
+        for labels, series in sorted(values):
+            cumulative = 0
+            for bound, count in zip(bounds, series):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                yield (self.name + '_bucket'
+                       + _labels(self.labelnames, labels, (le,)),
+                       cumulative)
+            base = _labels(self.labelnames, labels)
+            yield self.name + '_sum' + base, series[-1]
+            yield self.name + '_count' + base, cumulative
+
+
+class Gauge(Counter):
+    """
+    Value read from a callback when the metrics are scraped
+    """
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=(), callback=None):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+
+    def samples(self):
+        values = self.callback() if self.callback else {}
+        for labels, value in sorted(values.items()):
+            yield self.name + _labels(self.labelnames, labels), value
+
+
+class Registry:
+    """
+    Set of metrics rendered together
+    """
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        """
+        Every metric in the Prometheus text exposition format
+        """
+        lines = []
+        for metric in self.metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for sample, value in metric.samples():
+                lines.append(f'{sample} {_number(value)}')
+        return '\n'.join(lines) + '\n'
+
+    def clear(self):
+        for metric in self.metrics:
+            metric.clear()
+
+
+REGISTRY = Registry()
+
+# The `_count` of a histogram is the number of observations: requests
+# and statements are not counted a second time
+REQUEST_DURATION = REGISTRY.register(Histogram(
+    'hbnb_http_request_duration_seconds',
+    'Time to build the response of a request',
+    ('namespace', 'resource', 'method', 'status')))
+STATEMENT_DURATION = REGISTRY.register(Histogram(
+    'hbnb_db_statement_duration_seconds', 'Execution time of SQL statements',
+    ('operation',), DB_BUCKETS))
+POOL_WAIT = REGISTRY.register(Histogram(
+    'hbnb_db_pool_checkout_wait_seconds',
+    'Time waited for a connection of the pool', (), DB_BUCKETS))
+POOL_CHECKED_OUT = REGISTRY.register(Gauge(
+    'hbnb_db_pool_checked_out', 'Connections of the pool in use',
+    ('engine',)))
+PASSWORD_HASH_DURATION = REGISTRY.register(Histogram(
+    'hbnb_password_hash_duration_seconds',
+    'Time of bcrypt calls, waiting for the hashing pool included',
+    ('operation',)))
+CACHE_LOOKUPS = REGISTRY.register(Counter(
+    'hbnb_cache_lookups_total', 'Lookups of in-process caches',
+    ('cache', 'result')))
+
+
+def cache_lookup(cache, hit):
+    """
+    Count a lookup of an in-process cache
+
+    Args:
+        cache (str): Name of the cache, e.g. 'amenity_catalog'
+        hit (bool): True if the value was served from the cache
+    """
+    CACHE_LOOKUPS.inc((cache, 'hit' if hit else 'miss'))
+
+
+# SQL text -> labels; statements are compiled once and reused, so the
+# same few strings come back
+_statement_labels = {}
+
+
+def _labels_of(statement):
+    labels = _statement_labels.get(statement)
+    if labels is None:
+        match = _OPERATION_RE.match(statement)
+        operation = match.group(1).upper() if match else ''
+        labels = (operation if operation in _OPERATIONS else 'OTHER',)
+        if len(_statement_labels) < 4096:
+            _statement_labels[statement] = labels
+    return labels
+
+
+def _time_statements(dialect):
+    # The statements are timed by wrapping the execution methods of the
+    # dialect: SQLAlchemy's cursor and dialect events cost several times
+    # more, and the engine events turn on the event dispatch of every
+    # connection operation
+    if getattr(dialect, '_metrics_timed', False):
+        return
+    for name in ('do_execute', 'do_executemany', 'do_execute_no_params'):
+        setattr(dialect, name, _timed(getattr(dialect, name)))
+    dialect._metrics_timed = True
+
+
+def _timed(execute):
+    def timed_execute(cursor, statement, *args):
+        started = time.perf_counter()
+        try:
+            return execute(cursor, statement, *args)
+        finally:
+            STATEMENT_DURATION.observe(time.perf_counter() - started,
+                                       _labels_of(statement))
+    return timed_execute
+
+
+def _time_checkouts(pool):
+    # The pool has no "before checkout" event: its _do_get, which
+    # blocks until a connection is free, is timed instead
+    if getattr(pool, '_metrics_timed', False):
+        return
+    get = pool._do_get
+
+    def timed_get():
+        started = time.perf_counter()
+        try:
+            return get()
+        finally:
+            POOL_WAIT.observe(time.perf_counter() - started)
+
+    pool._do_get = timed_get
+    pool._metrics_timed = True
+
+
+class Metrics:
+    """
+    Flask extension recording the metrics of the app and serving them
+
+    Configuration:
+        METRICS_ENABLED: Record and serve metrics
+        METRICS_PATH: URL of the metrics, `/metrics` by default
+        METRICS_TOKEN: When set, scrapers must send it as a bearer token
+    """
+    def __init__(self, app=None, api=None):
+        if app is not None:
+            self.init_app(app, api)
+
+    def init_app(self, app, api=None):
+        if not app.config.get('METRICS_ENABLED', True):
+            return
+        state = app.extensions['metrics'] = {
+            'api': api,
+            'engines': [],
+        }
+        # (endpoint, method, status) -> labels of the request histogram
+        request_labels = {}
+
+        @app.before_request
+        def start_request():
+            # Kept in the WSGI environ, not on g: the sub-requests of a
+            # batch share the application context of the batch request
+            request.environ['hbnb.metrics_started'] = time.perf_counter()
+
+        @app.after_request
+        def end_request(response):
+            current = request._get_current_object()
+            started = current.environ.pop('hbnb.metrics_started', None)
+            if started is None:
+                return response
+            rule = current.url_rule
+            key = (rule.endpoint if rule else None, current.method,
+                   response.status_code)
+            labels = request_labels.get(key)
+            if labels is None:
+                labels = request_labels[key] = \
+                    self._resource(app, api, key[0]) + (key[1], str(key[2]))
+            REQUEST_DURATION.observe(time.perf_counter() - started, labels)
+            return response
+
+        app.add_url_rule(app.config.get('METRICS_PATH', '/metrics'),
+                         'metrics', self._serve)
+
+        db = app.extensions.get('sqlalchemy')
+        if db is not None:
+            with app.app_context():
+                for engine in db.engines.values():
+                    _time_statements(engine.dialect)
+                    _time_checkouts(engine.pool)
+                    state['engines'].append(engine)
+        POOL_CHECKED_OUT.callback = self._checked_out
+
+    @staticmethod
+    def _checked_out():
+        values = {}
+        for engine in current_app.extensions['metrics']['engines']:
+            # dispose() replaces the pool: wrapped again here rather than
+            # on the engine_disposed event, as engine events turn on the
+            # event dispatch of every connection operation
+            _time_checkouts(engine.pool)
+            checked_out = getattr(engine.pool, 'checkedout', None)
+            if checked_out is not None:
+                values[(engine.url.render_as_string(),)] = checked_out()
+        return values
+
+    @staticmethod
+    def _resource(app, api, endpoint):
+        # (namespace, resource) of a flask-restx endpoint, the Flask
+        # endpoint name for other views; never the raw path, whose
+        # values (IDs) would make a series per object
+        if endpoint is None:
+            return ('', 'unmatched')
+        resource = getattr(app.view_functions.get(endpoint), 'view_class',
+                           None)
+        if resource is None:
+            return ('', endpoint)
+        for ns in getattr(api, 'namespaces', ()):
+            if any(entry.resource is resource for entry in ns.resources):
+                return (ns.name, resource.__name__)
+        return ('', resource.__name__)
+
+    @staticmethod
+    def _serve():
+        token = current_app.config.get('METRICS_TOKEN')
+        if token and not hmac.compare_digest(
+                request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return Response('Unauthorized\n', 401, mimetype='text/plain')
+        return Response(REGISTRY.render(), content_type=CONTENT_TYPE)
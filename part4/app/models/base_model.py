@@ -4,6 +4,7 @@ BaseModel class that defines all common attributes/methods for other classes
 """
 
 from app.extensions import db
+from app.persistence.transaction import commit
 import uuid
 from datetime import datetime
 
@@ -21,7 +22,7 @@ class BaseModel(db.Model):
         """
         self.updated_at = datetime.utcnow()
         db.session.add(self)
-        db.session.commit()
+        commit()
 
     def update(self, data):
         """
@@ -12,8 +12,8 @@ from sqlalchemy import Table, Column, ForeignKey
 place_amenity = Table(
     'place_amenity',
     db.Model.metadata,
-    Column('place_id', db.String(36), ForeignKey('places.id'), primary_key=True),
-    Column('amenity_id', db.String(36), ForeignKey('amenities.id'), primary_key=True)
+    Column('place_id', db.String(36), ForeignKey('places.id', ondelete='CASCADE'), primary_key=True),
+    Column('amenity_id', db.String(36), ForeignKey('amenities.id', ondelete='CASCADE'), primary_key=True)
 )
 
 class Place(BaseModel):
@@ -24,7 +24,7 @@ class Place(BaseModel):
     price = db.Column(db.Float, nullable=False)
     latitude = db.Column(db.Float, nullable=False)
     longitude = db.Column(db.Float, nullable=False)
-    owner_id = db.Column(db.String(36), ForeignKey('users.id'), nullable=False)  # Foreign key to User
+    owner_id = db.Column(db.String(36), ForeignKey('users.id', ondelete='CASCADE'), nullable=False)  # Foreign key to User
     # Removed redundant user_id column
     reviews = relationship('Review', backref='place', lazy=True)  # One-to-Many with Review
     amenities = relationship('Amenity', secondary=place_amenity, lazy='subquery',  # Many-to-Many with Amenity
@@ -5,13 +5,23 @@ Module for Review
 
 from app.extensions import db
 from .base_model import BaseModel
-from sqlalchemy import ForeignKey
+from sqlalchemy import CheckConstraint, ForeignKey, Index, UniqueConstraint
 
 
 class Review(BaseModel):
     __tablename__ = 'reviews'
+    # Same constraints as sql/create_tables.sql: one review per user and
+    # place, enforced by the DB rather than checked before inserting
+    __table_args__ = (
+        UniqueConstraint('user_id', 'place_id', name='uq_reviews_user_place'),
+        CheckConstraint('rating BETWEEN 1 AND 5', name='ck_reviews_rating'),
+        # Pages of a place's reviews, by date or by rating (keyset
+        # pagination, see ReviewRepository.page_by_place)
+        Index('ix_reviews_place_created', 'place_id', 'created_at', 'id'),
+        Index('ix_reviews_place_rating', 'place_id', 'rating', 'id'),
+    )
 
     text = db.Column(db.Text, nullable=False)
     rating = db.Column(db.Integer, nullable=False)
-    user_id = db.Column(db.String(36), ForeignKey('users.id'), nullable=False)  # Foreign key to User
-    place_id = db.Column(db.String(36), ForeignKey('places.id'), nullable=False)  # Foreign key to Place
+    user_id = db.Column(db.String(36), ForeignKey('users.id', ondelete='CASCADE'), nullable=False)  # Foreign key to User
+    place_id = db.Column(db.String(36), ForeignKey('places.id', ondelete='CASCADE'), nullable=False)  # Foreign key to Place
@@ -3,7 +3,7 @@
 Module for User
 """
 
-from app.extensions import db, bcrypt
+from app.extensions import db, hasher
 from sqlalchemy.orm import relationship
 from .base_model import BaseModel
 
@@ -42,10 +42,17 @@ class User(BaseModel):
         """
         Hash the password before storing it.
         """
-        self.password = bcrypt.generate_password_hash(password).decode('utf-8')
+        self.password = hasher.hash(password)
 
     def verify_password(self, password):
         """
         Verify the hashed password.
         """
-        return bcrypt.check_password_hash(self.password, password)
+        return hasher.verify(self.password, password)
+
+    def password_needs_rehash(self):
+        """
+        True if the password was hashed with another cost factor
+        than the configured one.
+        """
+        return hasher.needs_rehash(self.password)
@@ -0,0 +1,149 @@
+#!/usr/bin/python3
+"""
+Password hashing offloaded to a bounded worker pool
+
+bcrypt is deliberately slow. Running it on the request thread lets a
+burst of logins or registrations occupy every worker of the server, so
+hash and verify calls go through a small dedicated pool instead, with a
+cap on how many calls may wait for it.
+"""
+
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt as _bcrypt
+
+from app.metrics import PASSWORD_HASH_DURATION
+
+_COST_RE = re.compile(r'^\$2[abxy]?\$(\d{2})\$')
+
+
+class HasherBusy(Exception):
+    """
+    Raised when too many hash/verify calls are already waiting
+    """
+
+
+def _hash(password, rounds, prefix):
+    salt = _bcrypt.gensalt(rounds=rounds, prefix=prefix.encode('ascii'))
+    return _bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+
+
+def _verify(pw_hash, password):
+    try:
+        return _bcrypt.checkpw(password.encode('utf-8'),
+                               pw_hash.encode('utf-8'))
+    except ValueError:  # not a bcrypt hash
+        return False
+
+
+def hash_cost(pw_hash):
+    """
+    Cost factor (log rounds) stored in a bcrypt hash, None if unknown
+    """
+    match = _COST_RE.match(pw_hash or '')
+    return int(match.group(1)) if match else None
+
+
+class PasswordHasher:
+    """
+    Flask extension hashing and verifying passwords on a worker pool
+
+    Configuration:
+        BCRYPT_LOG_ROUNDS: bcrypt cost factor (see
+            benchmarks/bench_bcrypt_cost.py to pick one)
+        PASSWORD_HASH_EXECUTOR: 'thread' (bcrypt releases the GIL) or
+            'process'
+        PASSWORD_HASH_WORKERS: Size of the pool
+        PASSWORD_HASH_MAX_PENDING: Calls allowed to wait for the pool
+            before HasherBusy is raised
+        PASSWORD_HASH_TIMEOUT: Seconds a call waits for a pool slot
+    """
+    def __init__(self, app=None):
+        self.rounds = 12
+        self.prefix = '2b'
+        self.executor_type = 'thread'
+        self.workers = 2
+        self.max_pending = 32
+        self.timeout = 5
+        self._executor = None
+        self._pid = None
+        self._slots = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.rounds = app.config.get('BCRYPT_LOG_ROUNDS', 12)
+        self.prefix = app.config.get('BCRYPT_HASH_PREFIX', '2b')
+        self.executor_type = app.config.get('PASSWORD_HASH_EXECUTOR', 'thread')
+        self.workers = app.config.get('PASSWORD_HASH_WORKERS',
+                                      min(2, os.cpu_count() or 1))
+        self.max_pending = app.config.get('PASSWORD_HASH_MAX_PENDING', 32)
+        self.timeout = app.config.get('PASSWORD_HASH_TIMEOUT', 5)
+        self._shutdown()
+        app.extensions['password_hasher'] = self
+
+    def _shutdown(self):
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _get_executor(self):
+        # Created lazily, and again after a fork: pools do not survive it
+        if self._executor is None or self._pid != os.getpid():
+            with self._lock:
+                if self._executor is None or self._pid != os.getpid():
+                    if self.executor_type == 'process':
+                        # Imported on demand, it loads multiprocessing
+                        from concurrent.futures import ProcessPoolExecutor
+                        self._executor = ProcessPoolExecutor(self.workers)
+                    else:
+                        self._executor = ThreadPoolExecutor(
+                            self.workers, thread_name_prefix='bcrypt')
+                    self._slots = threading.BoundedSemaphore(
+                        self.workers + self.max_pending)
+                    self._pid = os.getpid()
+        return self._executor
+
+    def _run(self, operation, func, *args):
+        executor = self._get_executor()
+        slots = self._slots
+        started = time.perf_counter()
+        if not slots.acquire(timeout=self.timeout):
+            raise HasherBusy('Too many password operations in progress')
+        try:
+            return executor.submit(func, *args).result()
+        finally:
+            slots.release()
+            PASSWORD_HASH_DURATION.observe(time.perf_counter() - started,
+                                           (operation,))
+
+    def hash(self, password):
+        """
+        Hash a password with the configured cost factor
+
+        Returns:
+            str: The bcrypt hash
+        """
+        return self._run('hash', _hash, password, self.rounds, self.prefix)
+
+    def verify(self, pw_hash, password):
+        """
+        Check a password against a bcrypt hash
+
+        Returns:
+            bool: True if the password matches
+        """
+        return self._run('verify', _verify, pw_hash, password)
+
+    def needs_rehash(self, pw_hash):
+        """
+        True when a hash was made with another cost factor than the
+        configured one
+        """
+        return hash_cost(pw_hash) != self.rounds
@@ -0,0 +1,79 @@
+#!/usr/bin/python3
+"""
+DB constraint violations, reported as exceptions the API can map to
+HTTP statuses
+
+Writes are sent straight to the DB and rely on its UNIQUE and FOREIGN
+KEY constraints instead of checking with a read first: one round trip
+less, and no race between the check and the write.
+"""
+
+import re
+import sqlite3
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+UNIQUE = 'unique'
+FOREIGN_KEY = 'foreign_key'
+CHECK = 'check'
+NOT_NULL = 'not_null'
+
+_PATTERNS = (
+    # SQLite
+    (UNIQUE, re.compile(r'UNIQUE constraint failed: (?P<columns>.+)')),
+    (FOREIGN_KEY, re.compile(r'FOREIGN KEY constraint failed')),
+    (CHECK, re.compile(r'CHECK constraint failed: (?P<columns>.+)')),
+    (NOT_NULL, re.compile(r'NOT NULL constraint failed: (?P<columns>.+)')),
+    # PostgreSQL / MySQL
+    (UNIQUE, re.compile(r'duplicate key|Duplicate entry', re.I)),
+    (FOREIGN_KEY, re.compile(r'foreign key constraint', re.I)),
+    (CHECK, re.compile(r'check constraint', re.I)),
+    (NOT_NULL, re.compile(r'not-null constraint|cannot be null', re.I)),
+)
+
+
+class IntegrityViolation(ValueError):
+    """
+    A write broke a constraint of the DB schema
+
+    Attributes:
+        kind (str): 'unique', 'foreign_key', 'check', 'not_null' or None
+        columns (list): Columns involved (e.g. ['users.email']) when the
+            DB reports them
+    """
+    def __init__(self, message, kind=None, columns=None):
+        super().__init__(message)
+        self.kind = kind
+        self.columns = columns or []
+
+    @classmethod
+    def from_error(cls, error):
+        """
+        Build from a SQLAlchemy IntegrityError
+        """
+        message = str(getattr(error, 'orig', error))
+        for kind, pattern in _PATTERNS:
+            match = pattern.search(message)
+            if match:
+                columns = match.groupdict().get('columns')
+                columns = [column.strip() for column in columns.split(',')] \
+                    if columns else []
+                return cls(message, kind, columns)
+        return cls(message)
+
+    def involves(self, column):
+        """
+        True if the DB reported the column, e.g. 'email' or 'users.email'
+        """
+        return any(name == column or name.endswith('.' + column)
+                   for name in self.columns)
+
+
+@event.listens_for(Engine, 'connect')
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    # SQLite only enforces foreign keys when asked, per connection
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA foreign_keys=ON')
+        cursor.close()
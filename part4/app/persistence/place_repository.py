@@ -1,6 +1,70 @@
-from app.models.place import Place
+from sqlalchemy import func, select, true
+
+from app.extensions import db
+from app.models.place import Place, place_amenity
+from app.models.review import Review
+from app.models.user import User
 from app.persistence.repository import SQLAlchemyRepository
 
+
 class PlaceRepository(SQLAlchemyRepository):
     def __init__(self):
         super().__init__(Place)
+
+    def get_detail_rows(self, place_id, reviews_limit=10):
+        """
+        Place, owner, rating summary, amenity IDs and the latest reviews
+        (with their author's name) in a single SELECT
+
+        The reviews page is a LIMITed subquery outer joined to the place
+        row, so the result has one row per review of the page, or a
+        single row with NULL review columns when there is none.
+
+        Returns:
+            list: Result rows, empty if the place does not exist
+        """
+        reviewer = User.__table__.alias('reviewer')
+        page = (
+            select(Review.id, Review.text, Review.rating, Review.user_id,
+                   Review.created_at,
+                   reviewer.c.first_name, reviewer.c.last_name)
+            .join(reviewer, reviewer.c.id == Review.user_id)
+            .where(Review.place_id == place_id)
+            .order_by(Review.created_at.desc(), Review.id.desc())
+            .limit(reviews_limit)
+            .subquery('page'))
+
+        review_count = (select(func.count(Review.id))
+                        .where(Review.place_id == Place.id)
+                        .scalar_subquery())
+        rating_average = (select(func.avg(Review.rating))
+                          .where(Review.place_id == Place.id)
+                          .scalar_subquery())
+        amenity_ids = (select(func.aggregate_strings(
+                           place_amenity.c.amenity_id, ','))
+                       .where(place_amenity.c.place_id == Place.id)
+                       .scalar_subquery())
+
+        owner = User.__table__.alias('owner')
+        statement = (
+            select(
+                Place.id, Place.title, Place.description, Place.price,
+                Place.latitude, Place.longitude, Place.owner_id,
+                owner.c.first_name.label('owner_first_name'),
+                owner.c.last_name.label('owner_last_name'),
+                owner.c.email.label('owner_email'),
+                review_count.label('review_count'),
+                rating_average.label('rating_average'),
+                amenity_ids.label('amenity_ids'),
+                page.c.id.label('review_id'),
+                page.c.text.label('review_text'),
+                page.c.rating.label('review_rating'),
+                page.c.user_id.label('review_user_id'),
+                page.c.created_at.label('review_created_at'),
+                page.c.first_name.label('review_first_name'),
+                page.c.last_name.label('review_last_name'))
+            .outerjoin(owner, owner.c.id == Place.owner_id)
+            .outerjoin(page, true())
+            .where(Place.id == place_id)
+            .order_by(page.c.created_at.desc(), page.c.id.desc()))
+        return db.session.execute(statement).all()
@@ -1,5 +1,8 @@
 from abc import ABC, abstractmethod
+from sqlalchemy import exists, select
+from sqlalchemy.orm import lazyload, load_only, selectinload
 from app.extensions import db
+from app.persistence.transaction import commit
 
 class Repository(ABC):
     @abstractmethod
@@ -40,6 +43,14 @@ class InMemoryRepository(Repository):
     def get_all(self):
         return list(self._storage.values())
 
+    def iter_all(self, batch_size=1000):
+        return iter(list(self._storage.values()))
+
+    def exists(self, **filters):
+        return any(all(getattr(obj, key) == value
+                       for key, value in filters.items())
+                   for obj in self._storage.values())
+
     def update(self, obj_id, data):
         obj = self.get(obj_id)
         if obj:
@@ -63,29 +74,70 @@ class SQLAlchemyRepository(Repository):
     def __init__(self, model):
         self.model = model
 
+    def _shape_options(self, fields=None, include=None):
+        """
+        Translate an output shape into SQLAlchemy loader options
+
+        Only the requested columns are selected (plus the ones the
+        included relationships need to be joined), included
+        relationships are loaded in one batched SELECT each and every
+        other relationship is left unloaded.
+        """
+        if fields is None and include is None:
+            return []
+
+        include = include or ()
+        options = [lazyload('*')]
+        if fields is not None:
+            columns = set(fields)
+            for name in include:
+                relationship = getattr(self.model, name).property
+                columns.update(column.key
+                               for column in relationship.local_columns)
+            options.append(load_only(
+                *(getattr(self.model, column) for column in columns)))
+        for name in include:
+            options.append(selectinload(getattr(self.model, name)))
+        return options
+
+    def _query(self, fields=None, include=None):
+        return self.model.query.options(*self._shape_options(fields, include))
+
     def add(self, obj):
         db.session.add(obj)
-        db.session.commit()
+        commit()
 
-    def get(self, obj_id):
-        return self.model.query.get(str(obj_id))  # Ensure obj_id is a string
+    def get(self, obj_id, fields=None, include=None):
+        # Ensure obj_id is a string
+        return self._query(fields, include).get(str(obj_id))
 
-    def get_all(self):
-        return self.model.query.all()
+    def get_all(self, fields=None, include=None):
+        return self._query(fields, include).all()
+
+    def iter_all(self, batch_size=1000, fields=None, include=None):
+        # Rows are fetched from the cursor batch by batch instead of all at once
+        return self._query(fields, include).yield_per(batch_size)
+
+    def exists(self, **filters):
+        # SELECT EXISTS (...): no row is loaded
+        criteria = [getattr(self.model, key) == value
+                    for key, value in filters.items()]
+        return db.session.execute(
+            select(exists().where(*criteria))).scalar()
 
     def update(self, obj_id, data):
         obj = self.get(obj_id)  # Ensure obj_id is used correctly
         if obj:
             for key, value in data.items():
                 setattr(obj, key, value)
-            db.session.commit()
+            commit()
         return obj  # Return the updated object
 
     def delete(self, obj_id):
         obj = self.get(obj_id)
         if obj:
             db.session.delete(obj)
-            db.session.commit()
+            commit()
 
     def get_by_attribute(self, attr_name, attr_value):
         return self.model.query.filter_by(**{attr_name: attr_value}).all()  # Handle relationships
@@ -1,6 +1,62 @@
+from sqlalchemy import DateTime, String, and_, or_, select, type_coerce
+
+from app.extensions import db
 from app.models.review import Review
 from app.persistence.repository import SQLAlchemyRepository
 
+# Orders of a place's reviews: sort key -> (column, descending)
+REVIEW_ORDERS = {
+    '-created_at': (Review.created_at, True),
+    'created_at': (Review.created_at, False),
+    '-rating': (Review.rating, True),
+    'rating': (Review.rating, False),
+}
+
+
 class ReviewRepository(SQLAlchemyRepository):
     def __init__(self):
         super().__init__(Review)
+
+    def page_by_place(self, place_id, sort='-created_at', limit=50,
+                      after=None):
+        """
+        One page of a place's reviews, with keyset pagination
+
+        Rows are read from the (place_id, <sort column>, id) indexes: the
+        page starts right after the (value, id) of the previous page's
+        last review instead of skipping rows with an OFFSET.
+
+        Dates are compared as they are stored (text): rows written by the
+        ORM ('YYYY-MM-DD HH:MM:SS.ffffff') and by older SQL scripts
+        ('YYYY-MM-DD HH:MM:SS') are then ordered and compared the same
+        way, whatever their format.
+
+        Args:
+            place_id (UUID): The place
+            sort (str): Key of REVIEW_ORDERS
+            limit (int): Maximum number of reviews
+            after (tuple, optional): (sort value, id) of the last review
+                of the previous page, as returned with it
+
+        Returns:
+            list: (Review object, sort value as stored) pairs of the page
+        """
+        column, descending = REVIEW_ORDERS[sort]
+        # Same SQL as the column, values read and bound as stored
+        key = type_coerce(column, String) \
+            if isinstance(column.type, DateTime) else column
+        statement = select(Review, key.label('sort_value')).where(
+            Review.place_id == place_id)
+        if after is not None:
+            value, last_id = after
+            if descending:
+                statement = statement.where(or_(
+                    key < value, and_(key == value, Review.id < last_id)))
+            else:
+                statement = statement.where(or_(
+                    key > value, and_(key == value, Review.id > last_id)))
+        if descending:
+            statement = statement.order_by(column.desc(), Review.id.desc())
+        else:
+            statement = statement.order_by(column.asc(), Review.id.asc())
+        return db.session.execute(statement.limit(limit)).all()
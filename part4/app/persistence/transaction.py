@@ -0,0 +1,107 @@
+#!/usr/bin/python3
+"""
+Transaction helpers shared by the repositories and models
+
+Repositories commit after every write. Inside an `atomic()` block those
+commits only flush, and the whole block is committed (or rolled back)
+at once.
+"""
+
+import sqlite3
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from app.persistence.constraints import IntegrityViolation
+
+_atomic = ContextVar('atomic', default=False)
+
+
+def in_atomic():
+    """
+    True when the current code runs inside an `atomic()` block
+    """
+    return _atomic.get()
+
+
+@contextmanager
+def _constraints():
+    try:
+        yield
+    except IntegrityError as e:
+        # Inside atomic() the whole block is rolled back by atomic()
+        if not _atomic.get():
+            db.session.rollback()
+        raise IntegrityViolation.from_error(e) from e
+
+
+def commit():
+    """
+    Commit the session, or only flush it inside an `atomic()` block
+
+    Raises:
+        IntegrityViolation: If a write broke a constraint, the session
+        is then rolled back
+    """
+    with _constraints():
+        if _atomic.get():
+            db.session.flush()
+        else:
+            db.session.commit()
+
+
+def flush():
+    """
+    Send pending writes to the DB without committing
+
+    Raises:
+        IntegrityViolation: If a write broke a constraint, the session
+        is then rolled back
+    """
+    with _constraints():
+        db.session.flush()
+
+
+@contextmanager
+def atomic():
+    """
+    Group every write made in the block into a single transaction
+
+    The transaction is rolled back if the block raises.
+    """
+    if _atomic.get():
+        # Already inside a transaction, join it
+        yield
+        return
+
+    token = _atomic.set(True)
+    try:
+        yield
+        db.session.commit()
+    except BaseException:
+        db.session.rollback()
+        raise
+    finally:
+        _atomic.reset(token)
+
+
+@contextmanager
+def savepoint():
+    """
+    Nested transaction: the writes of the block are rolled back alone if
+    it raises, the enclosing transaction goes on
+
+    pysqlite only begins a transaction before a write: a savepoint
+    opened first would start one of its own, committed when the
+    savepoint is released, even inside an `atomic()` block. The
+    transaction is begun explicitly first.
+    """
+    connection = db.session.connection()
+    dbapi_connection = connection.connection.dbapi_connection
+    if isinstance(dbapi_connection, sqlite3.Connection) \
+            and not dbapi_connection.in_transaction:
+        connection.exec_driver_sql('BEGIN')
+    with db.session.begin_nested():
+        yield
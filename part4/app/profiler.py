@@ -0,0 +1,268 @@
+#!/usr/bin/python3
+"""
+Sampling profiler for a running worker
+
+A background thread reads the stack of every request thread
+(`sys._current_frames()`) every PROFILER_INTERVAL seconds, for a given
+number of seconds. Requests are not slowed down while they are not
+sampled: the cost is the sampler's own CPU time, reported with the
+profile (a few percent at the default 100 Hz).
+
+Frames are named `module:qualified name`, e.g.
+`app.services.facade:HBnBFacade.get_place`, and app frames are sorted in
+layers (endpoint, facade, repository, model) for the summary. Profiles
+are returned as collapsed stacks (flamegraph.pl, speedscope, ...),
+speedscope JSON, or a summary of the hottest functions.
+"""
+
+import sys
+import threading
+import time
+from collections import Counter
+
+FORMATS = ('collapsed', 'speedscope', 'summary')
+
+# Module prefix -> layer, the first match wins
+LAYERS = (
+    ('app.api', 'endpoint'),
+    ('app.services', 'facade'),
+    ('app.persistence', 'repository'),
+    ('app.models', 'model'),
+    ('app', 'app'),
+    ('sqlalchemy', 'sqlalchemy'),
+    ('flask', 'flask'),
+    ('werkzeug', 'flask'),
+)
+APP_LAYERS = ('endpoint', 'facade', 'repository', 'model', 'app')
+
+# Frames of the request dispatch: stacks are cut above the outermost
+# one, and threads without one (idle workers, the server loop) skipped
+_ROOTS = frozenset(('wsgi_app', 'full_dispatch_request'))
+
+
+class ProfilerBusy(Exception):
+    """
+    Raised when a profile is already being recorded
+    """
+
+
+def layer(module):
+    """
+    Layer of the app a module belongs to, None for other modules
+    """
+    for prefix, name in LAYERS:
+        if module == prefix or module.startswith(prefix + '.'):
+            return name
+    return None
+
+
+class Profile:
+    """
+    Stacks sampled during a profile, with their number of samples
+
+    Attributes:
+        stacks (Counter): Tuple of frames (outermost first) -> samples,
+            a frame being (name, file, first line)
+        interval (float): Seconds between two samples
+        duration (float): Seconds the profile lasted
+        sampler_time (float): CPU seconds spent by the sampler
+    """
+    def __init__(self, stacks, interval, duration, sampler_time, ticks):
+        self.stacks = stacks
+        self.interval = interval
+        self.duration = duration
+        self.sampler_time = sampler_time
+        self.ticks = ticks
+
+    @property
+    def samples(self):
+        return sum(self.stacks.values())
+
+    @property
+    def overhead(self):
+        """
+        Share of one CPU used by the sampler
+        """
+        return self.sampler_time / self.duration if self.duration else 0.0
+
+    def collapsed(self):
+        """
+        One `frame;frame;frame count` line per stack, outermost first
+        """
+        lines = [';'.join(frame[0] for frame in stack) + f' {count}'
+                 for stack, count in self.stacks.most_common()]
+        return '\n'.join(lines) + '\n'
+
+    def speedscope(self, name='hbnb'):
+        """
+        Sampled profile in the speedscope file format
+        """
+        frames = []
+        index = {}
+        samples = []
+        weights = []
+        for stack, count in self.stacks.most_common():
+            sample = []
+            for frame in stack:
+                if frame not in index:
+                    index[frame] = len(frames)
+                    frames.append({'name': frame[0], 'file': frame[1],
+                                   'line': frame[2]})
+                sample.append(index[frame])
+            samples.append(sample)
+            weights.append(count * self.interval)
+        return {
+            '$schema': 'https://www.speedscope.app/file-format-schema.json',
+            'name': name,
+            'exporter': 'hbnb',
+            'activeProfileIndex': 0,
+            'shared': {'frames': frames},
+            'profiles': [{
+                'type': 'sampled',
+                'name': name,
+                'unit': 'seconds',
+                'startValue': 0,
+                'endValue': sum(weights),
+                'samples': samples,
+                'weights': weights,
+            }],
+        }
+
+    def summary(self, top=30):
+        """
+        Hottest app functions: samples in the function itself (self) and
+        in the function or its callees (total), with their layer
+        """
+        total = Counter()
+        own = Counter()
+        for stack, count in self.stacks.items():
+            for frame in set(stack):
+                total[frame[0]] += count
+            own[stack[-1][0]] += count
+
+        samples = self.samples or 1
+        functions = []
+        for name, count in total.most_common():
+            kind = layer(name.split(':', 1)[0])
+            if kind not in APP_LAYERS:
+                continue
+            functions.append({
+                'function': name,
+                'layer': kind,
+                'total': round(count / samples * 100, 2),
+                'self': round(own[name] / samples * 100, 2),
+            })
+            if len(functions) == top:
+                break
+
+        layers = Counter()
+        for stack, count in self.stacks.items():
+            # Time of a sample goes to the innermost app layer
+            for frame in reversed(stack):
+                kind = layer(frame[0].split(':', 1)[0])
+                if kind in APP_LAYERS and kind != 'app':
+                    layers[kind] += count
+                    break
+            else:
+                layers['other'] += count
+
+        return {
+            'duration': round(self.duration, 3),
+            'interval': self.interval,
+            'samples': self.samples,
+            'sampler_overhead': round(self.overhead * 100, 2),
+            'layers': {kind: round(count / samples * 100, 2)
+                       for kind, count in layers.most_common()},
+            'functions': functions,
+        }
+
+
+def _frame_name(code, module):
+    return f"{module}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+class SamplingProfiler:
+    """
+    Records a Profile of the request threads of the process
+
+    Only one profile runs at a time per process.
+    """
+    _running = threading.Lock()
+
+    def __init__(self, interval=0.01, max_depth=128):
+        self.interval = interval
+        self.max_depth = max_depth
+        self._names = {}
+
+    def _stack(self, frame):
+        names = self._names
+        stack = []
+        root = None
+        while frame is not None:
+            code = frame.f_code
+            entry = names.get(code)
+            if entry is None:
+                module = frame.f_globals.get('__name__', '?')
+                entry = names[code] = (
+                    (_frame_name(code, module), code.co_filename,
+                     code.co_firstlineno),
+                    code.co_name in _ROOTS)
+            stack.append(entry[0])
+            if entry[1]:
+                root = len(stack)
+            frame = frame.f_back
+        if root is None:
+            return None
+        # Outermost first, from the dispatch of the request
+        stack = stack[:root]
+        stack.reverse()
+        return tuple(stack[:self.max_depth])
+
+    def record(self, seconds):
+        """
+        Sample the request threads for some seconds
+
+        Blocks the calling thread, which is not sampled.
+
+        Returns:
+            Profile: The recorded profile
+
+        Raises:
+            ProfilerBusy: If a profile is already being recorded
+        """
+        if not self._running.acquire(blocking=False):
+            raise ProfilerBusy('A profile is already being recorded')
+        try:
+            stacks = Counter()
+            caller = threading.get_ident()
+            state = {'ticks': 0, 'cpu': 0.0}
+            stop = threading.Event()
+
+            def sample():
+                cpu_start = time.thread_time()
+                deadline = time.perf_counter() + seconds
+                sampler = threading.get_ident()
+                while not stop.wait(self.interval):
+                    for thread_id, frame in sys._current_frames().items():
+                        if thread_id in (sampler, caller):
+                            continue
+                        stack = self._stack(frame)
+                        if stack:
+                            stacks[stack] += 1
+                    state['ticks'] += 1
+                    if time.perf_counter() >= deadline:
+                        break
+                state['cpu'] = time.thread_time() - cpu_start
+
+            started = time.perf_counter()
+            thread = threading.Thread(target=sample, name='profiler',
+                                      daemon=True)
+            thread.start()
+            thread.join(seconds + 5)
+            stop.set()
+            thread.join()
+            duration = time.perf_counter() - started
+            return Profile(stacks, self.interval, duration, state['cpu'],
+                           state['ticks'])
+        finally:
+            self._running.release()
@@ -0,0 +1,242 @@
+#!/usr/bin/python3
+"""
+Token-bucket rate limiting
+
+Each (limit, key) pair owns a bucket holding up to `capacity` tokens and
+refilled at `rate` tokens per second; a request takes one token or is
+rejected with 429. Limits are declared on the resources:
+
+    @jwt_required()
+    @limiter.limit('write', by_user_or_ip)
+    def post(self):
+        ...
+
+and configured in RATELIMITS, e.g. {'write': '60/minute'}.
+Buckets live in process memory by default, or in a SQLite file shared
+by every worker process with RATELIMIT_STORAGE = 'sqlite:///path.db'.
+"""
+
+import math
+import os
+import threading
+import time
+from functools import wraps
+
+from flask import current_app, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+
+PERIODS = {
+    'second': 1,
+    'minute': 60,
+    'hour': 3600,
+    'day': 86400,
+}
+
+
+def parse_rate(spec):
+    """
+    Parse '<count>/<period>' (e.g. '10/minute') into (capacity, rate)
+
+    Returns:
+        tuple: bucket capacity and refill rate in tokens per second
+    """
+    count, _, period = spec.partition('/')
+    count = int(count)
+    seconds = PERIODS[period.strip().rstrip('s')]
+    return count, count / seconds
+
+
+# Key functions: what a bucket is shared by
+
+def by_ip():
+    return request.remote_addr or 'unknown'
+
+
+def by_json_field(field):
+    """
+    Key on a field of the JSON body, e.g. the email of a login attempt
+    """
+    def key():
+        payload = request.get_json(silent=True) or {}
+        value = payload.get(field)
+        return str(value).strip().lower() if value else None
+    return key
+
+
+def by_user_or_ip():
+    """
+    Key on the authenticated user, or the client IP for anonymous calls
+    """
+    verify_jwt_in_request(optional=True)
+    identity = get_jwt_identity()
+    if isinstance(identity, dict) and identity.get('id'):
+        return 'user:' + identity['id']
+    return 'ip:' + by_ip()
+
+
+class MemoryStore:
+    """
+    Buckets in a dict of key -> (tokens, timestamp)
+
+    Buckets that had time to refill completely are equivalent to
+    missing ones and are swept out every `sweep_every` calls.
+    """
+    def __init__(self, sweep_every=1000):
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._calls = 0
+        self.sweep_every = sweep_every
+
+    def take(self, key, capacity, rate, now):
+        with self._lock:
+            tokens, last = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + max(0, now - last) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+
+            self._calls += 1
+            if self._calls >= self.sweep_every:
+                self._calls = 0
+                self._sweep(now)
+        return allowed, tokens
+
+    def _sweep(self, now):
+        # Keys are (limit, key, ttl): ttl is the time an empty bucket
+        # takes to be full again
+        expired = [key for key, (tokens, last) in self._buckets.items()
+                   if now - last > key[2]]
+        for key in expired:
+            del self._buckets[key]
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class SQLiteStore:
+    """
+    Buckets in a SQLite file, shared by the worker processes of a host
+    """
+    def __init__(self, path, sweep_every=1000):
+        self.path = path
+        self.sweep_every = sweep_every
+        self._local = threading.local()
+        self._calls = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS rate_buckets ('
+                         'key TEXT PRIMARY KEY, tokens REAL NOT NULL, '
+                         'ts REAL NOT NULL, ttl REAL NOT NULL)')
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            import sqlite3  # only needed with this store
+            conn = sqlite3.connect(self.path, timeout=5,
+                                   isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=OFF')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def take(self, key, capacity, rate, now):
+        name = '|'.join(map(str, key))
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT tokens, ts FROM rate_buckets '
+                               'WHERE key = ?', (name,)).fetchone()
+            tokens, last = row if row else (capacity, now)
+            tokens = min(capacity, tokens + max(0, now - last) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            conn.execute('INSERT OR REPLACE INTO rate_buckets '
+                         '(key, tokens, ts, ttl) VALUES (?, ?, ?, ?)',
+                         (name, tokens, now, key[2]))
+            self._calls += 1
+            if self._calls >= self.sweep_every:
+                self._calls = 0
+                conn.execute('DELETE FROM rate_buckets WHERE ? - ts > ttl',
+                             (now,))
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return allowed, tokens
+
+
+class RateLimiter:
+    """
+    Flask extension applying token-bucket limits to resources
+
+    Configuration:
+        RATELIMIT_ENABLED: Turn every limit on or off
+        RATELIMIT_STORAGE: 'memory' or 'sqlite:///path/to/file.db'
+        RATELIMITS: dict of limit name -> '<count>/<period>'
+    """
+    def __init__(self, app=None):
+        self.store = MemoryStore()
+        self.enabled = True
+        self.limits = {}
+        self.rejected = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('RATELIMIT_ENABLED', True)
+        self.limits = {name: parse_rate(spec) for name, spec
+                       in app.config.get('RATELIMITS', {}).items()}
+
+        storage = app.config.get('RATELIMIT_STORAGE', 'memory')
+        if storage.startswith('sqlite:///'):
+            self.store = SQLiteStore(storage[len('sqlite:///'):])
+        else:
+            self.store = MemoryStore()
+        app.extensions['ratelimit'] = self
+
+    def hit(self, name, key):
+        """
+        Take a token from a bucket
+
+        Returns:
+            float: 0 if allowed, else seconds until a token is available
+        """
+        capacity, rate = self.limits[name]
+        # Time for an empty bucket to be full again, used for expiry
+        ttl = capacity / rate
+        allowed, tokens = self.store.take((name, key, ttl), capacity, rate,
+                                          time.time())
+        if allowed:
+            return 0
+        self.rejected += 1
+        return (1 - tokens) / rate
+
+    def limit(self, name, key_func=by_ip):
+        """
+        Decorator limiting a resource method with the named limit
+
+        Args:
+            name (str): Name of the limit in RATELIMITS
+            key_func (callable): Returns the bucket key for the current
+                request; requests with a None key are not limited
+        """
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if self.enabled and name in self.limits:
+                    key = key_func()
+                    if key is not None:
+                        retry_after = self.hit(name, key)
+                        if retry_after:
+                            current_app.logger.debug(
+                                'Rate limit %s exceeded for %s', name, key)
+                            return {'error': 'Too many requests'}, 429, {
+                                'Retry-After': str(math.ceil(retry_after))
+                            }
+                return func(*args, **kwargs)
+            return wrapper
+        return decorator
@@ -0,0 +1,247 @@
+#!/usr/bin/python3
+"""
+Streaming bulk export of the catalog to NDJSON or CSV files
+
+Rows are read through a server-side cursor with `yield_per` and written
+to disk as they arrive, so an export never holds the table in memory.
+Jobs started from the API run in a separate worker process with its own
+DB engine; their state is kept next to the file in a small JSON file so
+any API worker can report on it and serve the result.
+"""
+
+import csv
+import json
+import os
+import threading
+import uuid
+from datetime import datetime
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session, configure_mappers, joinedload, selectinload
+
+from app.models.amenity import Amenity  # noqa: F401 (needed by the mappers)
+from app.models.place import Place
+from app.models.review import Review
+from app.models.user import User  # noqa: F401 (needed by the mappers)
+
+FORMATS = ('ndjson', 'csv')
+KINDS = ('places', 'reviews')
+
+PLACE_CSV_COLUMNS = [
+    'id', 'title', 'description', 'price', 'latitude', 'longitude',
+    'owner_id', 'owner_first_name', 'owner_last_name', 'owner_email',
+    'amenities', 'created_at', 'updated_at',
+]
+REVIEW_CSV_COLUMNS = [
+    'id', 'text', 'rating', 'user_id', 'place_id', 'created_at', 'updated_at',
+]
+
+
+def _timestamp(value):
+    return value.isoformat() if value is not None else None
+
+
+def _place_record(place):
+    owner = place.user
+    return {
+        'id': place.id,
+        'title': place.title,
+        'description': place.description,
+        'price': place.price,
+        'latitude': place.latitude,
+        'longitude': place.longitude,
+        'owner': {
+            'id': owner.id,
+            'first_name': owner.first_name,
+            'last_name': owner.last_name,
+            'email': owner.email,
+        } if owner is not None else None,
+        'amenities': [{'id': amenity.id, 'name': amenity.name}
+                      for amenity in place.amenities],
+        'created_at': _timestamp(place.created_at),
+        'updated_at': _timestamp(place.updated_at),
+    }
+
+
+def _place_row(record):
+    owner = record['owner'] or {}
+    return {
+        **{key: record[key] for key in PLACE_CSV_COLUMNS if key in record},
+        'owner_id': owner.get('id'),
+        'owner_first_name': owner.get('first_name'),
+        'owner_last_name': owner.get('last_name'),
+        'owner_email': owner.get('email'),
+        # Same ';' separated IDs as the CSV bulk import expects
+        'amenities': ';'.join(amenity['id']
+                              for amenity in record['amenities']),
+    }
+
+
+def _review_record(review):
+    return {
+        'id': review.id,
+        'text': review.text,
+        'rating': review.rating,
+        'user_id': review.user_id,
+        'place_id': review.place_id,
+        'created_at': _timestamp(review.created_at),
+        'updated_at': _timestamp(review.updated_at),
+    }
+
+
+EXPORTS = {
+    # kind: (statement builder, record builder, CSV columns, CSV row)
+    'places': (
+        lambda: select(Place).options(joinedload(Place.user),
+                                      selectinload(Place.amenities)),
+        _place_record, PLACE_CSV_COLUMNS, _place_row),
+    'reviews': (
+        lambda: select(Review),
+        _review_record, REVIEW_CSV_COLUMNS, lambda record: record),
+}
+
+
+def write_export(engine, kind, fmt, out, batch_size=1000):
+    """
+    Write every row of a kind to an open text file
+
+    Args:
+        engine (Engine): Engine to read from
+        kind (str): 'places' or 'reviews'
+        fmt (str): 'ndjson' or 'csv'
+        out (file): Text file to write to
+        batch_size (int): Rows fetched per cursor batch
+
+    Returns:
+        int: Number of exported rows
+    """
+    statement, to_record, columns, to_row = EXPORTS[kind]
+    writer = None
+    if fmt == 'csv':
+        writer = csv.DictWriter(out, fieldnames=columns)
+        writer.writeheader()
+
+    count = 0
+    with Session(engine) as session:
+        result = session.execute(
+            statement().execution_options(yield_per=batch_size,
+                                          stream_results=True))
+        for obj in result.scalars():
+            record = to_record(obj)
+            if writer is not None:
+                writer.writerow(to_row(record))
+            else:
+                out.write(json.dumps(record) + '\n')
+            count += 1
+    return count
+
+
+class ExportJobs:
+    """
+    Exports stored as files in a directory, with their JSON status
+
+    Args:
+        directory (str): Where export files and statuses are written
+    """
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _status_path(self, job_id):
+        return os.path.join(self.directory, f'{job_id}.json')
+
+    def file_path(self, job):
+        return os.path.join(self.directory,
+                            f"{job['id']}.{job['kind']}.{job['format']}")
+
+    def _write_status(self, job):
+        path = self._status_path(job['id'])
+        with open(path + '.tmp', 'w') as f:
+            json.dump(job, f)
+        os.replace(path + '.tmp', path)
+
+    def get(self, job_id):
+        """
+        Status of a job, or None when it does not exist
+        """
+        try:
+            uuid.UUID(job_id)
+            with open(self._status_path(job_id)) as f:
+                return json.load(f)
+        except (ValueError, OSError):
+            return None
+
+    def run(self, job, engine, batch_size):
+        """
+        Run a job to completion in the current process
+
+        The file is written under a temporary name and renamed once
+        complete, so a download never sees a partial export.
+        """
+        path = self.file_path(job)
+        try:
+            with open(path + '.part', 'w', encoding='utf-8', newline='') as out:
+                job['rows'] = write_export(engine, job['kind'], job['format'],
+                                           out, batch_size)
+            os.replace(path + '.part', path)
+            job['size'] = os.path.getsize(path)
+            job['status'] = 'done'
+        except Exception as e:
+            job['status'] = 'failed'
+            job['error'] = str(e)
+            if os.path.exists(path + '.part'):
+                os.remove(path + '.part')
+        job['finished_at'] = datetime.utcnow().isoformat()
+        self._write_status(job)
+        return job
+
+    def start(self, kind, fmt, engine, batch_size=1000):
+        """
+        Start an export in the background
+
+        File databases are exported by a separate process with its own
+        engine. In-memory databases are not visible from another process,
+        they are exported by a thread using the given engine.
+
+        Returns:
+            dict: The status of the new job
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        job = {
+            'id': str(uuid.uuid4()),
+            'kind': kind,
+            'format': fmt,
+            'status': 'running',
+            'rows': None,
+            'size': None,
+            'error': None,
+            'created_at': datetime.utcnow().isoformat(),
+            'finished_at': None,
+        }
+        self._write_status(job)
+
+        url = engine.url
+        if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+            worker = threading.Thread(target=self.run, daemon=True,
+                                      args=(dict(job), engine, batch_size))
+        else:
+            import multiprocessing  # only the API process starts workers
+            context = multiprocessing.get_context('spawn')
+            worker = context.Process(
+                target=_run_in_process, daemon=True,
+                args=(self.directory, dict(job),
+                      url.render_as_string(hide_password=False), batch_size))
+        worker.start()
+        return job
+
+
+def _run_in_process(directory, job, database_url, batch_size):
+    """
+    Entry point of the export worker process
+    """
+    # Backrefs such as Place.user only exist once every mapper is set up
+    configure_mappers()
+    engine = create_engine(database_url)
+    try:
+        ExportJobs(directory).run(job, engine, batch_size)
+    finally:
+        engine.dispose()
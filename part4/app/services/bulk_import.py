@@ -0,0 +1,344 @@
+#!/usr/bin/python3
+"""
+Streaming bulk import of places, amenities and reviews
+
+Rows are read one at a time from an NDJSON or CSV stream, validated
+against the JSON schema of the matching API model, checked against the
+DB in batches (one IN query per foreign key) and inserted with one
+executemany per batch, each batch in its own transaction.
+"""
+
+import csv
+import json
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime
+
+from jsonschema import Draft4Validator
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+
+from app.amenity_catalog import normalize_name
+from app.extensions import amenity_catalog, db
+from app.models.amenity import Amenity
+from app.models.place import Place, place_amenity
+from app.models.review import Review
+from app.models.user import User
+from app.persistence.transaction import commit, savepoint
+
+FORMATS = ('ndjson', 'csv')
+
+
+def iter_records(stream, fmt):
+    """
+    Parse a text stream lazily
+
+    Args:
+        stream (file): Text stream to read
+        fmt (str): 'ndjson' or 'csv'
+
+    Yields:
+        tuple: (line number, record dict or None, parse error or None)
+    """
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record, None
+        return
+
+    for line_no, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_no, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield line_no, None, "Each line must be a JSON object"
+            continue
+        yield line_no, record, None
+
+
+def _coerce_csv(record, properties):
+    """
+    Convert CSV strings to the types declared in the schema
+
+    Empty cells are dropped, arrays are ';' separated.
+    """
+    row = {}
+    for key, value in record.items():
+        if key is None or value is None or value == '':
+            continue
+        kind = properties.get(key, {}).get('type')
+        try:
+            if kind == 'number':
+                value = float(value)
+            elif kind == 'integer':
+                value = int(value)
+            elif kind == 'boolean':
+                value = value.strip().lower() in ('1', 'true', 'yes')
+            elif kind == 'array':
+                value = [item.strip() for item in value.split(';')
+                         if item.strip()]
+        except ValueError:
+            # Left as a string, schema validation reports the type error
+            pass
+        row[key] = value
+    return row
+
+
+class BulkImporter(ABC):
+    """
+    Base importer, subclasses define the table and the DB checks
+
+    Args:
+        schema (dict): JSON schema of the API model rows must match
+        batch_size (int): Rows validated and inserted per transaction
+        defaults (dict, optional): Values used for missing row keys
+        max_errors (int): Errors kept in the report
+    """
+    model = None
+
+    def __init__(self, schema, batch_size=1000, defaults=None,
+                 max_errors=1000):
+        self.schema = schema
+        self.validator = Draft4Validator(schema)
+        self.properties = schema.get('properties', {})
+        self.batch_size = batch_size
+        self.defaults = defaults or {}
+        self.max_errors = max_errors
+        self.inserted = 0
+        self.failed = 0
+        self.errors = []
+
+    def error(self, line, messages):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'line': line, 'errors': messages})
+
+    def check_batch(self, batch):
+        """
+        Check a batch of schema-valid rows against the DB
+
+        Args:
+            batch (list): (line, row) pairs
+
+        Returns:
+            list: the (line, row) pairs that can be inserted
+        """
+        return batch
+
+    @abstractmethod
+    def to_values(self, row, now):
+        """
+        Build the column values of one row
+        """
+        pass
+
+    def extra_inserts(self, rows):
+        """
+        Additional (table, values) inserts for a batch of rows
+        """
+        return []
+
+    @staticmethod
+    def existing(column, values):
+        """
+        Subset of values present in a column, in a single query
+        """
+        values = set(values)
+        if not values:
+            return set()
+        return set(db.session.execute(
+            select(column).where(column.in_(values))).scalars())
+
+    def _insert(self, rows):
+        now = datetime.utcnow()
+        values = [self.to_values(row, now) for _, row in rows]
+        db.session.execute(insert(self.model.__table__), values)
+        for table, extra in self.extra_inserts(
+                [(row, value) for (_, row), value in zip(rows, values)]):
+            if extra:
+                db.session.execute(insert(table), extra)
+
+    def flush(self, batch):
+        """
+        Check and insert one batch in its own transaction
+
+        The batch is inserted in a savepoint and committed with
+        transaction.commit(): inside an atomic() block (an atomic batch
+        request) it is only flushed, and committed or rolled back with
+        the block. If the batch violates a constraint, rows are retried
+        one by one in savepoints so only the offending rows are reported.
+        """
+        rows = self.check_batch(batch)
+        if not rows:
+            return
+        try:
+            with savepoint():
+                self._insert(rows)
+            self.inserted += len(rows)
+        except IntegrityError:
+            for line, row in rows:
+                try:
+                    with savepoint():
+                        self._insert([(line, row)])
+                    self.inserted += 1
+                except IntegrityError as e:
+                    self.error(line, [str(e.orig)])
+        commit()
+
+    def run(self, stream, fmt):
+        """
+        Import every record of a stream
+
+        Args:
+            stream (file): Text stream of NDJSON lines or CSV rows
+            fmt (str): 'ndjson' or 'csv'
+
+        Returns:
+            dict: Report with inserted/failed counts and per-line errors
+        """
+        batch = []
+        for line, record, parse_error in iter_records(stream, fmt):
+            if parse_error:
+                self.error(line, [parse_error])
+                continue
+            if fmt == 'csv':
+                record = _coerce_csv(record, self.properties)
+            row = {**self.defaults, **record}
+
+            messages = [error.message
+                        for error in self.validator.iter_errors(row)]
+            if messages:
+                self.error(line, messages)
+                continue
+
+            batch.append((line, row))
+            if len(batch) >= self.batch_size:
+                self.flush(batch)
+                batch = []
+        if batch:
+            self.flush(batch)
+
+        return self.report()
+
+    def report(self):
+        report = {
+            'inserted': self.inserted,
+            'failed': self.failed,
+            'errors': self.errors,
+        }
+        if self.failed > len(self.errors):
+            report['errors_truncated'] = True
+        return report
+
+
+class AmenityImporter(BulkImporter):
+    model = Amenity
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.seen = set()
+
+    def check_batch(self, batch):
+        # Same rule as the API: names are unique ignoring case and spacing
+        rows = []
+        for line, row in batch:
+            key = normalize_name(row['name'])
+            if key in self.seen or amenity_catalog.get_by_name(row['name']):
+                self.error(line, ['Amenity already registered'])
+                continue
+            self.seen.add(key)
+            rows.append((line, row))
+        return rows
+
+    def to_values(self, row, now):
+        return {'id': str(uuid.uuid4()), 'name': row['name'],
+                'created_at': now, 'updated_at': now}
+
+
+class PlaceImporter(BulkImporter):
+    model = Place
+
+    def check_batch(self, batch):
+        owners = self.existing(
+            User.id, [row.get('owner_id') for _, row in batch])
+        # Amenity IDs are checked against the in-memory catalog
+        unknown_amenities = set(amenity_catalog.missing(
+            [amenity_id for _, row in batch
+             for amenity_id in row.get('amenities', [])]))
+        rows = []
+        for line, row in batch:
+            messages = []
+            if row.get('owner_id') not in owners:
+                messages.append('Unknown owner_id')
+            unknown = [amenity_id for amenity_id in row.get('amenities', [])
+                       if amenity_id in unknown_amenities]
+            if unknown:
+                messages.append(f"Unknown amenities: {', '.join(unknown)}")
+            if messages:
+                self.error(line, messages)
+            else:
+                rows.append((line, row))
+        return rows
+
+    def to_values(self, row, now):
+        return {
+            'id': str(uuid.uuid4()),
+            'title': row['title'],
+            'description': row.get('description'),
+            'price': round(row['price'], 2),
+            'latitude': row['latitude'],
+            'longitude': row['longitude'],
+            'owner_id': row['owner_id'],
+            'created_at': now,
+            'updated_at': now,
+        }
+
+    def extra_inserts(self, rows):
+        links = [{'place_id': values['id'], 'amenity_id': amenity_id}
+                 for row, values in rows
+                 for amenity_id in dict.fromkeys(row.get('amenities', []))]
+        return [(place_amenity, links)]
+
+
+class ReviewImporter(BulkImporter):
+    model = Review
+
+    def check_batch(self, batch):
+        users = self.existing(User.id, [row['user_id'] for _, row in batch])
+        places = self.existing(Place.id, [row['place_id'] for _, row in batch])
+        rows = []
+        for line, row in batch:
+            messages = []
+            if row['user_id'] not in users:
+                messages.append('Unknown user_id')
+            if row['place_id'] not in places:
+                messages.append('Unknown place_id')
+            if not row['text'].strip():
+                messages.append('Text of the review cannot be empty')
+            if messages:
+                self.error(line, messages)
+            else:
+                rows.append((line, row))
+        return rows
+
+    def to_values(self, row, now):
+        return {
+            'id': str(uuid.uuid4()),
+            'text': row['text'],
+            'rating': row['rating'],
+            'user_id': row['user_id'],
+            'place_id': row['place_id'],
+            'created_at': now,
+            'updated_at': now,
+        }
+
+
+IMPORTERS = {
+    'amenities': AmenityImporter,
+    'places': PlaceImporter,
+    'reviews': ReviewImporter,
+}
@@ -1,9 +1,20 @@
+from flask import g, has_app_context
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import insert
+
 from app.persistence.repository import InMemoryRepository, SQLAlchemyRepository
 from app.persistence.user_repository import UserRepository
+from app.persistence.place_repository import PlaceRepository
+from app.persistence.review_repository import ReviewRepository
+from app.persistence.transaction import flush
 from app.models.user import User
 from app.models.amenity import Amenity
-from app.models.place import Place
+from app.models.place import Place, place_amenity
 from app.models.review import Review
+from app.services.bulk_import import IMPORTERS
+from app.services.bulk_export import ExportJobs, write_export
+from app.extensions import amenity_catalog, db, hasher, leaderboards
+from app.metrics import cache_lookup
 
 
 class HBnBFacade:
@@ -18,42 +29,172 @@ class HBnBFacade:
         Initialize repositories for user, place, review, and amenity
         """
         self.user_repo = UserRepository()
-        self.place_repo = SQLAlchemyRepository(Place)
-        self.review_repo = SQLAlchemyRepository(Review)
+        self.place_repo = PlaceRepository()
+        self.review_repo = ReviewRepository()
         self.amenity_repo = SQLAlchemyRepository(Amenity)
 
+# REQUEST IDENTITY MAP
+    def _memo(self):
+        """
+        _memo
+
+        Objects already looked up during the current request, by
+        (model name, id). It lives on flask.g, so it is dropped with
+        the application context at the end of the request.
+
+        Returns:
+            dict: The identity map, None outside of an app context
+        """
+        if not has_app_context():
+            return None
+        memo = g.get('_facade_memo')
+        if memo is None:
+            memo = g._facade_memo = {}
+        return memo
+
+    def _get(self, repo, obj_id, fields=None, include=None):
+        """
+        _get
+
+        Get an object by ID, at most once per request
+
+        Only complete objects are remembered: shaped lookups (fields or
+        include) reuse a complete object already loaded, but are not
+        stored themselves.
+
+        Args:
+            repo (Repository): Repository of the object
+            obj_id (UUID): ID of the object
+            fields (list, optional): Columns to load, all when None
+            include (list, optional): Relationships to load in batch
+
+        Returns:
+            object: The object, None if it does not exist
+        """
+        memo = self._memo()
+        key = (repo.model.__name__, str(obj_id))
+        if memo is not None and key in memo:
+            cache_lookup('identity_map', True)
+            return memo[key]
+
+        cache_lookup('identity_map', False)
+        obj = repo.get(obj_id, fields, include)
+        if memo is not None and obj is not None \
+                and fields is None and include is None:
+            memo[key] = obj
+        return obj
+
+    def _remember(self, obj):
+        """
+        Store a created or updated object in the request identity map
+        """
+        memo = self._memo()
+        if memo is not None:
+            memo[(type(obj).__name__, str(obj.id))] = obj
+
+    def _forget(self, model, obj_id):
+        """
+        Drop a deleted object from the request identity map
+        """
+        memo = self._memo()
+        if memo is not None:
+            memo.pop((model.__name__, str(obj_id)), None)
+
+    def get_current_user(self):
+        """
+        get_current_user
+
+        Resolve the identity of the JWT of the current request to a User,
+        with at most one lookup per request and per identity
+
+        Returns:
+            User: The authenticated user, None without identity or when
+            the user no longer exists
+        """
+        identity = get_jwt_identity()
+        if not isinstance(identity, dict) or not identity.get('id'):
+            return None
+        return self._get(self.user_repo, identity['id'])
+
 # USER ENDPOINTS
     def create_user(self, user_data):
         """
         create_user
 
         Create a new user and add it to the user repository
-        Hash the password before adding to repo
+        The password is hashed once, by the User constructor
 
         Args:
             user_data (dict): A dictionary containing user data
 
         Returns:
             User: User model representing the newly created user
+
+        Raises:
+            IntegrityViolation: If the email is already registered
         """
 
         user = User(**user_data)
-        user.hash_password(user_data['password'])
         self.user_repo.add(user)
+        self._remember(user)
         return user
 
-    def get_all_users(self):
+    def authenticate(self, email, password):
+        """
+        authenticate
+
+        Check a user's credentials. When the stored hash was made with
+        another cost factor than the configured one, the password is
+        hashed again with the current cost.
+
+        Args:
+            email (string): email of the user
+            password (string): password to check
+
+        Returns:
+            User: The authenticated user, None if the credentials are wrong
+        """
+        user = self.user_repo.get_user_by_email(email)
+        if not user or not user.verify_password(password):
+            return None
+
+        if user.password_needs_rehash():
+            user.hash_password(password)
+            user.save()
+        return user
+
+    def get_all_users(self, fields=None, include=None):
         """
         get_all_users
 
         Retrivies all users from the repo
 
+        Args:
+            fields (list, optional): Columns to load, all when None
+            include (list, optional): Relationships to load in batch
+
         Returns:
             list: A list of all User objects
         """
-        return self.user_repo.get_all()
+        return self.user_repo.get_all(fields, include)
+
+    def iter_users(self, batch_size=1000, fields=None, include=None):
+        """
+        iter_users
+
+        Iterate over all users, loading them from the DB in batches
 
-    def get_user(self, user_id):
+        Args:
+            batch_size (int): Number of rows fetched per round trip
+            fields (list, optional): Columns to load, all when None
+            include (list, optional): Relationships to load in batch
+
+        Returns:
+            iterator: An iterator of User objects
+        """
+        return self.user_repo.iter_all(batch_size, fields, include)
+
+    def get_user(self, user_id, fields=None, include=None):
         """
         get_user
 
@@ -61,11 +202,13 @@ class HBnBFacade:
 
         Args:
             user_id (UUID): UUID of the user to retrieve
+            fields (list, optional): Columns to load, all when None
+            include (list, optional): Relationships to load in batch
 
         Returns:
             User: The user object corresponding to the UUID
         """
-        return self.user_repo.get(user_id)
+        return self._get(self.user_repo, user_id, fields, include)
 
     def get_user_by_email(self, email):
         """
@@ -92,14 +235,20 @@ class HBnBFacade:
         Returns:
             user (User): instance of the user
             None: if the user does not exist
+
+        Raises:
+            IntegrityViolation: If the new email is already registered
         """
-        user = self.user_repo.get(user_id)
+        user = self._get(self.user_repo, user_id)
 
         if not user:
             return None
 
+        if 'password' in user_data:
+            user_data = dict(user_data)
+            user_data['password'] = hasher.hash(user_data['password'])
+
         user.update(user_data)
-        self.user_repo.update(user, user_data)
         return user
 
 # AMENITY ENDPOINTS
@@ -117,33 +266,50 @@ class HBnBFacade:
         """
         amenity = Amenity(**amenity_data)
         self.amenity_repo.add(amenity)
+        self._remember(amenity)
+        amenity_catalog.put(amenity)
         return amenity
 
     def get_amenity(self, amenity_id):
         """
         get_amenity
 
-        Retrieve an amenity by its ID
+        Retrieve an amenity by its ID from the in-memory catalog
 
         Args:
             amenity_id (UUID): The ID of the amenity to retrieve
 
         Returns:
-            Amenity: The amenity object corresponding to the ID
+            CatalogAmenity: Read-only (id, name) of the amenity,
+            None if it does not exist
         """
-        return self.amenity_repo.get(amenity_id)
+        return amenity_catalog.get(amenity_id)
+
+    def get_amenity_by_name(self, name):
+        """
+        get_amenity_by_name
+
+        Retrieve an amenity by its name, ignoring case and spacing
+
+        Args:
+            name (string): Name of the amenity
+
+        Returns:
+            CatalogAmenity: Read-only (id, name) of the amenity,
+            None if it does not exist
+        """
+        return amenity_catalog.get_by_name(name)
 
     def get_all_amenities(self):
         """
         get_all_amenities
 
-        Retrieves all amenities from the repository
+        Retrieves all amenities from the in-memory catalog
 
         Returns:
-            list: A list of all Amenity objects
+            list: A list of read-only (id, name) CatalogAmenity
         """
-        amenities = self.amenity_repo.get_all()
-        return amenities
+        return amenity_catalog.all()
 
     def update_amenity(self, amenity_id, amenity_data):
         """
@@ -157,19 +323,23 @@ class HBnBFacade:
             amenity (Amenity): Instance of the updated amenity
             None: If the amenity does not exist
         """
-        amenity = self.amenity_repo.get(amenity_id)
-
-        if not amenity:
+        if not amenity_catalog.get(amenity_id):
             return None
 
         # Check for duplicate name
         if 'name' in amenity_data:
-            existing_amenity = self.amenity_repo.get_by_attribute('name', amenity_data['name'])
-            if existing_amenity and existing_amenity[0].id != amenity_id:
+            existing_amenity = amenity_catalog.get_by_name(amenity_data['name'])
+            if existing_amenity and existing_amenity.id != amenity_id:
                 raise ValueError("An amenity with this name already exists.")
 
-        self.amenity_repo.update(amenity_id, amenity_data)  # Pass amenity_id
-        return self.amenity_repo.get(amenity_id)  # Return updated amenity
+        amenity = self._get(self.amenity_repo, amenity_id)
+        if not amenity:
+            return None
+
+        # The object loaded above is updated in place, no new lookup
+        amenity = self.amenity_repo.update(amenity_id, amenity_data)
+        amenity_catalog.put(amenity)
+        return amenity
 
 # PLACE ENDPOINTS
     def create_place(self, place_data):
@@ -179,16 +349,53 @@ class HBnBFacade:
         Create a new place and add it to the place repository
 
         Args:
-            place_data (dict): A dictionary containing place data
+            place_data (dict): A dictionary containing place data,
+                'amenities' being a list of amenity IDs
 
         Returns:
             Place: Place model representing the newly created place
+
+        Raises:
+            ValueError: If an amenity ID is unknown
         """
+        place_data = dict(place_data)
+        amenity_ids = list(dict.fromkeys(place_data.pop('amenities', None) or []))
+        unknown = amenity_catalog.missing(amenity_ids)
+        if unknown:
+            raise ValueError(f"Unknown amenities: {', '.join(unknown)}")
+
         place = Place(**place_data)
+        if amenity_ids:
+            # Linked by ID, validated by the catalog: the amenities
+            # themselves are not loaded
+            db.session.add(place)
+            flush()
+            db.session.execute(insert(place_amenity), [
+                {'place_id': place.id, 'amenity_id': amenity_id}
+                for amenity_id in amenity_ids])
         self.place_repo.add(place)
+        self._remember(place)
+        leaderboards.place_changed(place)
         return place
 
-    def get_place(self, place_id):
+    def place_exists(self, place_id):
+        """
+        place_exists
+
+        Check that a place exists without loading it
+
+        Args:
+            place_id (UUID): The ID of the place
+
+        Returns:
+            bool: True if the place exists
+        """
+        memo = self._memo()
+        if memo is not None and ('Place', str(place_id)) in memo:
+            return True
+        return self.place_repo.exists(id=str(place_id))
+
+    def get_place(self, place_id, fields=None, include=None):
         """
         get_place
 
@@ -196,6 +403,8 @@ class HBnBFacade:
 
         Args:
             place_id (UUID): The ID of the place to retrieve
+            fields (list, optional): Columns to load, all when None
+            include (list, optional): Relationships to load in batch
 
         Returns:
             Place: The place object corresponding to the ID
@@ -203,18 +412,80 @@ class HBnBFacade:
         if not place_id:
             return None
         else:
-            return self.place_repo.get(place_id)
+            return self._get(self.place_repo, place_id, fields, include)
+
+    def get_place_detail(self, place_id, reviews_limit=10):
+        """
+        get_place_detail
+
+        Everything the place page shows, read with a single SELECT:
+        the place, its owner, its amenities, its rating summary and its
+        latest reviews with their author's name. Amenity names come from
+        the in-memory catalog.
 
-    def get_all_places(self):
+        Args:
+            place_id (UUID): The ID of the place
+            reviews_limit (int): Number of latest reviews included
+
+        Returns:
+            dict: The ready to serialize view, None if the place does
+            not exist
+        """
+        rows = self.place_repo.get_detail_rows(str(place_id), reviews_limit)
+        if not rows:
+            return None
+
+        first = rows[0]
+        amenities = [amenity_catalog.get(amenity_id) for amenity_id
+                     in (first.amenity_ids or '').split(',') if amenity_id]
+        average = first.rating_average
+        return {
+            'id': first.id,
+            'title': first.title,
+            'description': first.description,
+            'price': first.price,
+            'latitude': first.latitude,
+            'longitude': first.longitude,
+            'owner': {
+                'id': first.owner_id,
+                'first_name': first.owner_first_name,
+                'last_name': first.owner_last_name,
+                'email': first.owner_email,
+            } if first.owner_email is not None else None,
+            'amenities': sorted(
+                ({'id': amenity.id, 'name': amenity.name}
+                 for amenity in amenities if amenity is not None),
+                key=lambda amenity: amenity['name']),
+            'rating': {
+                'count': first.review_count,
+                'average': round(float(average), 2)
+                if average is not None else None,
+            },
+            'reviews': [{
+                'id': row.review_id,
+                'text': row.review_text,
+                'rating': row.review_rating,
+                'user_id': row.review_user_id,
+                'user_name': f'{row.review_first_name} {row.review_last_name}',
+                'created_at': row.review_created_at.isoformat()
+                if row.review_created_at else None,
+            } for row in rows if row.review_id is not None],
+        }
+
+    def get_all_places(self, fields=None, include=None):
         """
         get_all_places
 
         Retrieves all places from the repository
 
+        Args:
+            fields (list, optional): Columns to load, all when None
+            include (list, optional): Relationships to load in batch
+
         Returns:
             list: A list of all Place objects
         """
-        places = self.place_repo.get_all()
+        places = self.place_repo.get_all(fields, include)
         return places
 
     def update_place(self, place_id, place_data):
@@ -229,13 +500,15 @@ class HBnBFacade:
             place (Place): Instance of the updated place
             None: If the place does not exist
         """
-        place = self.place_repo.get(place_id)
+        place = self._get(self.place_repo, place_id)
 
         if not place:
             return None
 
-        self.place_repo.update(place_id, place_data)  # Pass place_id
-        return self.place_repo.get(place_id)  # Return updated place
+        # The object loaded above is updated in place, no new lookup
+        place = self.place_repo.update(place_id, place_data)
+        leaderboards.place_changed(place)
+        return place
 
 # REVIEW ENDPOINTS
     def create_review(self, review_data):
@@ -249,12 +522,18 @@ class HBnBFacade:
 
         Returns:
             Review: Review model representing the newly created review
+
+        Raises:
+            IntegrityViolation: If the user already reviewed the place
+            (unique) or the place does not exist (foreign key)
         """
         review = Review(**review_data)
         self.review_repo.add(review)
+        self._remember(review)
+        leaderboards.review_changed(review.place_id, 1, review.rating)
         return review
 
-    def get_review(self, review_id):
+    def get_review(self, review_id, fields=None, include=None):
         """
         get_review
 
@@ -262,24 +541,46 @@ class HBnBFacade:
 
         Args:
             review_id (UUID): The ID of the review to retrieve
+            fields (list, optional): Columns to load, all when None
+            include (list, optional): Relationships to load in batch
 
         Returns:
             Review: The review object corresponding to the ID
         """
-        return self.review_repo.get(review_id)
+        return self._get(self.review_repo, review_id, fields, include)
 
-    def get_all_reviews(self):
+    def get_all_reviews(self, fields=None, include=None):
         """
         get_all_reviews
 
         Retrieves all reviews from the repository
 
+        Args:
+            fields (list, optional): Columns to load, all when None
+            include (list, optional): Relationships to load in batch
+
         Returns:
             list: A list of all Review objects
         """
-        reviews = self.review_repo.get_all()
+        reviews = self.review_repo.get_all(fields, include)
         return reviews
 
+    def iter_reviews(self, batch_size=1000, fields=None, include=None):
+        """
+        iter_reviews
+
+        Iterate over all reviews, loading them from the DB in batches
+
+        Args:
+            batch_size (int): Number of rows fetched per round trip
+            fields (list, optional): Columns to load, all when None
+            include (list, optional): Relationships to load in batch
+
+        Returns:
+            iterator: An iterator of Review objects
+        """
+        return self.review_repo.iter_all(batch_size, fields, include)
+
     def get_reviews_by_place(self, place_id):
         """
         get_reviews_by_place
@@ -294,6 +595,39 @@ class HBnBFacade:
         """
         return self.review_repo.get_by_attribute('place_id', place_id)
 
+    def get_place_reviews_page(self, place_id, sort='-created_at', limit=50,
+                               after=None):
+        """
+        get_place_reviews_page
+
+        Retrieve one page of a place's reviews without loading the place
+
+        Args:
+            place_id (UUID): The ID of the place
+            sort (str): '-created_at' (default), 'created_at', '-rating'
+                or 'rating'
+            limit (int): Maximum number of reviews in the page
+            after (tuple, optional): (sort value, id) of the last review
+                of the previous page, dates as stored (text)
+
+        Returns:
+            tuple: (list of Review objects, (sort value, id) to pass as
+            `after` for the next page or None on the last page),
+            None if the place does not exist
+        """
+        # One extra row tells whether there is a next page
+        rows = self.review_repo.page_by_place(
+            str(place_id), sort, limit + 1, after)
+        if not rows and not self.place_exists(place_id):
+            return None
+
+        next_after = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last, value = rows[-1]
+            next_after = (value, last.id)
+        return [review for review, _ in rows], next_after
+
     def update_review(self, review_id, review_data):
         """
         Update an existing review with new data if it exists
@@ -306,13 +640,18 @@ class HBnBFacade:
             review (Review): Instance of the updated review
             None: If the review does not exist
         """
-        review = self.review_repo.get(review_id)
+        review = self._get(self.review_repo, review_id)
 
         if not review:
             return None
 
-        self.review_repo.update(review_id, review_data)  # Pass review_id
-        return self.review_repo.get(review_id)  # Return updated review
+        rating = review.rating
+        # The object loaded above is updated in place, no new lookup
+        review = self.review_repo.update(review_id, review_data)
+        if review.rating != rating:
+            leaderboards.review_changed(review.place_id, 0,
+                                        review.rating - rating)
+        return review
 
     def delete_review(self, review_id):
         """
@@ -326,4 +665,91 @@ class HBnBFacade:
         Returns:
             bool: True if the review was deleted, False otherwise
         """
-        return self.review_repo.delete(review_id)
+        review = self._get(self.review_repo, review_id)
+        self._forget(Review, review_id)
+        deleted = self.review_repo.delete(review_id)
+        if review:
+            leaderboards.review_changed(review.place_id, -1, -review.rating)
+        return deleted
+
+# BULK IMPORT
+    def bulk_import(self, kind, stream, fmt, schema, batch_size=1000,
+                    defaults=None):
+        """
+        bulk_import
+
+        Stream-import places, amenities or reviews from NDJSON or CSV
+
+        Args:
+            kind (str): 'places', 'amenities' or 'reviews'
+            stream (file): Text stream to read the rows from
+            fmt (str): 'ndjson' or 'csv'
+            schema (dict): JSON schema rows are validated against
+            batch_size (int): Rows inserted per transaction
+            defaults (dict, optional): Values for keys missing in rows
+
+        Returns:
+            dict: Report with inserted/failed counts and per-line errors
+        """
+        importer = IMPORTERS[kind](schema, batch_size=batch_size,
+                                   defaults=defaults)
+        report = importer.run(stream, fmt)
+        if kind == 'amenities':
+            amenity_catalog.invalidate()
+        else:
+            leaderboards.invalidate()
+        return report
+
+# BULK EXPORT
+    def export_catalog(self, kind, fmt, out, batch_size=1000):
+        """
+        export_catalog
+
+        Write every place (with owner and amenities) or review to a file
+
+        Args:
+            kind (str): 'places' or 'reviews'
+            fmt (str): 'ndjson' or 'csv'
+            out (file): Text file to write to
+            batch_size (int): Rows fetched per cursor batch
+
+        Returns:
+            int: Number of exported rows
+        """
+        return write_export(db.engine, kind, fmt, out, batch_size)
+
+    def start_export(self, kind, fmt, directory, batch_size=1000):
+        """
+        start_export
+
+        Start an export job in a background worker
+
+        Args:
+            kind (str): 'places' or 'reviews'
+            fmt (str): 'ndjson' or 'csv'
+            directory (str): Where the export file is written
+            batch_size (int): Rows fetched per cursor batch
+
+        Returns:
+            dict: Status of the new job
+        """
+        return ExportJobs(directory).start(kind, fmt, db.engine, batch_size)
+
+    def get_export(self, job_id, directory):
+        """
+        get_export
+
+        Get the status of an export job and the path of its file
+
+        Args:
+            job_id (UUID): ID of the export job
+            directory (str): Where export files are written
+
+        Returns:
+            tuple: (job status dict, file path), (None, None) if unknown
+        """
+        jobs = ExportJobs(directory)
+        job = jobs.get(job_id)
+        if not job:
+            return None, None
+        return job, jobs.file_path(job)
@@ -0,0 +1,398 @@
+#!/usr/bin/python3
+"""
+Synthetic dataset for load tests and benchmarks
+
+Generates users, places clustered around cities, an amenity catalog and
+reviews whose count per place follows a Zipf law (a few places get most
+of the reviews, as on a real site). Everything is drawn from generators
+seeded from one seed, IDs and timestamps included, so a seed always
+gives the same database.
+
+Rows are written with the SQLite driver directly, by executemany over
+generators, without the ORM: 10M reviews load in minutes. bcrypt would
+take longer than everything else, so users share PASSWORDS hashes
+computed once: user i logs in with `user<i>@example.com` and
+`PASSWORDS[i % len(PASSWORDS)]`, except user 0, the admin
+`admin@example.com` (password0).
+"""
+
+import math
+import random
+from datetime import datetime, timedelta
+from itertools import islice
+
+import bcrypt as _bcrypt
+
+PASSWORDS = ('password0', 'password1', 'password2', 'password3')
+
+AMENITY_NAMES = (
+    'WiFi', 'Kitchen', 'Washer', 'Dryer', 'Air conditioning', 'Heating',
+    'Dedicated workspace', 'TV', 'Hair dryer', 'Iron', 'Pool', 'Hot tub',
+    'Free parking', 'EV charger', 'Crib', 'Gym', 'BBQ grill', 'Breakfast',
+    'Indoor fireplace', 'Smoking allowed', 'Beachfront', 'Waterfront',
+    'Ski-in/ski-out', 'Smoke alarm', 'Carbon monoxide alarm', 'Balcony',
+    'Garden', 'Elevator', 'Pets allowed', 'Self check-in', 'Dishwasher',
+    'Coffee maker', 'Microwave', 'Bathtub', 'Sauna', 'Lake access',
+    'Mountain view', 'Sea view', 'Baby bath', 'Board games',
+)
+
+# (latitude, longitude) of the cities places are clustered around
+CITIES = (
+    (48.8566, 2.3522), (51.5074, -0.1278), (40.7128, -74.0060),
+    (34.0522, -118.2437), (41.9028, 12.4964), (41.3874, 2.1686),
+    (52.5200, 13.4050), (35.6762, 139.6503), (-33.8688, 151.2093),
+    (25.2048, 55.2708), (13.7563, 100.5018), (-22.9068, -43.1729),
+    (19.4326, -99.1332), (45.5017, -73.5673), (43.2965, 5.3698),
+    (38.7223, -9.1393), (59.3293, 18.0686), (37.9838, 23.7275),
+    (31.6295, -7.9811), (-34.6037, -58.3816), (1.3521, 103.8198),
+    (37.7749, -122.4194), (25.7617, -80.1918), (45.4408, 12.3155),
+)
+
+FIRST_NAMES = ('Alice', 'Bob', 'Chloe', 'David', 'Emma', 'Farid', 'Grace',
+               'Hugo', 'Ines', 'Jules', 'Karim', 'Lea', 'Malik', 'Nina',
+               'Oscar', 'Paula', 'Quentin', 'Rosa', 'Sami', 'Tina')
+LAST_NAMES = ('Martin', 'Bernard', 'Dubois', 'Smith', 'Garcia', 'Rossi',
+              'Muller', 'Silva', 'Kim', 'Nguyen', 'Haddad', 'Jensen',
+              'Kowalski', 'Novak', 'Okafor', 'Tanaka')
+PLACE_KINDS = ('Studio', 'Loft', 'Apartment', 'House', 'Villa', 'Cabin',
+               'Room', 'Bungalow', 'Townhouse', 'Penthouse')
+PLACE_TRAITS = ('Cosy', 'Sunny', 'Quiet', 'Modern', 'Charming', 'Spacious',
+                'Central', 'Rustic', 'Bright', 'Elegant')
+REVIEW_TEXTS = {
+    1: ('Terrible stay, nothing as described.',
+        'Dirty and noisy, would not come back.'),
+    2: ('Disappointing, the place needs work.',
+        'Host hard to reach, bed uncomfortable.'),
+    3: ('Fine for a night or two.',
+        'Decent place, a bit overpriced.'),
+    4: ('Nice place, good location.',
+        'Comfortable and clean, recommended.'),
+    5: ('Perfect stay, amazing host!',
+        'Wonderful place, we will be back.'),
+}
+
+# Timestamps are spread before a fixed date, not now: same seed, same rows
+END = datetime(2025, 1, 1)
+SPAN = timedelta(days=3 * 365).total_seconds()
+
+CHUNK_SIZE = 50000
+
+# Version (4) and variant (RFC 4122) bits of a random UUID
+_UUID_CLEAR = ~((0xf000 << 64) | (0xc000 << 48))
+_UUID_SET = (0x4000 << 64) | (0x8000 << 48)
+
+
+def zipf_counts(total, buckets, exponent, rng, cap=None):
+    """
+    Split `total` over `buckets` following a Zipf law
+
+    The bucket of rank r (in a random order) gets a share proportional to
+    1 / r ** exponent; rounding leftovers go to the highest ranks.
+
+    Args:
+        cap (int): Highest count of a bucket; what goes above moves to
+            the next ranks
+
+    Returns:
+        list: Count of each bucket
+    """
+    if buckets <= 0:
+        return []
+    weights = [1 / (rank ** exponent) for rank in range(1, buckets + 1)]
+    scale = total / math.fsum(weights)
+    counts = [int(weight * scale) for weight in weights]
+    for rank in range(total - sum(counts)):
+        counts[rank % buckets] += 1
+    if cap is not None:
+        carry = 0
+        for rank, count in enumerate(counts):
+            count += carry
+            counts[rank] = min(count, cap)
+            carry = count - counts[rank]
+    rng.shuffle(counts)
+    return counts
+
+
+class SyntheticDataset:
+    """
+    Generator of a reproducible dataset of a given size
+
+    Args:
+        users (int): Number of users
+        places (int): Number of places
+        reviews (int): Number of reviews, at most places * (users - 1)
+        amenities (int): Size of the amenity catalog
+        seed (int): Seed of the random generator
+        clusters (int): Cities the places are spread around
+        zipf (float): Exponent of the reviews per place distribution
+        rounds (int): bcrypt cost of the password hashes
+    """
+    def __init__(self, users, places, reviews, amenities=len(AMENITY_NAMES),
+                 seed=0, clusters=len(CITIES), zipf=1.1, rounds=12):
+        if users < 2 and reviews:
+            raise ValueError('Reviews need at least two users')
+        if places and not users:
+            raise ValueError('Places need at least one user')
+        if reviews > places * max(users - 1, 0):
+            raise ValueError('At most places * (users - 1) reviews: '
+                             'one per user and place, not by its owner')
+        self.users = users
+        self.places = places
+        self.reviews = reviews
+        self.amenities = amenities
+        self.seed = seed
+        self.clusters = clusters
+        self.zipf = zipf
+        self.rounds = rounds
+
+    def _rng(self, table):
+        # One generator per table: the rows of a table do not depend on
+        # the size of the others
+        return random.Random(f'{self.seed}:{table}')
+
+    @staticmethod
+    def _uuid(rng):
+        # str(uuid.UUID(int=..., version=4)) without building the object
+        value = rng.getrandbits(128) & _UUID_CLEAR | _UUID_SET
+        text = f'{value:032x}'
+        return (f'{text[:8]}-{text[8:12]}-{text[12:16]}-{text[16:20]}-'
+                f'{text[20:]}')
+
+    @staticmethod
+    def _timestamp(rng, after=0.0):
+        # Seconds before END -> SQLAlchemy's SQLite DATETIME format
+        offset = after + rng.random() * (SPAN - after)
+        return (END - timedelta(seconds=SPAN - offset)) \
+            .isoformat(' ', 'microseconds')
+
+    def _ids(self, table, count):
+        rng = self._rng(f'{table}:ids')
+        return [self._uuid(rng) for _ in range(count)]
+
+    def password_hashes(self):
+        """
+        bcrypt hashes of PASSWORDS, one bcrypt call each
+        """
+        rng = self._rng('passwords')
+        return [self._hash(password, rng) for password in PASSWORDS]
+
+    def _hash(self, password, rng):
+        # Salt drawn from the seeded generator: bcrypt's own is random
+        salt = bytes(rng.getrandbits(8) for _ in range(16))
+        encoded = _bcrypt_base64(salt)
+        prefix = f'$2b${self.rounds:02d}$'.encode('ascii')
+        return _bcrypt.hashpw(password.encode('utf-8'),
+                              prefix + encoded).decode('utf-8')
+
+    def user_rows(self, ids):
+        rng = self._rng('users')
+        hashes = self.password_hashes()
+        for index, user_id in enumerate(ids):
+            created = self._timestamp(rng)
+            email = 'admin@example.com' if index == 0 \
+                else f'user{index}@example.com'
+            yield (user_id, rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES),
+                   email, hashes[index % len(hashes)], index == 0,
+                   created, created)
+
+    def _centers(self):
+        rng = self._rng('clusters')
+        centers = list(CITIES[:self.clusters])
+        while len(centers) < self.clusters:
+            centers.append((rng.uniform(-60, 65), rng.uniform(-180, 180)))
+        return centers
+
+    def place_rows(self, ids, user_ids):
+        """
+        Places around the cities, the first cities being the busiest
+        """
+        rng = self._rng('places')
+        centers = self._centers()
+        weights = [1 / rank for rank in range(1, len(centers) + 1)]
+        cities = rng.choices(range(len(centers)), weights, k=len(ids))
+        for place_id, city in zip(ids, cities):
+            latitude, longitude = centers[city]
+            # Most places within ~10 km of the center, a few further out
+            spread = 0.05 if rng.random() < 0.8 else 0.3
+            latitude = max(-90.0, min(90.0, rng.gauss(latitude, spread)))
+            longitude = (rng.gauss(longitude, spread) + 180) % 360 - 180
+            kind = rng.choice(PLACE_KINDS)
+            created = self._timestamp(rng)
+            yield (place_id, f'{rng.choice(PLACE_TRAITS)} {kind}',
+                   f'{kind} {city + 1}-{rng.randrange(1000)}',
+                   round(min(rng.lognormvariate(4.5, 0.6), 5000.0), 2),
+                   round(latitude, 6), round(longitude, 6),
+                   rng.choice(user_ids), created, created)
+
+    def amenity_rows(self, ids):
+        rng = self._rng('amenities')
+        for index, amenity_id in enumerate(ids):
+            name = AMENITY_NAMES[index] if index < len(AMENITY_NAMES) \
+                else f'Amenity {index + 1}'
+            created = self._timestamp(rng)
+            yield (amenity_id, name, created, created)
+
+    def place_amenity_rows(self, place_ids, amenity_ids):
+        rng = self._rng('place_amenity')
+        # The first amenities of the catalog are the most common
+        most = min(len(amenity_ids), 12)
+        for place_id in place_ids:
+            chosen = set()
+            for _ in range(rng.randint(0, most)):
+                chosen.add(amenity_ids[
+                    min(int(rng.expovariate(0.15)), len(amenity_ids) - 1)])
+            for amenity_id in sorted(chosen):
+                yield (place_id, amenity_id)
+
+    def review_rows(self, place_rows, user_ids):
+        """
+        Reviews of each place, by distinct users other than the owner
+
+        Args:
+            place_rows (list): (id, owner_id, created_at) of the places
+        """
+        rng = self._rng('reviews')
+        counts = zipf_counts(self.reviews, len(place_rows), self.zipf, rng,
+                             cap=len(user_ids) - 1)
+        base = END - timedelta(seconds=SPAN)
+        for (place_id, owner_id, created), count in zip(place_rows, counts):
+            if not count:
+                continue
+            # Ratings of a place gather around its own quality
+            quality = rng.gauss(4.0, 0.6)
+            after = (datetime.fromisoformat(created) - base).total_seconds()
+            reviewers = rng.sample(range(len(user_ids)), count + 1)
+            written = 0
+            for user in reviewers:
+                user_id = user_ids[user]
+                if user_id == owner_id:
+                    continue
+                rating = max(1, min(5, round(rng.gauss(quality, 0.9))))
+                created_at = self._timestamp(rng, after)
+                yield (self._uuid(rng), rng.choice(REVIEW_TEXTS[rating]),
+                       rating, user_id, place_id, created_at, created_at)
+                written += 1
+                if written == count:
+                    break
+
+
+_BCRYPT_ALPHABET = \
+    b'./ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789'
+
+
+def _bcrypt_base64(data):
+    """
+    bcrypt's own base64 of a 16 bytes salt (22 characters)
+    """
+    bits = int.from_bytes(data, 'big') << 4
+    chars = []
+    for shift in range(126, -1, -6):
+        chars.append(_BCRYPT_ALPHABET[(bits >> shift) & 63])
+    return bytes(chars)
+
+
+def _insert_chunks(cursor, statement, rows, progress=None, table=None):
+    count = 0
+    while True:
+        chunk = list(islice(rows, CHUNK_SIZE))
+        if not chunk:
+            return count
+        cursor.executemany(statement, chunk)
+        count += len(chunk)
+        if progress:
+            progress(table, count)
+
+
+# Indexes rebuilt once after the load rather than updated per row
+_DEFERRED_INDEXES = ('ix_reviews_place_created', 'ix_reviews_place_rating')
+
+
+def load_sqlite(engine, dataset, progress=None):
+    """
+    Write a dataset into the (empty) tables of a SQLite database
+
+    Args:
+        engine (Engine): SQLAlchemy engine of the database
+        dataset (SyntheticDataset): What to generate
+        progress (callable, optional): Called with (table, rows written)
+
+    Returns:
+        dict: Rows written per table
+    """
+    if engine.dialect.name != 'sqlite':
+        raise ValueError('The synthetic dataset is loaded into SQLite only')
+
+    connection = engine.raw_connection()
+    # The load pragmas below must not reach the pool
+    connection.detach()
+    try:
+        cursor = connection.cursor()
+        cursor.execute('PRAGMA synchronous = OFF')
+        cursor.execute('PRAGMA journal_mode = MEMORY')
+        cursor.execute('PRAGMA cache_size = -262144')
+        cursor.execute('PRAGMA temp_store = MEMORY')
+        cursor.execute('BEGIN')
+
+        indexes = cursor.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'index' "
+            f"AND name IN ({', '.join('?' * len(_DEFERRED_INDEXES))})",
+            _DEFERRED_INDEXES).fetchall()
+        for name, _ in indexes:
+            cursor.execute(f'DROP INDEX {name}')
+
+        report = {}
+        user_ids = dataset._ids('users', dataset.users)
+        report['users'] = _insert_chunks(
+            cursor,
+            'INSERT INTO users (id, first_name, last_name, email, password, '
+            'is_admin, created_at, updated_at) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            dataset.user_rows(user_ids), progress, 'users')
+
+        amenity_ids = dataset._ids('amenities', dataset.amenities)
+        report['amenities'] = _insert_chunks(
+            cursor,
+            'INSERT INTO amenities (id, name, created_at, updated_at) '
+            'VALUES (?, ?, ?, ?)',
+            dataset.amenity_rows(amenity_ids), progress, 'amenities')
+
+        place_ids = dataset._ids('places', dataset.places)
+        places = []
+
+        def place_rows():
+            for row in dataset.place_rows(place_ids, user_ids):
+                places.append((row[0], row[6], row[7]))
+                yield row
+
+        report['places'] = _insert_chunks(
+            cursor,
+            'INSERT INTO places (id, title, description, price, latitude, '
+            'longitude, owner_id, created_at, updated_at) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            place_rows(), progress, 'places')
+
+        report['place_amenity'] = _insert_chunks(
+            cursor,
+            'INSERT INTO place_amenity (place_id, amenity_id) VALUES (?, ?)',
+            dataset.place_amenity_rows(place_ids, amenity_ids),
+            progress, 'place_amenity')
+
+        report['reviews'] = _insert_chunks(
+            cursor,
+            'INSERT INTO reviews (id, text, rating, user_id, place_id, '
+            'created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)',
+            dataset.review_rows(places, user_ids), progress, 'reviews')
+
+        for _, sql in indexes:
+            cursor.execute(sql)
+        connection.commit()
+        # Statistics for the query planner, from a sample of each index
+        cursor.execute('PRAGMA analysis_limit = 1000')
+        cursor.execute('ANALYZE')
+        connection.commit()
+        return report
+    except BaseException:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
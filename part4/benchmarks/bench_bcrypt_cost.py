@@ -0,0 +1,56 @@
+#!/usr/bin/python3
+"""
+Pick the bcrypt cost factor (BCRYPT_LOG_ROUNDS) for this machine
+
+Times one hash per cost factor and suggests the highest cost whose hash
+stays under the target time. Logins pay this cost once per attempt.
+
+Usage:
+    python benchmarks/bench_bcrypt_cost.py [--target-ms 250] [--min 8] [--max 15]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.passwords import _hash, _verify  # noqa: E402
+
+
+def time_cost(rounds, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        pw_hash = _hash('benchmark-password', rounds, '2b')
+        samples.append(time.perf_counter() - start)
+    assert _verify(pw_hash, 'benchmark-password')
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--target-ms', type=float, default=250)
+    parser.add_argument('--min', type=int, default=8)
+    parser.add_argument('--max', type=int, default=15)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    suggested = args.min
+    for rounds in range(args.min, args.max + 1):
+        elapsed_ms = time_cost(rounds, args.repeat) * 1000
+        print(f"cost {rounds:2d}: {elapsed_ms:9.1f} ms per hash")
+        if elapsed_ms <= args.target_ms:
+            suggested = rounds
+        else:
+            # Each extra round doubles the time, no need to go further
+            break
+
+    print(f"\nSuggested BCRYPT_LOG_ROUNDS={suggested} "
+          f"(target {args.target_ms:.0f} ms per hash)")
+
+
+if __name__ == '__main__':
+    main()
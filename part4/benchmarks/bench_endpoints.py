@@ -0,0 +1,431 @@
+#!/usr/bin/python3
+"""
+Latency of every API endpoint on synthetic datasets, with baselines
+
+Each dataset size (reviews; users and places scale with it) is generated
+once by app/services/synthetic.py and cached in --data-dir, then copied
+for each run since the write cases add rows. Every case (a resource
+method, e.g. `PlaceList.get`) is called through the Flask test client:
+a few warm-up calls, then timed calls until both --min-rounds and
+--max-time are reached (5 calls for cases over 10 times --max-time, and
+no more calls than a case has distinct inputs). A last pass, not timed,
+counts the SQL statements of a call and its peak allocated memory
+(tracemalloc).
+
+Results are written as JSON with --save and compared to a saved run
+with --compare: a case whose median is more than --threshold percent
+slower, or which runs more statements, is reported; for the GUARDED
+cases (or any case with --strict) the script exits with status 1.
+Baselines only compare runs of the same machine.
+
+Usage:
+    python benchmarks/bench_endpoints.py [--sizes 10k,100k,1M] [-k Place]
+        [--save baseline.json] [--compare baseline.json]
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import re
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask_jwt_extended import create_access_token  # noqa: E402
+from sqlalchemy import event, text  # noqa: E402
+
+from app import create_app  # noqa: E402
+from app.extensions import db  # noqa: E402
+from app.services.synthetic import SyntheticDataset, load_sqlite  # noqa: E402
+from config import DevelopmentConfig  # noqa: E402
+
+# Regressions of these cases fail the comparison
+GUARDED = ('PlaceList.get', 'PlaceReviewList.get')
+
+# Dataset sizes in reviews; a tenth as many users, a twentieth as places
+SIZES = {'10k': 10000, '100k': 100000, '1M': 1000000}
+
+BCRYPT_ROUNDS = 4
+
+# Calls of profile_case for each measure (statements, then memory)
+PROFILE_CALLS = 3
+
+
+def make_config(uri):
+    class BenchConfig(DevelopmentConfig):
+        SQLALCHEMY_DATABASE_URI = uri
+        # Login measures the endpoint, not bcrypt (see bench_bcrypt_cost)
+        BCRYPT_LOG_ROUNDS = BCRYPT_ROUNDS
+        RATELIMIT_ENABLED = False
+        COMPRESS_ENABLED = False
+        SWAGGER_CACHE = False
+    return BenchConfig
+
+
+def dataset_path(data_dir, size, seed):
+    """
+    SQLite file of a dataset, generated on first use
+    """
+    reviews = SIZES[size]
+    path = os.path.join(data_dir, f'hbnb-{size}-seed{seed}.db')
+    if os.path.exists(path):
+        return path
+    os.makedirs(data_dir, exist_ok=True)
+    print(f'Generating the {size} dataset in {path}', file=sys.stderr)
+    partial = path + '.partial'
+    if os.path.exists(partial):
+        os.remove(partial)
+    app = create_app(make_config('sqlite:///' + partial))
+    with app.app_context():
+        db.create_all()
+        db.session.remove()
+        load_sqlite(db.engine, SyntheticDataset(
+            reviews // 10, reviews // 20, reviews, seed=seed,
+            rounds=BCRYPT_ROUNDS))
+        db.engine.dispose()
+    os.replace(partial, path)
+    return path
+
+
+class Fixtures:
+    """
+    IDs and tokens the cases send, read from the dataset
+    """
+    def __init__(self, app, count=100):
+        with app.app_context():
+            session = db.session
+
+            def ids(sql, **params):
+                return [row[0] for row in session.execute(text(sql), params)]
+
+            self.users = ids('SELECT id FROM users ORDER BY id LIMIT :n',
+                             n=count)
+            self.places = ids('SELECT id FROM places ORDER BY id LIMIT :n',
+                              n=count)
+            self.amenities = ids('SELECT id FROM amenities ORDER BY id')
+            # The most reviewed places: the long pages
+            self.popular = ids(
+                'SELECT place_id FROM reviews GROUP BY place_id '
+                'ORDER BY count(*) DESC, place_id LIMIT :n', n=count)
+            reviews = session.execute(text(
+                'SELECT id, user_id FROM reviews ORDER BY id LIMIT :n'),
+                {'n': count}).all()
+            self.reviews = [row[0] for row in reviews]
+            admin = session.execute(text(
+                'SELECT id FROM users WHERE is_admin LIMIT 1')).scalar()
+            self.admin = self.header(admin, True)
+            self.review_authors = [self.header(row[1]) for row in reviews]
+            # (user, place) pairs without a review yet, one user after
+            # the other so that no user runs out of places to review
+            reviewed = set(session.execute(text(
+                'SELECT user_id, place_id FROM reviews WHERE user_id IN '
+                '(SELECT id FROM users ORDER BY id LIMIT :n)'), {'n': count}))
+            owners = dict(session.execute(text(
+                'SELECT id, owner_id FROM places ORDER BY id LIMIT :n'),
+                {'n': count}).all())
+            self.reviewer_tokens = {user: self.header(user)
+                                    for user in self.users}
+            self.unreviewed = [
+                (user, place) for place in self.places for user in self.users
+                if owners[place] != user and (user, place) not in reviewed]
+            session.remove()
+
+    @staticmethod
+    def header(user_id, is_admin=False):
+        token = create_access_token(
+            identity={'id': user_id, 'is_admin': is_admin})
+        return {'Authorization': f'Bearer {token}'}
+
+
+def cases(fx):
+    """
+    Case name -> function(client, i) sending the i-th call
+    """
+    def cycle(items, i):
+        return items[i % len(items)]
+
+    def unreviewed(client, i):
+        user, place = fx.unreviewed[i]
+        return client.post('/api/v1/reviews/',
+                           headers=fx.reviewer_tokens[user],
+                           json={'text': 'Benchmark review', 'rating': 4,
+                                 'user_id': user, 'place_id': place})
+    # Each pair can only be reviewed once
+    unreviewed.calls = len(fx.unreviewed)
+
+    return {
+        'Login.post': lambda c, i: c.post(
+            '/api/v1/auth/login',
+            json={'email': 'user1@example.com', 'password': 'password1'}),
+        'UserList.get': lambda c, i: c.get('/api/v1/users/'),
+        'UserList.post': lambda c, i: c.post(
+            '/api/v1/users/', headers=fx.admin,
+            json={'first_name': 'Bench', 'last_name': 'User',
+                  'email': f'bench{i}@example.com',
+                  'password': 'password1'}),
+        'UserResource.get': lambda c, i: c.get(
+            f'/api/v1/users/{cycle(fx.users, i)}'),
+        'UserResource.put': lambda c, i: c.put(
+            f'/api/v1/users/{cycle(fx.users, i)}', headers=fx.admin,
+            json={'first_name': f'Bench{i % 2}', 'last_name': 'User'}),
+        'AmenityList.get': lambda c, i: c.get('/api/v1/amenities/'),
+        'AmenityList.post': lambda c, i: c.post(
+            '/api/v1/amenities/', headers=fx.admin,
+            json={'name': f'Bench {i}'}),
+        'AmenityResource.get': lambda c, i: c.get(
+            f'/api/v1/amenities/{cycle(fx.amenities, i)}'),
+        'AmenityResource.put': lambda c, i: c.put(
+            f'/api/v1/amenities/{fx.amenities[-1]}', headers=fx.admin,
+            json={'name': f'Bench amenity {i}'}),
+        'PlaceList.get': lambda c, i: c.get('/api/v1/places/'),
+        'PlaceList.post': lambda c, i: c.post(
+            '/api/v1/places/', headers=fx.admin,
+            json={'title': 'Bench place', 'description': 'Benchmark',
+                  'price': 80.0, 'latitude': 48.85, 'longitude': 2.35,
+                  'amenities': fx.amenities[:3]}),
+        'PlaceTop.get': lambda c, i: c.get(
+            '/api/v1/places/top?by=rating&k=20'),
+        'PlaceResource.get': lambda c, i: c.get(
+            f'/api/v1/places/{cycle(fx.places, i)}'),
+        'PlaceResource.get[detail]': lambda c, i: c.get(
+            f'/api/v1/places/{cycle(fx.popular, i)}?view=detail'),
+        'PlaceResource.put': lambda c, i: c.put(
+            f'/api/v1/places/{cycle(fx.places, i)}', headers=fx.admin,
+            json={'title': 'Bench place', 'price': 80.0 + i % 2}),
+        'PlaceReviewList.get': lambda c, i: c.get(
+            f'/api/v1/places/{cycle(fx.popular, i)}/reviews'),
+        'ReviewList.get': lambda c, i: c.get('/api/v1/reviews/'),
+        'ReviewList.post': unreviewed,
+        'ReviewResource.get': lambda c, i: c.get(
+            f'/api/v1/reviews/{cycle(fx.reviews, i)}'),
+        'ReviewResource.put': lambda c, i: c.put(
+            f'/api/v1/reviews/{cycle(fx.reviews, i)}',
+            headers=cycle(fx.review_authors, i),
+            json={'text': 'Updated benchmark review', 'rating': 1 + i % 5}),
+    }
+
+
+def check(name, response):
+    if response.status_code >= 400:
+        raise SystemExit(f'{name}: {response.status_code} '
+                         f'{response.get_data(as_text=True)[:200]}')
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def time_case(client, name, call, start, args):
+    """
+    Seconds of each timed call, and the index of the next call
+    """
+    index = start
+    # Calls of a case with limited inputs, the profiling ones kept
+    last = getattr(call, 'calls', None)
+    if last is not None:
+        last -= 2 * PROFILE_CALLS
+    for _ in range(args.warmup):
+        check(name, call(client, index))
+        index += 1
+    gc.collect()
+    times = []
+    began = time.perf_counter()
+    while len(times) < args.max_rounds and (last is None or index < last):
+        started = time.perf_counter()
+        response = call(client, index)
+        times.append(time.perf_counter() - started)
+        check(name, response)
+        index += 1
+        elapsed = time.perf_counter() - began
+        # Slow cases (full lists of the large datasets) stop after 5 calls
+        if elapsed >= args.max_time and (len(times) >= args.min_rounds or
+                                         (len(times) >= 5 and
+                                          elapsed >= 10 * args.max_time)):
+            break
+    return times, index
+
+
+def profile_case(app, client, name, call, index, calls=PROFILE_CALLS):
+    """
+    SQL statements per call and peak allocated KiB, both the median of
+    a few calls
+    """
+    statements = []
+    peaks = []
+    with app.app_context():
+        engine = db.engine
+
+    def count(*args):
+        statements[-1] += 1
+
+    event.listen(engine, 'before_cursor_execute', count)
+    try:
+        for offset in range(calls):
+            statements.append(0)
+            check(name, call(client, index + offset))
+    finally:
+        event.remove(engine, 'before_cursor_execute', count)
+
+    tracemalloc.start()
+    try:
+        for offset in range(calls, 2 * calls):
+            tracemalloc.clear_traces()
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            check(name, call(client, index + offset))
+            peaks.append((tracemalloc.get_traced_memory()[1] - before) / 1024)
+    finally:
+        tracemalloc.stop()
+    return statistics.median(statements), statistics.median(peaks)
+
+
+def run_size(size, args):
+    """
+    Results of every selected case on one dataset size
+    """
+    source = dataset_path(args.data_dir, size, args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'bench.db')
+        shutil.copyfile(source, path)
+        app = create_app(make_config('sqlite:///' + path))
+        with app.app_context():
+            fixtures = Fixtures(app)
+        client = app.test_client()
+        selected = {name: call for name, call in cases(fixtures).items()
+                    if not args.k or re.search(args.k, name)}
+
+        results = {}
+        next_call = {}
+        for name, call in selected.items():
+            times, next_call[name] = time_case(client, name, call, 0, args)
+            results[name] = {
+                'rounds': len(times),
+                'min_ms': min(times) * 1000,
+                'median_ms': statistics.median(times) * 1000,
+                'p99_ms': percentile(times, 0.99) * 1000,
+                'mean_ms': statistics.fmean(times) * 1000,
+                'ops': 1 / statistics.fmean(times),
+            }
+        # Counting hooks slow the calls down: after every timing
+        for name, call in selected.items():
+            queries, alloc = profile_case(app, client, name, call,
+                                          next_call[name])
+            results[name]['queries'] = queries
+            results[name]['alloc_kib'] = alloc
+        with app.app_context():
+            db.engine.dispose()
+        return results
+
+
+def print_results(size, results):
+    print(f'\n--- {size} reviews ' + '-' * 60)
+    print(f"{'Name':<28}{'Min':>9}{'Median':>9}{'P99':>9}{'OPS':>9}"
+          f"{'Rounds':>8}{'Queries':>9}{'Alloc KiB':>11}")
+    for name, r in sorted(results.items(), key=lambda i: i[1]['median_ms']):
+        print(f"{name:<28}{r['min_ms']:>9.2f}{r['median_ms']:>9.2f}"
+              f"{r['p99_ms']:>9.2f}{r['ops']:>9.1f}{r['rounds']:>8}"
+              f"{r['queries']:>9g}{r['alloc_kib']:>11.1f}")
+    print('(times in ms)')
+
+
+def compare(baseline, current, threshold, strict):
+    """
+    Print the cases slower than the baseline
+
+    Returns:
+        bool: True when a guarded case (any case when strict) regressed
+    """
+    failed = False
+    print(f'\nCompared to the baseline (threshold {threshold:g}%):')
+    for size, results in current.items():
+        for name, result in sorted(results.items()):
+            before = baseline.get(size, {}).get(name)
+            if before is None:
+                continue
+            change = (result['median_ms'] / before['median_ms'] - 1) * 100
+            problems = []
+            if change > threshold:
+                problems.append(f'median {before["median_ms"]:.2f} -> '
+                                f'{result["median_ms"]:.2f} ms '
+                                f'({change:+.1f}%)')
+            if result['queries'] > before['queries']:
+                problems.append(f'queries {before["queries"]:g} -> '
+                                f'{result["queries"]:g}')
+            if not problems:
+                continue
+            fatal = strict or name in GUARDED
+            failed = failed or fatal
+            print(f"  {'FAIL' if fatal else 'warn'} {size} {name}: "
+                  + ', '.join(problems))
+    if failed:
+        print('\n' + '!' * 70)
+        print('!!! REGRESSION: endpoints slower than the baseline (see FAIL)')
+        print('!' * 70)
+    else:
+        print('  no guarded regression')
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', default='10k',
+                        help=f"Comma separated, among {', '.join(SIZES)}")
+    parser.add_argument('-k', help='Only the cases matching this regex')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--data-dir', default=os.path.join(
+        tempfile.gettempdir(), 'hbnb-datasets'),
+        help='Where generated datasets are kept between runs')
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--min-rounds', type=int, default=20)
+    parser.add_argument('--max-rounds', type=int, default=1000)
+    parser.add_argument('--max-time', type=float, default=1.0,
+                        help='Seconds of timed calls per case')
+    parser.add_argument('--save', help='Write the results to this file')
+    parser.add_argument('--compare', help='Baseline written by --save')
+    parser.add_argument('--threshold', type=float, default=15.0,
+                        help='Median slowdown tolerated, in percent')
+    parser.add_argument('--strict', action='store_true',
+                        help='Fail on a regression of any case')
+    args = parser.parse_args()
+
+    sizes = [size.strip() for size in args.sizes.split(',')]
+    unknown = [size for size in sizes if size not in SIZES]
+    if unknown:
+        parser.error(f"Unknown sizes: {', '.join(unknown)}")
+
+    current = {}
+    for size in sizes:
+        current[size] = run_size(size, args)
+        print_results(size, current[size])
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump({
+                'machine': {'python': platform.python_version(),
+                            'platform': platform.platform(),
+                            'processor': platform.processor()},
+                'seed': args.seed,
+                'results': current,
+            }, f, indent=2, sort_keys=True)
+        print(f'\nSaved to {args.save}')
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('seed') != args.seed:
+            parser.error('The baseline was run with another seed')
+        if compare(baseline['results'], current, args.threshold,
+                   args.strict):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+#!/usr/bin/python3
+"""
+Overhead of metrics collection on the API read endpoints
+
+Two apps share one SQLite file: one with METRICS_ENABLED, one without.
+Each request of a round (place list, place, place detail, place reviews,
+amenities, leaderboard) is sent to both apps back to back, in
+alternating order, so both see the same machine load; the overhead is
+the median over the rounds of the ratio of their total times. The cost
+of recording one request (a request sample and three SQL statement
+samples) is also timed on its own.
+
+Usage:
+    python benchmarks/bench_metrics.py [--places 200] [--rounds 30]
+                                       [--requests 200] [--budget 1.0]
+"""
+
+import argparse
+import gc
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from app.extensions import db  # noqa: E402
+from app.metrics import (  # noqa: E402
+    REQUEST_DURATION, STATEMENT_DURATION
+)
+from app.models.place import Place  # noqa: E402
+from app.models.review import Review  # noqa: E402
+from app.models.user import User  # noqa: E402
+from config import DevelopmentConfig  # noqa: E402
+
+
+def make_config(uri, enabled):
+    class BenchConfig(DevelopmentConfig):
+        SQLALCHEMY_DATABASE_URI = uri
+        BCRYPT_LOG_ROUNDS = 4
+        RATELIMIT_ENABLED = False
+        COMPRESS_ENABLED = False
+        SWAGGER_CACHE = False
+        METRICS_ENABLED = enabled
+    return BenchConfig
+
+
+def seed(app, places):
+    """
+    Users, places and a few reviews per place
+    """
+    rng = random.Random(0)
+    with app.app_context():
+        db.create_all()
+        users = [User(f'User{i}', 'Bench', f'user{i}@example.com',
+                      'password1') for i in range(10)]
+        db.session.add_all(users)
+        db.session.flush()
+        rows = []
+        for i in range(places):
+            place = Place(title=f'Place {i}', description='Bench place',
+                          price=rng.uniform(20, 300),
+                          latitude=rng.uniform(40, 50),
+                          longitude=rng.uniform(0, 10),
+                          owner_id=users[0].id)
+            rows.append(place)
+        db.session.add_all(rows)
+        db.session.flush()
+        for place in rows:
+            for user in rng.sample(users, 3):
+                db.session.add(Review(text='Nice', rating=rng.randint(1, 5),
+                                      user_id=user.id, place_id=place.id))
+        db.session.commit()
+        return [place.id for place in rows]
+
+
+def urls(place_ids, count):
+    rng = random.Random(1)
+    paths = []
+    for _ in range(count):
+        place_id = rng.choice(place_ids)
+        paths.append(rng.choice((
+            '/api/v1/places/',
+            f'/api/v1/places/{place_id}',
+            f'/api/v1/places/{place_id}?view=detail',
+            f'/api/v1/places/{place_id}/reviews?limit=20',
+            '/api/v1/amenities/',
+            '/api/v1/places/top?by=rating&k=20',
+        )))
+    return paths
+
+
+def run_round(clients, paths, index):
+    """
+    Seconds spent by each client on the requests of a round
+    """
+    gc.collect()
+    totals = [0.0] * len(clients)
+    for position, path in enumerate(paths):
+        order = range(len(clients))
+        if (position + index) % 2:
+            order = reversed(order)
+        for client_index in order:
+            started = time.perf_counter()
+            response = clients[client_index].get(path)
+            totals[client_index] += time.perf_counter() - started
+            if response.status_code != 200:
+                raise SystemExit(f'{path}: {response.status_code}')
+    return totals
+
+
+def recording_cost(number=100000):
+    """
+    Seconds spent recording one request with three SQL statements
+    """
+    labels = ('places', 'PlaceResource', 'GET', '200')
+
+    def record():
+        REQUEST_DURATION.observe(0.004, labels)
+        for _ in range(3):
+            STATEMENT_DURATION.observe(0.0002, ('SELECT',))
+
+    return min(timeit.repeat(record, number=number, repeat=5)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--places', type=int, default=200)
+    parser.add_argument('--rounds', type=int, default=30)
+    parser.add_argument('--requests', type=int, default=200,
+                        help='Requests per round')
+    parser.add_argument('--budget', type=float, default=None,
+                        help='Fail when the overhead exceeds this percentage')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        uri = 'sqlite:///' + os.path.join(directory, 'bench.db')
+        plain = create_app(make_config(uri, False))
+        measured = create_app(make_config(uri, True))
+        place_ids = seed(plain, args.places)
+        paths = urls(place_ids, args.requests)
+
+        clients = (plain.test_client(), measured.test_client())
+        # Warm up: caches, leaderboards, SQLite page cache
+        run_round(clients, paths, 0)
+
+        rounds = [run_round(clients, paths, index)
+                  for index in range(args.rounds)]
+
+        scraped = clients[1].get('/metrics').get_data(as_text=True)
+        series = sum(1 for line in scraped.splitlines()
+                     if line and not line.startswith('#'))
+
+    off = statistics.median(off for off, _ in rounds)
+    on = statistics.median(on for _, on in rounds)
+    overhead = (statistics.median(on / off for off, on in rounds) - 1) * 100
+    per_request = overhead / 100 * off / args.requests * 1e6
+    print(f'{args.requests} requests per round, {args.rounds} rounds')
+    print(f'metrics off: {off * 1000:9.2f} ms/round')
+    print(f'metrics on : {on * 1000:9.2f} ms/round')
+    print(f'overhead   : {overhead:+9.2f} % ({per_request:+.1f} us/request)')
+    print(f'/metrics   : {series} samples')
+    cost = recording_cost()
+    print(f'recording  : {cost * 1e6:9.2f} us/request '
+          f'({cost / (off / args.requests) * 100:.3f} % of a request)')
+
+    if args.budget is not None and overhead > args.budget:
+        print(f'FAIL: overhead above {args.budget}%')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+#!/usr/bin/python3
+"""
+Memory per object of part2's models, compact and previous layouts
+
+Builds `--count` places and reviews (1M by default) and reports the
+bytes per object they take (tracemalloc), alone and once stored in an
+in-memory repository (dict entry and key included):
+- compact: part2's models (__slots__, 16-byte ids, integer timestamps),
+  in part2's InMemoryRepository keyed by the 16 bytes of the ids
+- previous: the same classes with a __dict__ per instance, string UUIDs
+  and datetimes, in a dict keyed by the string ids, as part2 had them
+
+Titles and texts are distinct strings of the same length in both
+layouts. Related ids (owner of a place, place and user of a review) are
+new strings for each object, as they are when they come from a JSON
+payload.
+
+Usage:
+    python benchmarks/bench_models.py [--count 1000000] [--json out.json]
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+import uuid
+from datetime import datetime
+
+PART4 = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PART2 = os.path.join(os.path.dirname(PART4), 'part2', 'hbnb')
+
+
+class _DictBase:
+    def __init__(self):
+        self.id = str(uuid.uuid4())
+        self.created_at = datetime.now()
+        self.updated_at = datetime.now()
+
+
+class _DictPlace(_DictBase):
+    def __init__(self, title, description, price, latitude, longitude, owner):
+        super().__init__()
+        self.title = title
+        self.description = description
+        self.price = price
+        self.latitude = latitude
+        self.longitude = longitude
+        self.owner = owner
+        self.reviews = []
+        self.amenities = []
+
+
+class _DictReview(_DictBase):
+    def __init__(self, text, rating, place_id, user_id):
+        super().__init__()
+        self.text = text
+        self.rating = rating
+        self.place_id = place_id
+        self.user_id = user_id
+
+
+def _compact_layout():
+    sys.path.insert(0, PART2)
+    from app.models.place import Place
+    from app.models.review import Review
+    from app.persistence.repository import InMemoryRepository
+
+    def store(objects):
+        repository = InMemoryRepository()
+        for obj in objects:
+            repository.add(obj)
+        return repository
+    return Place, Review, store
+
+
+def _previous_layout():
+    def store(objects):
+        return {obj.id: obj for obj in objects}
+    return _DictPlace, _DictReview, store
+
+
+LAYOUTS = {'compact': _compact_layout, 'previous': _previous_layout}
+
+
+def _places(Place, count, owners):
+    return [Place(f'Place {i:07d}', 'Benchmark place', 50.0 + i % 200,
+                  48.0 + (i % 1000) / 1000, 2.0 + (i % 997) / 1000,
+                  str(owners[i % len(owners)]))
+            for i in range(count)]
+
+
+def _reviews(Review, count, places, users):
+    return [Review(f'Review {i:07d}', 1 + i % 5,
+                   str(places[i % len(places)]), str(users[i % len(users)]))
+            for i in range(count)]
+
+
+def measure(build, store, count):
+    """
+    Bytes per object built by build(), alone then stored by store()
+
+    Returns:
+        dict: 'object_bytes', 'stored_bytes' and 'seconds' to build
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        objects = build()
+        seconds = time.perf_counter() - started
+        gc.collect()
+        built = tracemalloc.get_traced_memory()[0]
+        stored = store(objects)
+        gc.collect()
+        after = tracemalloc.get_traced_memory()[0]
+        # What the list of objects takes is not the objects'
+        list_bytes = sys.getsizeof(objects)
+        del objects, stored
+    finally:
+        tracemalloc.stop()
+    return {
+        'object_bytes': (built - before - list_bytes) / count,
+        'stored_bytes': (after - before - list_bytes) / count,
+        'seconds': seconds,
+    }
+
+
+def run(count):
+    # Ids the related ids are made from, as UUIDs: str() makes a new
+    # string for each object
+    owners = [uuid.uuid4() for _ in range(1000)]
+    place_ids = [uuid.uuid4() for _ in range(min(count, 100000))]
+    results = {}
+    for name, layout in LAYOUTS.items():
+        Place, Review, store = layout()
+        print(f'Measuring {name}...', file=sys.stderr)
+        results[name] = {
+            'place': measure(lambda: _places(Place, count, owners),
+                             store, count),
+            'review': measure(
+                lambda: _reviews(Review, count, place_ids, owners),
+                store, count),
+        }
+    return results
+
+
+def print_results(results, count):
+    print(f'\n--- {count:,} objects per model ' + '-' * 40)
+    print(f"{'bytes/object':<24}" + ''.join(f'{name:>14}' for name in results)
+          + f"{'saved':>10}")
+    for kind in ('place', 'review'):
+        for key, label in (('object_bytes', 'alone'),
+                           ('stored_bytes', 'stored')):
+            row = [results[name][kind][key] for name in results]
+            saved = 1 - results['compact'][kind][key] \
+                / results['previous'][kind][key]
+            print(f'{kind + " (" + label + ")":<24}'
+                  + ''.join(f'{value:>14,.0f}' for value in row)
+                  + f'{saved:>10.0%}')
+    print(f"{'seconds to build':<24}" + ''.join(
+        f"{sum(r['seconds'] for r in results[name].values()):>14.1f}"
+        for name in results))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--count', type=int, default=1000000,
+                        help='Places, and reviews, built')
+    parser.add_argument('--json', help='Write the results to this file')
+    args = parser.parse_args()
+
+    results = run(args.count)
+    print_results(results, args.count)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'count': args.count, **results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/python3
+"""
+Filter and aggregate queries on part2's places, loop vs NumPy columns
+
+Stores `--count` places (1M by default) in part2's PlaceRepository (a
+loop over the places) and ColumnarPlaceRepository (masks over NumPy
+columns), then times a price range, a bounding box, the average price
+and the count of places by owner on each (median of `--rounds`), and
+checks both give the same answers.
+
+Without NumPy only the loop is timed.
+
+Usage:
+    python benchmarks/bench_place_queries.py [--count 1000000]
+        [--rounds 5] [--json out.json]
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+
+PART4 = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PART2 = os.path.join(os.path.dirname(PART4), 'part2', 'hbnb')
+sys.path.insert(0, PART2)
+
+from app.models.place import Place  # noqa: E402
+from app.persistence import place_repository  # noqa: E402
+
+# name -> query, selective filters (about 1% of the places)
+QUERIES = {
+    'price range': lambda repo: repo.get_by_price(100.0, 105.0),
+    'bbox': lambda repo: repo.get_in_bbox(48.80, 48.82, 2.30, 2.35),
+    'average price': lambda repo: repo.average_price(),
+    'count by owner': lambda repo: repo.count_by_owner(),
+}
+
+
+def build(count, seed):
+    rng = random.Random(seed)
+    owners = [str(uuid.UUID(int=rng.getrandbits(128), version=4))
+              for _ in range(max(1, count // 100))]
+    return [Place(f'Place {i}', 'Benchmark place',
+                  round(rng.uniform(20.0, 520.0), 2),
+                  rng.uniform(48.0, 49.0), rng.uniform(2.0, 2.5),
+                  rng.choice(owners))
+            for i in range(count)]
+
+
+def time_query(query, repo, rounds):
+    times = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        result = query(repo)
+        times.append(time.perf_counter() - started)
+    return statistics.median(times) * 1000, result
+
+
+def _same(a, b):
+    if isinstance(a, float) and isinstance(b, float):
+        return abs(a - b) <= 1e-9 * max(1.0, abs(a))
+    return a == b
+
+
+def run(count, rounds, seed):
+    places = build(count, seed)
+    repositories = {'loop': place_repository.PlaceRepository}
+    if place_repository.numpy is not None:
+        repositories['columnar'] = place_repository.ColumnarPlaceRepository
+    results = {}
+    answers = {}
+    for name, repository_class in repositories.items():
+        print(f'Storing {count:,} places ({name})...', file=sys.stderr)
+        repo = repository_class()
+        for place in places:
+            repo.add(place)
+        results[name] = {}
+        for query_name, query in QUERIES.items():
+            ms, answer = time_query(query, repo, rounds)
+            results[name][query_name] = ms
+            expected = answers.setdefault(query_name, answer)
+            if not _same(answer, expected):
+                sys.exit(f'{query_name}: {name} gives another answer')
+        del repo
+    return results
+
+
+def print_results(results, count):
+    names = list(results)
+    print(f'\n--- {count:,} places ' + '-' * 40)
+    print(f"{'ms (median)':<18}" + ''.join(f'{name:>12}' for name in names)
+          + (f"{'speedup':>10}" if 'columnar' in results else ''))
+    for query in QUERIES:
+        line = f'{query:<18}' + ''.join(f'{results[name][query]:>12.2f}'
+                                        for name in names)
+        if 'columnar' in results:
+            speedup = results['loop'][query] / results['columnar'][query]
+            line += f'{speedup:>9.0f}x'
+        print(line)
+    if 'columnar' not in results:
+        print('\nnumpy is not installed: only the loop was timed')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--count', type=int, default=1000000,
+                        help='Places stored')
+    parser.add_argument('--rounds', type=int, default=5,
+                        help='Runs of each query, the median is kept')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help='Write the results to this file')
+    args = parser.parse_args()
+
+    results = run(args.count, args.rounds, args.seed)
+    print_results(results, args.count)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'count': args.count, **results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
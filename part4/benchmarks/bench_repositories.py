@@ -0,0 +1,352 @@
+#!/usr/bin/python3
+"""
+Repository backends compared on the same workload
+
+Runs add, get, get_all, get_by_attribute, update, delete and read/write
+mixes of get and update against each backend of BACKENDS, at several
+sizes, and reports operations per second and memory per stored place:
+- memory: part2's InMemoryRepository with part2's models
+- sqlite-file, sqlite-memory: part4's SQLAlchemyRepository on a SQLite
+  file or `sqlite://` (one connection, in memory), with part4's models
+
+Both parts have an `app` package, so each backend runs in its own
+interpreter, with its tree first on sys.path. A repository is timed
+through its own interface only: SQLAlchemyRepository commits after each
+write and returns every match of get_by_attribute, InMemoryRepository
+returns the first one. Each phase ends like a request (the SQLAlchemy
+session is removed).
+
+Memory per place is the Python memory the repository keeps (tracemalloc)
+and, for SQLite, the size of the database pages.
+
+To add a backend, write a function returning a Harness and list it in
+BACKENDS with the tree it imports from.
+
+Usage:
+    python benchmarks/bench_repositories.py [--sizes 1000,10000]
+        [--backends memory,sqlite-file] [--max-time 1] [--json out.json]
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+
+PART4 = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PART2 = os.path.join(os.path.dirname(PART4), 'part2', 'hbnb')
+
+# Share of reads (get) of each mix, the rest are updates
+MIXES = {'read-heavy': 0.95, 'balanced': 0.5, 'write-heavy': 0.2}
+
+PHASES = ('add', 'get', 'get_by_attribute', 'get_all', 'update',
+          *(f'mix:{name}' for name in MIXES), 'delete')
+
+
+class Harness:
+    """
+    What the workload needs to know about a backend
+
+    Attributes:
+        repository: Object with the Repository interface
+        make (callable): i -> new place object, not stored
+        fill (callable): Store a list of places quickly, untimed
+        end_phase (callable): Called between phases
+        db_bytes (callable): Bytes used by the stored data outside
+            Python, None when not applicable
+        close (callable): Release everything
+    """
+    def __init__(self, repository, make, fill=None, end_phase=None,
+                 db_bytes=None, close=None):
+        self.repository = repository
+        self.make = make
+        self.fill = fill or (lambda objects: [repository.add(obj)
+                                             for obj in objects])
+        self.end_phase = end_phase or (lambda: None)
+        self.db_bytes = db_bytes or (lambda: None)
+        self.close = close or (lambda: None)
+
+
+def memory_backend():
+    from app.models.place import Place
+    from app.models.user import User
+    from app.persistence.repository import InMemoryRepository
+
+    owner = User('Bench', 'Owner', 'owner@example.com')
+
+    def make(i):
+        return Place(f'Place {i}', 'Benchmark place', 50.0 + i % 200,
+                     48.0 + (i % 1000) / 1000, 2.0 + (i % 997) / 1000, owner)
+
+    return Harness(InMemoryRepository(), make)
+
+
+def sqlalchemy_backend(uri):
+    def open_backend():
+        from app import create_app
+        from app.extensions import db
+        from app.models.place import Place
+        from app.models.user import User
+        from app.persistence.repository import SQLAlchemyRepository
+        from config import DevelopmentConfig
+
+        class BenchConfig(DevelopmentConfig):
+            SQLALCHEMY_DATABASE_URI = uri
+            METRICS_ENABLED = False
+
+        app = create_app(BenchConfig)
+        context = app.app_context()
+        context.push()
+        db.create_all()
+        owner = User(first_name='Bench', last_name='Owner',
+                     email='owner@example.com', password='password1')
+        db.session.add(owner)
+        db.session.commit()
+        owner_id = owner.id
+
+        def make(i):
+            # IDs set up front: the column default only sets them when
+            # the place is flushed, and the workload needs them before
+            return Place(id=str(uuid.uuid4()), title=f'Place {i}',
+                         description='Benchmark place',
+                         price=50.0 + i % 200,
+                         latitude=48.0 + (i % 1000) / 1000,
+                         longitude=2.0 + (i % 997) / 1000, owner_id=owner_id)
+
+        def fill(objects):
+            db.session.add_all(objects)
+            db.session.commit()
+
+        def db_bytes():
+            pages = db.session.execute(db.text('PRAGMA page_count')).scalar()
+            size = db.session.execute(db.text('PRAGMA page_size')).scalar()
+            return pages * size
+
+        def close():
+            db.session.remove()
+            db.engine.dispose()
+            context.pop()
+
+        return Harness(SQLAlchemyRepository(Place), make, fill,
+                       db.session.remove, db_bytes, close)
+    return open_backend
+
+
+def _sqlite_file():
+    directory = tempfile.TemporaryDirectory(prefix='hbnb-repo-')
+    harness = sqlalchemy_backend(
+        'sqlite:///' + os.path.join(directory.name, 'bench.db'))()
+    close = harness.close
+
+    def close_and_remove():
+        close()
+        directory.cleanup()
+
+    harness.close = close_and_remove
+    return harness
+
+
+# name -> (tree imported from, function returning a Harness)
+BACKENDS = {
+    'memory': (PART2, memory_backend),
+    'sqlite-file': (PART4, _sqlite_file),
+    'sqlite-memory': (PART4, sqlalchemy_backend('sqlite://')),
+}
+
+
+def measure(operation, arguments, max_time):
+    """
+    Operations per second of `operation` over `arguments`, stopping
+    after max_time seconds
+    """
+    gc.collect()
+    count = 0
+    started = time.perf_counter()
+    elapsed = 0.0
+    for argument in arguments:
+        operation(argument)
+        count += 1
+        if count % 16 == 0:
+            elapsed = time.perf_counter() - started
+            if elapsed >= max_time:
+                break
+    elapsed = time.perf_counter() - started
+    return {'ops': count, 'ops_per_sec': count / elapsed if elapsed else 0}
+
+
+def run_size(open_backend, size, max_time, seed):
+    """
+    Every phase on a repository of `size` places
+
+    Returns:
+        dict: phase -> {'ops', 'ops_per_sec'}, plus 'memory'
+    """
+    harness = open_backend()
+    repository = harness.repository
+    rng = random.Random(seed)
+    results = {}
+    try:
+        # add: timed on the first places, the rest stored in bulk
+        objects = [harness.make(i) for i in range(size)]
+        ids = [obj.id for obj in objects]
+        results['add'] = measure(repository.add, objects, max_time)
+        harness.fill(objects[results['add']['ops']:])
+        del objects
+        harness.end_phase()
+
+        def sample(count):
+            return (rng.choice(ids) for _ in range(count))
+
+        results['get'] = measure(repository.get, sample(size), max_time)
+        harness.end_phase()
+
+        results['get_by_attribute'] = measure(
+            lambda i: repository.get_by_attribute('title', f'Place {i}'),
+            (rng.randrange(size) for _ in range(size)), max_time)
+        harness.end_phase()
+
+        results['get_all'] = measure(lambda _: repository.get_all(),
+                                     range(1000), max_time)
+        results['get_all']['objects_per_sec'] = \
+            results['get_all']['ops_per_sec'] * size
+        harness.end_phase()
+
+        results['update'] = measure(
+            lambda obj_id: repository.update(obj_id, {'price': 99.0}),
+            sample(size), max_time)
+        harness.end_phase()
+
+        for name, reads in MIXES.items():
+            def mixed(obj_id, reads=reads):
+                if rng.random() < reads:
+                    repository.get(obj_id)
+                else:
+                    repository.update(obj_id, {'price': 75.0})
+            results[f'mix:{name}'] = measure(mixed, sample(size), max_time)
+            harness.end_phase()
+
+        doomed = ids[:]
+        rng.shuffle(doomed)
+        results['delete'] = measure(repository.delete, doomed, max_time)
+        harness.end_phase()
+    finally:
+        harness.close()
+
+    results['memory'] = memory_per_object(open_backend, size)
+    return results
+
+
+def memory_per_object(open_backend, size):
+    """
+    Bytes kept per place by the repository: Python (traced) and DB pages
+
+    The places are built while memory is traced: what the repository
+    keeps of them once the caller drops them is counted.
+    """
+    harness = open_backend()
+    try:
+        empty_db = harness.db_bytes()
+        gc.collect()
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            objects = [harness.make(i) for i in range(size)]
+            harness.fill(objects)
+            del objects
+            harness.end_phase()
+            gc.collect()
+            python = tracemalloc.get_traced_memory()[0] - before
+        finally:
+            tracemalloc.stop()
+        full_db = harness.db_bytes()
+    finally:
+        harness.close()
+    return {
+        'python_bytes': python / size,
+        'db_bytes': None if full_db is None
+        else (full_db - empty_db) / size,
+    }
+
+
+def worker(args):
+    tree, open_backend = BACKENDS[args.worker]
+    sys.path.insert(0, tree)
+    os.chdir(tree)
+    results = {size: run_size(open_backend, size, args.max_time, args.seed)
+               for size in args.sizes}
+    print(json.dumps(results))
+
+
+def print_results(results, sizes):
+    backends = list(results)
+    for size in sizes:
+        print(f'\n--- {size} places ' + '-' * 50)
+        print(f"{'ops/sec':<22}" + ''.join(f'{name:>16}' for name in backends))
+        for phase in PHASES:
+            row = [results[name][str(size)][phase]['ops_per_sec']
+                   for name in backends]
+            print(f'{phase:<22}' + ''.join(f'{value:>16,.0f}'
+                                           for value in row))
+        print(f"{'get_all objects/sec':<22}" + ''.join(
+            f"{results[name][str(size)]['get_all']['objects_per_sec']:>16,.0f}"
+            for name in backends))
+        print(f"{'bytes/place (Python)':<22}" + ''.join(
+            f"{results[name][str(size)]['memory']['python_bytes']:>16,.0f}"
+            for name in backends))
+        print(f"{'bytes/place (DB)':<22}" + ''.join(
+            '{:>16}'.format(
+                '-' if results[name][str(size)]['memory']['db_bytes'] is None
+                else f"{results[name][str(size)]['memory']['db_bytes']:,.0f}")
+            for name in backends))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', default='1000,10000',
+                        help='Comma separated numbers of places')
+    parser.add_argument('--backends', default=','.join(BACKENDS),
+                        help=f"Comma separated, among {', '.join(BACKENDS)}")
+    parser.add_argument('--max-time', type=float, default=1.0,
+                        help='Seconds per phase')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help='Write the results to this file')
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    args.sizes = [int(size) for size in args.sizes.split(',')]
+
+    if args.worker:
+        worker(args)
+        return
+
+    backends = [name.strip() for name in args.backends.split(',')]
+    unknown = [name for name in backends if name not in BACKENDS]
+    if unknown:
+        parser.error(f"Unknown backends: {', '.join(unknown)}")
+
+    results = {}
+    for name in backends:
+        print(f'Running {name}...', file=sys.stderr)
+        command = [sys.executable, os.path.abspath(__file__),
+                   '--worker', name, '--sizes',
+                   ','.join(map(str, args.sizes)),
+                   '--max-time', str(args.max_time), '--seed', str(args.seed)]
+        output = subprocess.run(command, capture_output=True, text=True)
+        if output.returncode:
+            sys.stderr.write(output.stderr)
+            sys.exit(f'{name} failed')
+        results[name] = json.loads(output.stdout.splitlines()[-1])
+
+    print_results(results, args.sizes)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/python3
+"""
+Serialization cost per 1k places, before and after the compiled serializers
+
+"before" is what the endpoints used to do: build each dict by hand and
+encode it with the stdlib json module (flask-restx default).
+"after" is the compiled `place_serializer` encoded with `dumps`.
+
+Usage:
+    python benchmarks/bench_serialization.py [--places 1000] [--repeat 50]
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from app.api.serialization import dumps, orjson  # noqa: E402
+from app.api.v1.serializers import place_serializer  # noqa: E402
+from app.models.place import Place  # noqa: E402
+from app.models.user import User  # noqa: E402
+from config import DevelopmentConfig  # noqa: E402
+
+
+class BenchConfig(DevelopmentConfig):
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    BCRYPT_LOG_ROUNDS = 4
+
+
+def build_places(count):
+    """
+    Build transient Place objects sharing a single owner
+    """
+    owner = User('Walter', 'White', 'heisenberg@example.com', 'azerty123')
+    owner.id = 'owner-id'
+
+    places = []
+    for i in range(count):
+        place = Place(id=f'place-{i}', title=f'Place {i}',
+                      description='A lovely place ' * 4, price=100.0 + i,
+                      latitude=48.85, longitude=2.35, owner_id=owner.id)
+        place.user = owner
+        places.append(place)
+    return places
+
+
+def before(places):
+    data = []
+    for place in places:
+        owner = place.user
+        data.append({
+            'id': place.id,
+            'title': place.title,
+            'description': place.description,
+            'price': place.price,
+            'latitude': place.latitude,
+            'longitude': place.longitude,
+            'owner': {
+                'id': owner.id,
+                'first_name': owner.first_name,
+                'last_name': owner.last_name,
+                'email': owner.email
+            },
+        })
+    return json.dumps(data) + '\n'
+
+
+def after(places):
+    return dumps(place_serializer.many(places)) + b'\n'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--places', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    with create_app(BenchConfig).app_context():
+        places = build_places(args.places)
+    assert json.loads(before(places)) == json.loads(after(places))
+
+    print(f"encoder backend: {'orjson' if orjson else 'json'}")
+    for name, func in (('before', before), ('after', after)):
+        best = min(timeit.repeat(lambda: func(places),
+                                 number=1, repeat=args.repeat))
+        per_1k = best * 1000 / args.places
+        print(f"{name:>6}: {per_1k * 1000:8.3f} ms per 1k places")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/python3
+"""
+Cold start of the API: time to the first request, and what it is spent on
+
+Each run starts a fresh interpreter that imports the app, creates it,
+answers a first API request and a first /swagger.json request. Runs
+are timed without instrumentation; one extra run with
+`python -X importtime` lists the slowest imports. The Swagger cache
+directory is empty for the first run only, so both the cold build and
+the cached spec are measured.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 5] [--top 15] [--depth 1]
+        [--budget-ms 1500]
+
+With --budget-ms, the script exits with status 1 when the median time to
+the first request is over budget.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+PART4 = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = '''
+import json, time
+start = time.perf_counter()
+from app import create_app
+from config import DevelopmentConfig
+
+class BenchConfig(DevelopmentConfig):
+    DEBUG = False
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    SWAGGER_CACHE_DIR = {cache_dir!r}
+
+imported = time.perf_counter()
+app = create_app(BenchConfig)
+created = time.perf_counter()
+client = app.test_client()
+with app.app_context():
+    from app.extensions import db
+    db.create_all()
+ready = time.perf_counter()
+assert client.get('/api/v1/amenities/').status_code == 200
+first = time.perf_counter()
+assert client.get('/swagger.json').status_code == 200
+swagger = time.perf_counter()
+print(json.dumps({{
+    'import_app': imported - start,
+    'create_app': created - imported,
+    'first_request': first - ready,
+    'swagger': swagger - first,
+    'to_first_request': first - start - (ready - created),
+}}))
+'''
+
+
+def run_probe(cache_dir, importtime=False):
+    """
+    Run the probe in a fresh interpreter
+
+    Returns:
+        tuple: (timings dict, wall time of the process, stderr)
+    """
+    command = [sys.executable]
+    if importtime:
+        command += ['-X', 'importtime']
+    command += ['-c', PROBE.format(cache_dir=cache_dir)]
+    start = time.perf_counter()
+    result = subprocess.run(command, cwd=PART4, capture_output=True,
+                            text=True, check=True)
+    wall = time.perf_counter() - start
+    return json.loads(result.stdout.splitlines()[-1]), wall, result.stderr
+
+
+def slowest_imports(stderr, top, depth=1):
+    """
+    Imports of an -X importtime report, by cumulative time
+
+    Args:
+        stderr (str): The report
+        top (int): Number of imports returned
+        depth (int): Nesting level kept, 0 for the probe's own imports
+
+    Returns:
+        list: (cumulative microseconds, module) pairs
+    """
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        # Nesting is shown by two spaces of indentation per level
+        if (len(name) - len(name.lstrip()) - 1) // 2 > depth:
+            continue
+        imports.append((int(cumulative), name.strip()))
+    return sorted(imports, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--depth', type=int, default=1)
+    parser.add_argument('--budget-ms', type=float)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        runs = [run_probe(cache_dir) for _ in range(args.runs)]
+        _, _, stderr = run_probe(cache_dir, importtime=True)
+
+    def median_ms(key, samples):
+        return statistics.median(sample[key] for sample in samples) * 1000
+
+    timings = [timing for timing, _, _ in runs]
+    print(f"{args.runs} runs, median:")
+    for key in ('import_app', 'create_app', 'first_request',
+                'to_first_request'):
+        print(f"  {key:18s} {median_ms(key, timings):9.1f} ms")
+    print(f"  {'swagger (cold)':18s} {timings[0]['swagger'] * 1000:9.1f} ms")
+    if len(timings) > 1:
+        print(f"  {'swagger (cached)':18s} "
+              f"{median_ms('swagger', timings[1:]):9.1f} ms")
+    wall_ms = statistics.median(wall for _, wall, _ in runs) * 1000
+    print(f"  {'process wall time':18s} {wall_ms:9.1f} ms")
+
+    print("\nSlowest imports (-X importtime, cumulative):")
+    for cumulative, name in slowest_imports(stderr, args.top, args.depth):
+        print(f"  {cumulative / 1000:9.1f} ms  {name}")
+
+    to_first_request = median_ms('to_first_request', timings)
+    if args.budget_ms is not None and to_first_request > args.budget_ms:
+        print(f"\nOver budget: {to_first_request:.1f} ms to the first "
+              f"request > {args.budget_ms:.0f} ms")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
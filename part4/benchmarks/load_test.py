@@ -0,0 +1,539 @@
+#!/usr/bin/python3
+"""
+Concurrent HTTP load test of a running API, with latency percentiles
+
+Virtual users (threads, one keep-alive connection each) replay a
+weighted mix of the flows of the Postman collection (tests/) and of the
+web client:
+- browse: list the places (index.html)
+- detail: a place with its latest reviews, then its review page
+  (place.html)
+- login: log in (login.html)
+- review: post a review of a place, as a logged in user
+  (add_review.html), then update it
+
+Setup follows the collection: the admin logs in and creates one account
+per virtual user, and places when there are fewer than --places.
+
+The report gives, per endpoint (route with its IDs replaced), the
+requests per second, p50/p95/p99/p99.9 latency and error rate (unexpected
+statuses and connection errors), plus the throughput of each second of
+the run, on the console and as JSON and HTML files.
+
+With --start, a local server (werkzeug, threaded, HTTP/1.1, rate limits
+off) is started on --db (e.g. a database made by `flask --app run seed`)
+or on an empty database, with an admin of its own (LOAD_TEST_ADMIN)
+that setup logs in as, whatever admins the database already has.
+Without it, --url is tested as is, as --admin-email: its rate limits
+apply and show up as 429 errors.
+
+Usage:
+    python benchmarks/load_test.py --start [--db hbnb.db] [-c 16] [-d 30]
+        [--mix browse=50,detail=30,login=10,review=10]
+        [--json report.json] [--html report.html]
+    python benchmarks/load_test.py --url http://127.0.0.1:5000 ...
+"""
+
+import argparse
+import html
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+from collections import Counter, defaultdict
+
+PART4 = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MIX = 'browse=50,detail=30,login=10,review=10'
+PERCENTILES = (('p50', 0.5), ('p95', 0.95), ('p99', 0.99),
+               ('p999', 0.999))
+
+# Admin created by --start servers: seeded databases have their own
+# admin@example.com, with another password
+LOAD_TEST_ADMIN = ('load-test-admin@example.com', 'load-test-password')
+
+SERVER = '''
+import sys
+sys.path.insert(0, {part4!r})
+from werkzeug.serving import WSGIRequestHandler, run_simple
+from app import create_app
+from app.extensions import db
+from config import DevelopmentConfig
+
+class LoadTestConfig(DevelopmentConfig):
+    DEBUG = False
+    SQLALCHEMY_DATABASE_URI = {uri!r}
+    RATELIMIT_ENABLED = False
+
+app = create_app(LoadTestConfig)
+with app.app_context():
+    db.create_all()
+    from app.services import facade
+    if not facade.get_user_by_email({email!r}):
+        facade.create_user({{'first_name': 'Load', 'last_name': 'Admin',
+                             'email': {email!r}, 'password': {password!r},
+                             'is_admin': True}})
+    db.session.remove()
+
+# Keep-alive connections, as behind a production server
+WSGIRequestHandler.protocol_version = 'HTTP/1.1'
+run_simple('127.0.0.1', {port}, app, threaded=True)
+'''
+
+
+class Client:
+    """
+    One keep-alive HTTP connection, recording every request
+    """
+    def __init__(self, base_url, stats, timeout=30):
+        url = urllib.parse.urlsplit(base_url)
+        self.host = url.hostname
+        self.port = url.port or 80
+        self.prefix = url.path.rstrip('/')
+        self.stats = stats
+        self.timeout = timeout
+        self.connection = None
+        self.token = None
+
+    def _connect(self):
+        self.connection = http.client.HTTPConnection(
+            self.host, self.port, timeout=self.timeout)
+
+    def request(self, method, path, label, body=None, expected=(200,)):
+        """
+        Send a request and record it under `label`
+
+        Returns:
+            tuple: (status, decoded JSON body or None); status 0 for a
+            connection error
+        """
+        headers = {'Accept': 'application/json'}
+        data = None
+        if body is not None:
+            data = json.dumps(body).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+        if self.token:
+            headers['Authorization'] = f'Bearer {self.token}'
+        if self.connection is None:
+            self._connect()
+
+        started = time.perf_counter()
+        try:
+            self.connection.request(method, self.prefix + path, data,
+                                    headers)
+            response = self.connection.getresponse()
+            payload = response.read()
+            status = response.status
+            if response.getheader('Connection', '').lower() == 'close':
+                self.connection.close()
+                self.connection = None
+        except (OSError, http.client.HTTPException):
+            status, payload = 0, b''
+            self.connection.close()
+            self.connection = None
+        elapsed = time.perf_counter() - started
+
+        self.stats.record(label, elapsed, status, status in expected)
+        try:
+            return status, json.loads(payload) if payload else None
+        except ValueError:
+            return status, None
+
+
+class Stats:
+    """
+    Latencies and statuses of the requests, per endpoint label
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.recording = False
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+        self.errors = Counter()
+        self.per_second = Counter()
+        self.errors_per_second = Counter()
+        self.started = None
+
+    def start(self):
+        with self.lock:
+            self.recording = True
+            self.started = time.perf_counter()
+
+    def record(self, label, elapsed, status, ok):
+        if not self.recording:
+            return
+        second = int(time.perf_counter() - self.started)
+        with self.lock:
+            self.latencies[label].append(elapsed)
+            self.statuses[label][status] += 1
+            self.per_second[second] += 1
+            if not ok:
+                self.errors[label] += 1
+                self.errors_per_second[second] += 1
+
+
+def percentile(ordered, fraction):
+    # Nearest rank
+    if not ordered:
+        return 0.0
+    index = max(int(len(ordered) * fraction + 0.999999) - 1, 0)
+    return ordered[min(index, len(ordered) - 1)]
+
+
+def summarize(latencies, errors, statuses, duration):
+    ordered = sorted(latencies)
+    count = len(ordered)
+    summary = {
+        'requests': count,
+        'throughput': count / duration if duration else 0.0,
+        'errors': errors,
+        'error_rate': errors / count if count else 0.0,
+        'mean_ms': sum(ordered) / count * 1000 if count else 0.0,
+        'max_ms': ordered[-1] * 1000 if count else 0.0,
+        'statuses': {str(code): n for code, n in sorted(statuses.items())},
+    }
+    for name, fraction in PERCENTILES:
+        summary[f'{name}_ms'] = percentile(ordered, fraction) * 1000
+    return summary
+
+
+class Scenarios:
+    """
+    The flows of a virtual user, sharing the IDs found at setup
+    """
+    def __init__(self, place_ids, rng):
+        self.place_ids = place_ids
+        self.rng = rng
+
+    def browse(self, client, user):
+        client.request('GET', '/api/v1/places/', 'GET /places/')
+
+    def detail(self, client, user):
+        place_id = self.rng.choice(self.place_ids)
+        client.request('GET', f'/api/v1/places/{place_id}?view=detail',
+                       'GET /places/<id>?view=detail')
+        client.request('GET', f'/api/v1/places/{place_id}/reviews',
+                       'GET /places/<id>/reviews')
+
+    def login(self, client, user):
+        status, body = client.request(
+            'POST', '/api/v1/auth/login', 'POST /auth/login',
+            {'email': user['email'], 'password': user['password']})
+        if status == 200:
+            client.token = body['access_token']
+
+    def review(self, client, user):
+        if not client.token:
+            self.login(client, user)
+            if not client.token:
+                return
+        # Each user reviews the places in its own order, once each
+        if user['next_place'] >= len(self.place_ids):
+            return
+        place_id = user['places'][user['next_place']]
+        user['next_place'] += 1
+        status, body = client.request(
+            'POST', '/api/v1/reviews/', 'POST /reviews/',
+            {'text': 'Load test review', 'rating': self.rng.randint(1, 5),
+             'user_id': user['id'], 'place_id': place_id},
+            expected=(201, 409))
+        if status == 201:
+            client.request('PUT', f"/api/v1/reviews/{body['id']}",
+                           'PUT /reviews/<id>',
+                           {'text': 'Load test review, updated',
+                            'rating': self.rng.randint(1, 5)})
+
+
+def setup(base_url, args, stats):
+    """
+    Admin login, one account per virtual user, enough places
+
+    Returns:
+        tuple: (users, place IDs)
+    """
+    admin = Client(base_url, stats)
+    status, body = admin.request('POST', '/api/v1/auth/login', 'setup',
+                                 {'email': args.admin_email,
+                                  'password': args.admin_password})
+    if status != 200:
+        sys.exit(f'Admin login failed ({status}): check --admin-email and '
+                 '--admin-password')
+    admin.token = body['access_token']
+
+    run = f'{int(time.time())}-{os.getpid()}'
+    users = []
+    for index in range(args.concurrency):
+        email = f'load-{run}-{index}@example.com'
+        status, body = admin.request(
+            'POST', '/api/v1/users/', 'setup',
+            {'first_name': 'Load', 'last_name': f'User{index}',
+             'email': email, 'password': 'loadtest1'}, expected=(201,))
+        if status != 201:
+            sys.exit(f'Could not create the load test users ({status})')
+        users.append({'id': body['id'], 'email': email,
+                      'password': 'loadtest1', 'next_place': 0})
+
+    status, places = admin.request('GET', '/api/v1/places/', 'setup')
+    place_ids = [place['id'] for place in places or []]
+    rng = random.Random(args.seed)
+    while len(place_ids) < args.places:
+        status, body = admin.request(
+            'POST', '/api/v1/places/', 'setup',
+            {'title': f'Load test place {len(place_ids)}',
+             'description': 'Created by the load test',
+             'price': round(rng.uniform(30, 300), 2),
+             'latitude': rng.uniform(43, 50),
+             'longitude': rng.uniform(-1, 7)}, expected=(201,))
+        if status != 201:
+            sys.exit(f'Could not create places ({status})')
+        place_ids.append(body['id'])
+
+    for user in users:
+        user['places'] = rng.sample(place_ids, len(place_ids))
+    return users, place_ids
+
+
+def virtual_user(base_url, scenarios, mix, user, stats, stop, seed):
+    client = Client(base_url, stats)
+    rng = random.Random(seed)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    while not stop.is_set():
+        name = rng.choices(names, weights)[0]
+        getattr(scenarios, name)(client, user)
+
+
+def start_server(args):
+    """
+    Start the API in a subprocess, wait until it answers
+
+    Returns:
+        tuple: (process, base URL)
+    """
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    if args.db:
+        uri = 'sqlite:///' + os.path.abspath(args.db)
+    else:
+        args.tmp = tempfile.TemporaryDirectory(prefix='hbnb-load-')
+        uri = 'sqlite:///' + os.path.join(args.tmp.name, 'load.db')
+    args.admin_email, args.admin_password = LOAD_TEST_ADMIN
+    code = SERVER.format(part4=PART4, uri=uri, port=port,
+                         email=args.admin_email,
+                         password=args.admin_password)
+    process = subprocess.Popen([sys.executable, '-c', code], cwd=PART4,
+                               stdout=subprocess.DEVNULL,
+                               stderr=subprocess.PIPE)
+    base_url = f'http://127.0.0.1:{port}'
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            sys.exit('The server exited:\n'
+                     + process.stderr.read().decode('utf-8', 'replace'))
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port,
+                                                    timeout=1)
+            connection.request('GET', '/api/v1/amenities/')
+            connection.getresponse().read()
+            connection.close()
+            return process, base_url
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    sys.exit('The server did not start in 60 s')
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if not hasattr(Scenarios, name) or name.startswith('_'):
+            raise argparse.ArgumentTypeError(f'Unknown scenario: {name}')
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def build_report(stats, duration, args):
+    endpoints = {label: summarize(stats.latencies[label],
+                                  stats.errors[label],
+                                  stats.statuses[label], duration)
+                 for label in sorted(stats.latencies)}
+    every = [value for values in stats.latencies.values()
+             for value in values]
+    total = summarize(every, sum(stats.errors.values()),
+                      sum(stats.statuses.values(), Counter()), duration)
+    seconds = range(int(duration) + 1)
+    return {
+        'config': {'concurrency': args.concurrency,
+                   'duration': args.duration, 'warmup': args.warmup,
+                   'mix': args.mix, 'target': args.target},
+        'duration': duration,
+        'total': total,
+        'endpoints': endpoints,
+        'timeline': [{'second': second,
+                      'requests': stats.per_second.get(second, 0),
+                      'errors': stats.errors_per_second.get(second, 0)}
+                     for second in seconds],
+    }
+
+
+def print_report(report):
+    total = report['total']
+    print(f"\n{report['config']['concurrency']} users, "
+          f"{report['duration']:.1f} s: {total['requests']} requests, "
+          f"{total['throughput']:.1f} req/s, "
+          f"{total['error_rate'] * 100:.2f}% errors\n")
+    print(f"{'Endpoint':<32}{'req/s':>8}{'p50':>9}{'p95':>9}{'p99':>9}"
+          f"{'p99.9':>9}{'errors':>8}  statuses")
+    rows = list(report['endpoints'].items()) + [('TOTAL', total)]
+    for label, row in rows:
+        statuses = ' '.join(f'{code}:{count}'
+                            for code, count in row['statuses'].items())
+        print(f"{label:<32}{row['throughput']:>8.1f}{row['p50_ms']:>9.1f}"
+              f"{row['p95_ms']:>9.1f}{row['p99_ms']:>9.1f}"
+              f"{row['p999_ms']:>9.1f}{row['error_rate'] * 100:>7.2f}%"
+              f"  {statuses}")
+    print('(latencies in ms)')
+
+
+def html_report(report):
+    """
+    Standalone HTML page: summary table and requests per second chart
+    """
+    timeline = report['timeline']
+    peak = max([point['requests'] for point in timeline] + [1])
+    width, height = 800, 200
+    step = width / max(len(timeline) - 1, 1)
+
+    def points(key):
+        return ' '.join(
+            f"{index * step:.1f},{height - point[key] / peak * height:.1f}"
+            for index, point in enumerate(timeline))
+
+    rows = []
+    for label, row in list(report['endpoints'].items()) + \
+            [('TOTAL', report['total'])]:
+        statuses = ', '.join(f'{code}: {count}'
+                             for code, count in row['statuses'].items())
+        rows.append(
+            f"<tr><td>{html.escape(label)}</td>"
+            f"<td>{row['requests']}</td><td>{row['throughput']:.1f}</td>"
+            f"<td>{row['p50_ms']:.1f}</td><td>{row['p95_ms']:.1f}</td>"
+            f"<td>{row['p99_ms']:.1f}</td><td>{row['p999_ms']:.1f}</td>"
+            f"<td>{row['max_ms']:.1f}</td>"
+            f"<td>{row['error_rate'] * 100:.2f}%</td>"
+            f"<td>{html.escape(statuses)}</td></tr>")
+    config = html.escape(json.dumps(report['config']))
+    return f'''<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>HBnB load test</title>
+<style>
+body {{ font-family: sans-serif; margin: 2em; }}
+table {{ border-collapse: collapse; }}
+td, th {{ border: 1px solid #ccc; padding: 4px 8px; text-align: right; }}
+td:first-child, th:first-child {{ text-align: left; }}
+tr:last-child {{ font-weight: bold; }}
+</style>
+</head>
+<body>
+<h1>HBnB load test</h1>
+<p><code>{config}</code></p>
+<table>
+<tr><th>Endpoint</th><th>Requests</th><th>req/s</th><th>p50 ms</th>
+<th>p95 ms</th><th>p99 ms</th><th>p99.9 ms</th><th>max ms</th>
+<th>Errors</th><th>Statuses</th></tr>
+{''.join(rows)}
+</table>
+<h2>Requests per second (blue) and errors (red), peak {peak}</h2>
+<svg width="{width}" height="{height}" style="border: 1px solid #ccc">
+<polyline fill="none" stroke="steelblue" stroke-width="2"
+ points="{points('requests')}"/>
+<polyline fill="none" stroke="crimson" stroke-width="2"
+ points="{points('errors')}"/>
+</svg>
+</body>
+</html>
+'''
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--url', help='Base URL of a running API')
+    target.add_argument('--start', action='store_true',
+                        help='Start a local server for the test')
+    parser.add_argument('--db', help='SQLite file served with --start')
+    parser.add_argument('-c', '--concurrency', type=int, default=16,
+                        help='Virtual users')
+    parser.add_argument('-d', '--duration', type=float, default=30,
+                        help='Seconds measured')
+    parser.add_argument('--warmup', type=float, default=5,
+                        help='Seconds run before measuring')
+    parser.add_argument('--mix', default=DEFAULT_MIX, type=parse_mix,
+                        help=f'Scenario weights (default {DEFAULT_MIX})')
+    parser.add_argument('--places', type=int, default=20,
+                        help='Places created when the API has fewer')
+    parser.add_argument('--admin-email', default='admin@example.com',
+                        help='Admin of --url (--start creates its own)')
+    parser.add_argument('--admin-password', default='admin123',
+                        help='Password of --admin-email')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help='Write the report to this file')
+    parser.add_argument('--html', help='Write an HTML report to this file')
+    args = parser.parse_args()
+
+    process = None
+    if args.start:
+        process, base_url = start_server(args)
+    else:
+        base_url = args.url
+    args.target = base_url
+
+    try:
+        stats = Stats()
+        users, place_ids = setup(base_url, args, stats)
+        scenarios = Scenarios(place_ids, random.Random(args.seed))
+        stop = threading.Event()
+        threads = [threading.Thread(
+            target=virtual_user,
+            args=(base_url, scenarios, args.mix, user, stats, stop,
+                  args.seed + index),
+            daemon=True) for index, user in enumerate(users)]
+        for thread in threads:
+            thread.start()
+        time.sleep(args.warmup)
+        stats.start()
+        time.sleep(args.duration)
+        stats.recording = False
+        duration = time.perf_counter() - stats.started
+        stop.set()
+        for thread in threads:
+            thread.join(30)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(10)
+
+    report = build_report(stats, duration, args)
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    if args.html:
+        with open(args.html, 'w', encoding='utf-8') as f:
+            f.write(html_report(report))
+
+
+if __name__ == '__main__':
+    main()
@@ -4,6 +4,93 @@ class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'default_secret_key')
     DEBUG = False
 
+    # Password hashing (see benchmarks/bench_bcrypt_cost.py for the cost)
+    BCRYPT_LOG_ROUNDS = int(os.getenv('BCRYPT_LOG_ROUNDS', 12))
+    PASSWORD_HASH_EXECUTOR = os.getenv('PASSWORD_HASH_EXECUTOR', 'thread')
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_MAX_PENDING = 32
+    PASSWORD_HASH_TIMEOUT = 5
+
+    # Token-bucket rate limits, '<count>/<second|minute|hour|day>'
+    RATELIMIT_ENABLED = True
+    # 'memory' (per process) or 'sqlite:///path' (shared by the workers)
+    RATELIMIT_STORAGE = os.getenv('RATELIMIT_STORAGE', 'memory')
+    RATELIMITS = {
+        'login_ip': '20/minute',
+        'login_email': '5/minute',
+        'write': '60/minute',
+        'bulk': '10/hour',
+    }
+
+    # Response compression (gzip, or brotli when installed)
+    COMPRESS_ENABLED = True
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 500))
+    COMPRESS_LEVEL = int(os.getenv('COMPRESS_LEVEL', 6))
+    COMPRESS_BR_LEVEL = int(os.getenv('COMPRESS_BR_LEVEL', 4))
+    COMPRESS_CACHE_SIZE = 128
+
+    # Rows fetched per cursor batch by streamed list endpoints
+    STREAM_BATCH_SIZE = 1000
+
+    # POST /api/v1/batch limits
+    BATCH_MAX_REQUESTS = 20
+    BATCH_MAX_WORKERS = 4
+
+    # Rows validated and inserted per transaction by bulk imports
+    IMPORT_BATCH_SIZE = 1000
+
+    # Bulk exports, written to <instance>/exports unless EXPORT_DIR is set
+    EXPORT_DIR = os.getenv('EXPORT_DIR')
+    EXPORT_BATCH_SIZE = 1000
+
+    # Seconds between two checks of the in-memory amenity catalog against
+    # the DB, for changes made by other processes
+    AMENITY_CATALOG_CHECK_INTERVAL = float(
+        os.getenv('AMENITY_CATALOG_CHECK_INTERVAL', 1.0))
+
+    # Prometheus metrics served at METRICS_PATH; with METRICS_TOKEN set,
+    # scrapers must send `Authorization: Bearer <token>`
+    METRICS_ENABLED = True
+    METRICS_PATH = '/metrics'
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+
+    # Sampling profiler (POST /api/v1/admin/profile): default seconds
+    # between two samples, longest profile allowed
+    PROFILER_INTERVAL = 0.01
+    PROFILER_MAX_SECONDS = 60
+
+    # tracemalloc (/api/v1/admin/memory/...): frames kept per allocation,
+    # snapshots kept, count the allocations of each request from startup
+    MEMORY_TRACE_FRAMES = 25
+    MEMORY_SNAPSHOTS_KEPT = 4
+    MEMORY_REQUEST_STATS = os.getenv('MEMORY_REQUEST_STATS') == '1'
+
+    # Place leaderboards (GET /places/top): places kept per ranking,
+    # reviews needed to be ranked by rating, size in degrees of the
+    # "cheapest in area" cells and number of cells kept, seconds before a
+    # ranking is reloaded for the writes of other processes
+    LEADERBOARD_CAPACITY = 100
+    LEADERBOARD_MIN_REVIEWS = 3
+    LEADERBOARD_AREA_DEGREES = 1.0
+    LEADERBOARD_AREA_CELLS = 1024
+    LEADERBOARD_REFRESH_INTERVAL = float(
+        os.getenv('LEADERBOARD_REFRESH_INTERVAL', 300))
+
+    # Reviews per page of GET /places/<id>/reviews (?limit=, up to MAX)
+    REVIEWS_PAGE_SIZE = 50
+    REVIEWS_PAGE_MAX = 500
+
+    # Latest reviews included in GET /places/<id>?view=detail
+    PLACE_DETAIL_REVIEWS = 10
+
+    # Namespace modules served (e.g. ['users', 'auth']), all when None
+    API_NAMESPACES = None
+
+    # Swagger JSON cached in <instance>/swagger unless SWAGGER_CACHE_DIR
+    # is set, one file per version of the API declaration
+    SWAGGER_CACHE = True
+    SWAGGER_CACHE_DIR = os.getenv('SWAGGER_CACHE_DIR')
+
 class DevelopmentConfig(Config):
     DEBUG = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///development.db'
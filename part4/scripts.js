@@ -426,12 +426,8 @@ function initPlaceDetailsPage() {
             // Update place details
             updatePlaceDetails(place);
 
-            // Load reviews for this place
-            return fetchReviews(placeId);
-        })
-        .then(reviews => {
-            // Display reviews
-            displayReviews(reviews);
+            // The detail view already includes the latest reviews
+            displayReviews(place.reviews || []);
         })
         .catch(error => {
             console.error('Error loading place details:', error);
@@ -550,21 +546,15 @@ function updatePlaceDetails(place) {
 
     const amenitiesElement = document.getElementById('place-amenities');
     if (amenitiesElement) {
-        // Fetch amenities for this place
-        fetchAmenities(place.id)
-            .then(amenities => {
-                if (amenities && amenities.length > 0) {
-                    // Map the amenities to their names and join them with commas
-                    const amenityNames = amenities.map(amenity => amenity.name);
-                    amenitiesElement.textContent = amenityNames.join(', ');
-                } else {
-                    amenitiesElement.textContent = 'None listed';
-                }
-            })
-            .catch(error => {
-                console.error('Error loading amenities:', error);
-                amenitiesElement.textContent = 'Failed to load amenities';
-            });
+        // Amenities are part of the detail view
+        const amenities = place.amenities || [];
+        if (amenities.length > 0) {
+            // Map the amenities to their names and join them with commas
+            const amenityNames = amenities.map(amenity => amenity.name);
+            amenitiesElement.textContent = amenityNames.join(', ');
+        } else {
+            amenitiesElement.textContent = 'None listed';
+        }
     }
 }
 
@@ -786,7 +776,8 @@ async function fetchPlaceDetails(placeId) {
     }
 
     try {
-        const response = await fetchWithTimeout(`${API_BASE_URL}/places/${placeId}`);
+        // Place, owner, amenities and latest reviews in one call
+        const response = await fetchWithTimeout(`${API_BASE_URL}/places/${placeId}?view=detail`);
 
         if (!response.ok) {
             // Handle specific error cases
@@ -857,27 +848,6 @@ async function fetchReviews(placeId) {
     }
 }
 
-/**
- * Fetches amenities for a specific place
- * @param {string} placeId - ID of the place to fetch amenities for
- * @returns {Promise<Array>} - Promise resolving to array of amenity objects
- */
-async function fetchAmenities(placeId) {
-    try {
-        const response = await fetchWithTimeout(`${API_BASE_URL}/places/${placeId}/amenities`);
-
-        if (!response.ok) {
-            throw new Error(`HTTP error! Status: ${response.status}`);
-        }
-
-        const amenities = await response.json();
-        return amenities;
-    } catch (error) {
-        console.error(`Error fetching amenities for place ${placeId}:`, error);
-        return []; // Return empty array on error to avoid breaking the UI
-    }
-}
-
 /**
  * Submits a login request to the API
  * @param {string} email - User email
@@ -49,8 +49,8 @@ VALUES
         40.7128,
         -74.0060,
         'e4cb3ac8-3f11-4f9a-982e-1f6d17694c9f',
-        '2023-01-15 09:23:45',
-        '2023-04-22 14:35:12'
+        '2023-01-15 09:23:45.000000',
+        '2023-04-22 14:35:12.000000'
     );
 
 -- Walter's Place 2: Breaking Bad reference
@@ -64,8 +64,8 @@ VALUES
         51.5074,
         -0.1278,
         'e4cb3ac8-3f11-4f9a-982e-1f6d17694c9f',
-        '2023-02-18 11:42:38',
-        '2023-05-07 16:19:27'
+        '2023-02-18 11:42:38.000000',
+        '2023-05-07 16:19:27.000000'
     );
 
 -- Walter's Place 3: Breaking Bad reference
@@ -79,8 +79,8 @@ VALUES
         51.5074,
         -0.1278,
         'e4cb3ac8-3f11-4f9a-982e-1f6d17694c9f',
-        '2023-03-05 08:15:22',
-        '2023-06-12 10:45:59'
+        '2023-03-05 08:15:22.000000',
+        '2023-06-12 10:45:59.000000'
     );
 
 -- Insert demo places for Daenerys
@@ -95,8 +95,8 @@ VALUES
         34.0522,
         -118.2437,
         'a0d6479b-2b2e-4948-8b35-4e9ac5c3846a',
-        '2023-01-30 13:27:19',
-        '2023-05-18 09:38:42'
+        '2023-01-30 13:27:19.000000',
+        '2023-05-18 09:38:42.000000'
     );
 
 -- Daenerys Place 2: Game of Thrones reference
@@ -110,8 +110,8 @@ VALUES
         44.4280,
         -110.5885,
         'a0d6479b-2b2e-4948-8b35-4e9ac5c3846a',
-        '2023-02-14 15:44:33',
-        '2023-06-03 12:55:17'
+        '2023-02-14 15:44:33.000000',
+        '2023-06-03 12:55:17.000000'
     );
 
 -- Daenerys Place 3: Game of Thrones reference
@@ -125,8 +125,8 @@ VALUES
         36.7783,
         -119.4179,
         'a0d6479b-2b2e-4948-8b35-4e9ac5c3846a',
-        '2023-03-22 17:12:05',
-        '2023-07-01 14:23:36'
+        '2023-03-22 17:12:05.000000',
+        '2023-07-01 14:23:36.000000'
     );
 
 -- Insert reviews with pop culture references
@@ -138,8 +138,8 @@ VALUES
         5,
         'e4cb3ac8-3f11-4f9a-982e-1f6d17694c9f',
         'd1e2f3g4-h5i6-j7k8-l9m0-n1o2p3q4r5s6',
-        '2023-06-18 09:45:32',
-        '2023-06-18 09:45:32'
+        '2023-06-18 09:45:32.000000',
+        '2023-06-18 09:45:32.000000'
     ),
     (
         '0e75219b-7a28-4326-a28f-357d40a1c9a4',
@@ -147,8 +147,8 @@ VALUES
         5,
         'a0d6479b-2b2e-4948-8b35-4e9ac5c3846a',
         '884b6b34-5c63-47e8-ab60-a7ba6a63ddd1',
-        '2023-05-07 14:23:18',
-        '2023-05-07 14:23:18'
+        '2023-05-07 14:23:18.000000',
+        '2023-05-07 14:23:18.000000'
     ),
     (
         'f45a6b1c-d2e3-4f5a-6b7c-8d9e0f1a2b3c',
@@ -156,8 +156,8 @@ VALUES
         3,
         'e4cb3ac8-3f11-4f9a-982e-1f6d17694c9f',
         'e2f3g4h5-i6j7-k8l9-m0n1-o2p3q4r5s6t7',
-        '2023-04-12 17:39:26',
-        '2023-04-12 17:39:26'
+        '2023-04-12 17:39:26.000000',
+        '2023-04-12 17:39:26.000000'
     ),
     (
         'a1b2c3d4-e5f6-7g8h-9i0j-1a2b3c4d5e6f',
@@ -165,8 +165,8 @@ VALUES
         5,
         'e4cb3ac8-3f11-4f9a-982e-1f6d17694c9f',
         'f3g4h5i6-j7k8-l9m0-n1o2-p3q4r5s6t7u8',
-        '2023-07-03 11:27:54',
-        '2023-07-03 11:27:54'
+        '2023-07-03 11:27:54.000000',
+        '2023-07-03 11:27:54.000000'
     ),
     (
         '2c3d4e5f-6g7h-8i9j-0k1l-2m3n4o5p6q7r',
@@ -174,8 +174,8 @@ VALUES
         4,
         'a0d6479b-2b2e-4948-8b35-4e9ac5c3846a',
         'cc09352c-31a5-43ec-8786-e17a36c2ac99',
-        '2023-06-29 08:16:42',
-        '2023-06-29 08:16:42'
+        '2023-06-29 08:16:42.000000',
+        '2023-06-29 08:16:42.000000'
     ),
     (
         '3d4e5f6g-7h8i-9j0k-1l2m-3n4o5p6q7r8s',
@@ -183,55 +183,55 @@ VALUES
         2,
         'a0d6479b-2b2e-4948-8b35-4e9ac5c3846a',
         'a6061aab-736c-4194-8117-d4527e18795f',
-        '2023-05-22 19:38:15',
-        '2023-05-22 19:38:15'
+        '2023-05-22 19:38:15.000000',
+        '2023-05-22 19:38:15.000000'
     );
 
 -- Insert amenities with pop culture twists
 INSERT OR IGNORE INTO amenities (id, name, created_at, updated_at)
 VALUES
-    ('a1b2c3d4-e5f6-7g8h-9i0j-k1l2m3n4o5p6', 'Westeros WiFi', '2023-01-05 10:15:27', '2023-01-05 10:15:27'),
-    ('b2c3d4e5-f6g7-h8i9-j0k1-l2m3n4o5p6q7', 'Dragon Parking', '2023-01-05 10:16:33', '2023-01-05 10:16:33'),
-    ('c3d4e5f6-g7h8-i9j0-k1l2-m3n4o5p6q7r8', 'Blue Crystal Air Conditioning', '2023-01-05 10:17:45', '2023-01-05 10:17:45'),
-    ('d4e5f6g7-h8i9-j0k1-l2m3-n4o5p6q7r8s9', 'Heisenberg''s Kitchen', '2023-01-05 10:18:52', '2023-01-05 10:18:52'),
-    ('e5f6g7h8-i9j0-k1l2-m3n4-o5p6q7r8s9t0', 'Iron Throne TV Lounge', '2023-01-05 10:20:11', '2023-01-05 10:20:11'),
-    ('f6g7h8i9-j0k1-l2m3-n4o5-p6q7r8s9t0u1', 'Valyrian Steel Washer/Dryer', '2023-01-05 10:21:23', '2023-01-05 10:21:23'),
-    ('g7h8i9j0-k1l2-m3n4-o5p6-q7r8s9t0u1v2', 'Hodor Door Service', '2023-01-05 10:22:37', '2023-01-05 10:22:37');
+    ('a1b2c3d4-e5f6-7g8h-9i0j-k1l2m3n4o5p6', 'Westeros WiFi', '2023-01-05 10:15:27.000000', '2023-01-05 10:15:27.000000'),
+    ('b2c3d4e5-f6g7-h8i9-j0k1-l2m3n4o5p6q7', 'Dragon Parking', '2023-01-05 10:16:33.000000', '2023-01-05 10:16:33.000000'),
+    ('c3d4e5f6-g7h8-i9j0-k1l2-m3n4o5p6q7r8', 'Blue Crystal Air Conditioning', '2023-01-05 10:17:45.000000', '2023-01-05 10:17:45.000000'),
+    ('d4e5f6g7-h8i9-j0k1-l2m3-n4o5p6q7r8s9', 'Heisenberg''s Kitchen', '2023-01-05 10:18:52.000000', '2023-01-05 10:18:52.000000'),
+    ('e5f6g7h8-i9j0-k1l2-m3n4-o5p6q7r8s9t0', 'Iron Throne TV Lounge', '2023-01-05 10:20:11.000000', '2023-01-05 10:20:11.000000'),
+    ('f6g7h8i9-j0k1-l2m3-n4o5-p6q7r8s9t0u1', 'Valyrian Steel Washer/Dryer', '2023-01-05 10:21:23.000000', '2023-01-05 10:21:23.000000'),
+    ('g7h8i9j0-k1l2-m3n4-o5p6-q7r8s9t0u1v2', 'Hodor Door Service', '2023-01-05 10:22:37.000000', '2023-01-05 10:22:37.000000');
 
 -- Connect places with amenities
 INSERT OR IGNORE INTO place_amenity (place_id, amenity_id, created_at, updated_at)
 VALUES
     -- Walter's RV Hideaway
-    ('884b6b34-5c63-47e8-ab60-a7ba6a63ddd1', 'a1b2c3d4-e5f6-7g8h-9i0j-k1l2m3n4o5p6', '2023-01-15 09:30:15', '2023-01-15 09:30:15'), -- Westeros WiFi
-    ('884b6b34-5c63-47e8-ab60-a7ba6a63ddd1', 'b2c3d4e5-f6g7-h8i9-j0k1-l2m3n4o5p6q7', '2023-01-15 09:30:45', '2023-01-15 09:30:45'), -- Dragon Parking
-    ('884b6b34-5c63-47e8-ab60-a7ba6a63ddd1', 'c3d4e5f6-g7h8-i9j0-k1l2-m3n4o5p6q7r8', '2023-01-15 09:31:22', '2023-01-15 09:31:22'), -- Blue Crystal Air Conditioning
-    ('884b6b34-5c63-47e8-ab60-a7ba6a63ddd1', 'd4e5f6g7-h8i9-j0k1-l2m3-n4o5p6q7r8s9', '2023-01-15 09:32:03', '2023-01-15 09:32:03'), -- Heisenberg's Kitchen
+    ('884b6b34-5c63-47e8-ab60-a7ba6a63ddd1', 'a1b2c3d4-e5f6-7g8h-9i0j-k1l2m3n4o5p6', '2023-01-15 09:30:15.000000', '2023-01-15 09:30:15.000000'), -- Westeros WiFi
+    ('884b6b34-5c63-47e8-ab60-a7ba6a63ddd1', 'b2c3d4e5-f6g7-h8i9-j0k1-l2m3n4o5p6q7', '2023-01-15 09:30:45.000000', '2023-01-15 09:30:45.000000'), -- Dragon Parking
+    ('884b6b34-5c63-47e8-ab60-a7ba6a63ddd1', 'c3d4e5f6-g7h8-i9j0-k1l2-m3n4o5p6q7r8', '2023-01-15 09:31:22.000000', '2023-01-15 09:31:22.000000'), -- Blue Crystal Air Conditioning
+    ('884b6b34-5c63-47e8-ab60-a7ba6a63ddd1', 'd4e5f6g7-h8i9-j0k1-l2m3-n4o5p6q7r8s9', '2023-01-15 09:32:03.000000', '2023-01-15 09:32:03.000000'), -- Heisenberg's Kitchen
 
     -- Walter's Los Pollos Hermanos Loft
-    ('cc09352c-31a5-43ec-8786-e17a36c2ac99', 'a1b2c3d4-e5f6-7g8h-9i0j-k1l2m3n4o5p6', '2023-02-18 12:05:32', '2023-02-18 12:05:32'), -- Westeros WiFi
-    ('cc09352c-31a5-43ec-8786-e17a36c2ac99', 'c3d4e5f6-g7h8-i9j0-k1l2-m3n4o5p6q7r8', '2023-02-18 12:06:17', '2023-02-18 12:06:17'), -- Blue Crystal Air Conditioning
-    ('cc09352c-31a5-43ec-8786-e17a36c2ac99', 'd4e5f6g7-h8i9-j0k1-l2m3-n4o5p6q7r8s9', '2023-02-18 12:07:03', '2023-02-18 12:07:03'), -- Heisenberg's Kitchen
-    ('cc09352c-31a5-43ec-8786-e17a36c2ac99', 'e5f6g7h8-i9j0-k1l2-m3n4-o5p6q7r8s9t0', '2023-02-18 12:07:45', '2023-02-18 12:07:45'), -- Iron Throne TV Lounge
+    ('cc09352c-31a5-43ec-8786-e17a36c2ac99', 'a1b2c3d4-e5f6-7g8h-9i0j-k1l2m3n4o5p6', '2023-02-18 12:05:32.000000', '2023-02-18 12:05:32.000000'), -- Westeros WiFi
+    ('cc09352c-31a5-43ec-8786-e17a36c2ac99', 'c3d4e5f6-g7h8-i9j0-k1l2-m3n4o5p6q7r8', '2023-02-18 12:06:17.000000', '2023-02-18 12:06:17.000000'), -- Blue Crystal Air Conditioning
+    ('cc09352c-31a5-43ec-8786-e17a36c2ac99', 'd4e5f6g7-h8i9-j0k1-l2m3-n4o5p6q7r8s9', '2023-02-18 12:07:03.000000', '2023-02-18 12:07:03.000000'), -- Heisenberg's Kitchen
+    ('cc09352c-31a5-43ec-8786-e17a36c2ac99', 'e5f6g7h8-i9j0-k1l2-m3n4-o5p6q7r8s9t0', '2023-02-18 12:07:45.000000', '2023-02-18 12:07:45.000000'), -- Iron Throne TV Lounge
 
     -- Walter's Chemistry Teacher's Basement
-    ('a6061aab-736c-4194-8117-d4527e18795f', 'a1b2c3d4-e5f6-7g8h-9i0j-k1l2m3n4o5p6', '2023-03-05 08:45:19', '2023-03-05 08:45:19'), -- Westeros WiFi
-    ('a6061aab-736c-4194-8117-d4527e18795f', 'e5f6g7h8-i9j0-k1l2-m3n4-o5p6q7r8s9t0', '2023-03-05 08:46:32', '2023-03-05 08:46:32'), -- Iron Throne TV Lounge
+    ('a6061aab-736c-4194-8117-d4527e18795f', 'a1b2c3d4-e5f6-7g8h-9i0j-k1l2m3n4o5p6', '2023-03-05 08:45:19.000000', '2023-03-05 08:45:19.000000'), -- Westeros WiFi
+    ('a6061aab-736c-4194-8117-d4527e18795f', 'e5f6g7h8-i9j0-k1l2-m3n4-o5p6q7r8s9t0', '2023-03-05 08:46:32.000000', '2023-03-05 08:46:32.000000'), -- Iron Throne TV Lounge
 
     -- Daenerys's Dragonstone Castle
-    ('d1e2f3g4-h5i6-j7k8-l9m0-n1o2p3q4r5s6', 'a1b2c3d4-e5f6-7g8h-9i0j-k1l2m3n4o5p6', '2023-01-30 14:12:37', '2023-01-30 14:12:37'), -- Westeros WiFi
-    ('d1e2f3g4-h5i6-j7k8-l9m0-n1o2p3q4r5s6', 'c3d4e5f6-g7h8-i9j0-k1l2-m3n4o5p6q7r8', '2023-01-30 14:13:22', '2023-01-30 14:13:22'), -- Blue Crystal Air Conditioning
-    ('d1e2f3g4-h5i6-j7k8-l9m0-n1o2p3q4r5s6', 'd4e5f6g7-h8i9-j0k1-l2m3-n4o5p6q7r8s9', '2023-01-30 14:14:11', '2023-01-30 14:14:11'), -- Heisenberg's Kitchen
-    ('d1e2f3g4-h5i6-j7k8-l9m0-n1o2p3q4r5s6', 'f6g7h8i9-j0k1-l2m3-n4o5-p6q7r8s9t0u1', '2023-01-30 14:15:29', '2023-01-30 14:15:29'), -- Valyrian Steel Washer/Dryer
-    ('d1e2f3g4-h5i6-j7k8-l9m0-n1o2p3q4r5s6', 'g7h8i9j0-k1l2-m3n4-o5p6-q7r8s9t0u1v2', '2023-01-30 14:16:18', '2023-01-30 14:16:18'), -- Hodor Door Service
+    ('d1e2f3g4-h5i6-j7k8-l9m0-n1o2p3q4r5s6', 'a1b2c3d4-e5f6-7g8h-9i0j-k1l2m3n4o5p6', '2023-01-30 14:12:37.000000', '2023-01-30 14:12:37.000000'), -- Westeros WiFi
+    ('d1e2f3g4-h5i6-j7k8-l9m0-n1o2p3q4r5s6', 'c3d4e5f6-g7h8-i9j0-k1l2-m3n4o5p6q7r8', '2023-01-30 14:13:22.000000', '2023-01-30 14:13:22.000000'), -- Blue Crystal Air Conditioning
+    ('d1e2f3g4-h5i6-j7k8-l9m0-n1o2p3q4r5s6', 'd4e5f6g7-h8i9-j0k1-l2m3-n4o5p6q7r8s9', '2023-01-30 14:14:11.000000', '2023-01-30 14:14:11.000000'), -- Heisenberg's Kitchen
+    ('d1e2f3g4-h5i6-j7k8-l9m0-n1o2p3q4r5s6', 'f6g7h8i9-j0k1-l2m3-n4o5-p6q7r8s9t0u1', '2023-01-30 14:15:29.000000', '2023-01-30 14:15:29.000000'), -- Valyrian Steel Washer/Dryer
+    ('d1e2f3g4-h5i6-j7k8-l9m0-n1o2p3q4r5s6', 'g7h8i9j0-k1l2-m3n4-o5p6-q7r8s9t0u1v2', '2023-01-30 14:16:18.000000', '2023-01-30 14:16:18.000000'), -- Hodor Door Service
 
     -- Daenerys's Dothraki Tent
-    ('e2f3g4h5-i6j7-k8l9-m0n1-o2p3q4r5s6t7', 'd4e5f6g7-h8i9-j0k1-l2m3-n4o5p6q7r8s9', '2023-02-14 16:05:42', '2023-02-14 16:05:42'), -- Heisenberg's Kitchen
-    ('e2f3g4h5-i6j7-k8l9-m0n1-o2p3q4r5s6t7', 'g7h8i9j0-k1l2-m3n4-o5p6-q7r8s9t0u1v2', '2023-02-14 16:06:33', '2023-02-14 16:06:33'), -- Hodor Door Service
+    ('e2f3g4h5-i6j7-k8l9-m0n1-o2p3q4r5s6t7', 'd4e5f6g7-h8i9-j0k1-l2m3-n4o5p6q7r8s9', '2023-02-14 16:05:42.000000', '2023-02-14 16:05:42.000000'), -- Heisenberg's Kitchen
+    ('e2f3g4h5-i6j7-k8l9-m0n1-o2p3q4r5s6t7', 'g7h8i9j0-k1l2-m3n4-o5p6-q7r8s9t0u1v2', '2023-02-14 16:06:33.000000', '2023-02-14 16:06:33.000000'), -- Hodor Door Service
 
     -- Daenerys's Meereen Pyramid Penthouse
-    ('f3g4h5i6-j7k8-l9m0-n1o2-p3q4r5s6t7u8', 'a1b2c3d4-e5f6-7g8h-9i0j-k1l2m3n4o5p6', '2023-03-22 17:45:12', '2023-03-22 17:45:12'), -- Westeros WiFi
-    ('f3g4h5i6-j7k8-l9m0-n1o2-p3q4r5s6t7u8', 'b2c3d4e5-f6g7-h8i9-j0k1-l2m3n4o5p6q7', '2023-03-22 17:46:23', '2023-03-22 17:46:23'), -- Dragon Parking
-    ('f3g4h5i6-j7k8-l9m0-n1o2-p3q4r5s6t7u8', 'c3d4e5f6-g7h8-i9j0-k1l2-m3n4o5p6q7r8', '2023-03-22 17:47:14', '2023-03-22 17:47:14'), -- Blue Crystal Air Conditioning
-    ('f3g4h5i6-j7k8-l9m0-n1o2-p3q4r5s6t7u8', 'd4e5f6g7-h8i9-j0k1-l2m3-n4o5p6q7r8s9', '2023-03-22 17:48:05', '2023-03-22 17:48:05'), -- Heisenberg's Kitchen
-    ('f3g4h5i6-j7k8-l9m0-n1o2-p3q4r5s6t7u8', 'e5f6g7h8-i9j0-k1l2-m3n4-o5p6q7r8s9t0', '2023-03-22 17:49:22', '2023-03-22 17:49:22'), -- Iron Throne TV Lounge
-    ('f3g4h5i6-j7k8-l9m0-n1o2-p3q4r5s6t7u8', 'g7h8i9j0-k1l2-m3n4-o5p6-q7r8s9t0u1v2', '2023-03-22 17:50:18', '2023-03-22 17:50:18'); -- Hodor Door Service
+    ('f3g4h5i6-j7k8-l9m0-n1o2-p3q4r5s6t7u8', 'a1b2c3d4-e5f6-7g8h-9i0j-k1l2m3n4o5p6', '2023-03-22 17:45:12.000000', '2023-03-22 17:45:12.000000'), -- Westeros WiFi
+    ('f3g4h5i6-j7k8-l9m0-n1o2-p3q4r5s6t7u8', 'b2c3d4e5-f6g7-h8i9-j0k1-l2m3n4o5p6q7', '2023-03-22 17:46:23.000000', '2023-03-22 17:46:23.000000'), -- Dragon Parking
+    ('f3g4h5i6-j7k8-l9m0-n1o2-p3q4r5s6t7u8', 'c3d4e5f6-g7h8-i9j0-k1l2-m3n4o5p6q7r8', '2023-03-22 17:47:14.000000', '2023-03-22 17:47:14.000000'), -- Blue Crystal Air Conditioning
+    ('f3g4h5i6-j7k8-l9m0-n1o2-p3q4r5s6t7u8', 'd4e5f6g7-h8i9-j0k1-l2m3-n4o5p6q7r8s9', '2023-03-22 17:48:05.000000', '2023-03-22 17:48:05.000000'), -- Heisenberg's Kitchen
+    ('f3g4h5i6-j7k8-l9m0-n1o2-p3q4r5s6t7u8', 'e5f6g7h8-i9j0-k1l2-m3n4-o5p6q7r8s9t0', '2023-03-22 17:49:22.000000', '2023-03-22 17:49:22.000000'), -- Iron Throne TV Lounge
+    ('f3g4h5i6-j7k8-l9m0-n1o2-p3q4r5s6t7u8', 'g7h8i9j0-k1l2-m3n4-o5p6-q7r8s9t0u1v2', '2023-03-22 17:50:18.000000', '2023-03-22 17:50:18.000000'); -- Hodor Door Service
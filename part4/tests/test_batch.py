@@ -0,0 +1,96 @@
+import unittest
+
+from app import create_app
+from app.extensions import db
+from app.services import facade
+from config import DevelopmentConfig
+
+
+class TestConfig(DevelopmentConfig):
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    JWT_SECRET_KEY = 'test-secret-key-long-enough-for-hs256'
+    TESTING = True
+    BCRYPT_LOG_ROUNDS = 4
+    RATELIMIT_ENABLED = False
+    SWAGGER_CACHE = False
+
+
+class TestAtomicBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            db.create_all()
+            facade.create_user({
+                "first_name": "Admin",
+                "last_name": "Test",
+                "email": "admin@example.com",
+                "password": "admin123",
+                "is_admin": True
+            })
+        response = self.client.post('/api/v1/auth/login', json={
+            "email": "admin@example.com",
+            "password": "admin123"
+        })
+        self.headers = {
+            "Authorization": "Bearer " + response.json['access_token']
+        }
+
+    def amenity_names(self):
+        response = self.client.get('/api/v1/amenities/')
+        return sorted(amenity['name'] for amenity in response.json)
+
+    def run_batch(self, requests):
+        response = self.client.post('/api/v1/batch', json={
+            "atomic": True,
+            "requests": requests
+        }, headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        return response.json
+
+    def test_import_rolled_back(self):
+        """
+        Test an import of a failed atomic batch is rolled back with it
+        """
+        results = self.run_batch([
+            {"method": "POST", "path": "/api/v1/amenities/",
+             "body": {"name": "Sauna"}},
+            {"method": "POST", "path": "/api/v1/import/amenities",
+             "body": {"name": "Pool"}},
+            {"method": "POST", "path": "/api/v1/amenities/", "body": {}},
+        ])
+        self.assertEqual([result['status'] for result in results],
+                         [424, 424, 400])
+        self.assertTrue(results[1]['rolled_back'])
+        self.assertEqual(self.amenity_names(), [])
+
+    def test_import_first_rolled_back(self):
+        """
+        Test an import running first in a failed atomic batch is rolled
+        back (its savepoint must not start a transaction of its own)
+        """
+        self.run_batch([
+            {"method": "POST", "path": "/api/v1/import/amenities",
+             "body": {"name": "Pool"}},
+            {"method": "POST", "path": "/api/v1/amenities/", "body": {}},
+        ])
+        self.assertEqual(self.amenity_names(), [])
+
+    def test_import_committed(self):
+        """
+        Test an import of a successful atomic batch is committed
+        """
+        results = self.run_batch([
+            {"method": "POST", "path": "/api/v1/import/amenities",
+             "body": {"name": "Pool"}},
+            {"method": "POST", "path": "/api/v1/amenities/",
+             "body": {"name": "Sauna"}},
+        ])
+        self.assertEqual([result['status'] for result in results],
+                         [200, 201])
+        self.assertEqual(self.amenity_names(), ["Pool", "Sauna"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import unittest
+
+from sqlalchemy import text
+
+from app import create_app
+from app.api.pagination import encode_cursor
+from app.extensions import db
+from app.services import facade
+from config import DevelopmentConfig
+
+
+class TestConfig(DevelopmentConfig):
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    JWT_SECRET_KEY = 'test-secret-key-long-enough-for-hs256'
+    TESTING = True
+    BCRYPT_LOG_ROUNDS = 4
+    RATELIMIT_ENABLED = False
+    SWAGGER_CACHE = False
+
+
+# created_at of the reviews, as written by the SQL scripts (seconds only)
+# and by the application: two of them in the same second
+CREATED = ['2023-05-07 14:23:18', '2023-05-07 14:23:18',
+           '2023-05-07 14:23:18.500000', '2023-05-22 19:38:15']
+
+
+class TestReviewPages(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            db.create_all()
+            owner = facade.create_user({
+                "first_name": "Owner",
+                "last_name": "Test",
+                "email": "owner@example.com",
+                "password": "owner123"
+            })
+            place = facade.create_place({
+                "title": "Test place",
+                "description": "",
+                "price": 100.0,
+                "latitude": 40.0,
+                "longitude": -70.0,
+                "owner_id": owner.id
+            })
+            self.place_id = place.id
+            for i, created_at in enumerate(CREATED):
+                user = facade.create_user({
+                    "first_name": "Reviewer",
+                    "last_name": "Test",
+                    "email": f"reviewer{i}@example.com",
+                    "password": "reviewer123"
+                })
+                review = facade.create_review({
+                    "text": f"Review {i}",
+                    "rating": 5,
+                    "user_id": user.id,
+                    "place_id": place.id
+                })
+                db.session.execute(
+                    text("UPDATE reviews SET created_at = :created_at"
+                         " WHERE id = :id"),
+                    {"created_at": created_at, "id": review.id})
+            db.session.commit()
+
+    def walk(self, sort):
+        """
+        Ids of the reviews of all the pages of one review each, in order
+        """
+        ids = []
+        url = f'/api/v1/places/{self.place_id}/reviews'
+        query = {"sort": sort, "limit": 1}
+        while len(ids) <= len(CREATED):
+            response = self.client.get(url, query_string=query)
+            self.assertEqual(response.status_code, 200)
+            ids.extend(review['id'] for review in response.json)
+            cursor = response.headers.get('X-Next-Cursor')
+            if cursor is None:
+                return ids
+            query["cursor"] = cursor
+        self.fail('pages do not end')
+
+    def test_seconds_only_dates(self):
+        """
+        Test pages walk over reviews created in the same second, dates
+        stored without microseconds, in both directions
+        """
+        newest = self.walk('-created_at')
+        oldest = self.walk('created_at')
+        self.assertEqual(len(newest), len(CREATED))
+        self.assertEqual(len(set(newest)), len(CREATED))
+        self.assertEqual(oldest, newest[::-1])
+
+    def test_invalid_cursor(self):
+        """
+        Test a cursor without a date is refused
+        """
+        cursor = encode_cursor('created_at', 5, self.place_id)
+        response = self.client.get(
+            f'/api/v1/places/{self.place_id}/reviews',
+            query_string={"sort": "created_at", "cursor": cursor})
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()